@@ -0,0 +1,171 @@
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
+from account.account import Account
+from CreditCardManager import CreditCardManager
+from session import Session
+from storage.executor import DatabaseExecutor, get_executor
+
+class AsyncCreditCardManager:
+    """
+    Provides an asyncio interface to CreditCardManager.
+
+    Blocking SQLite work runs on one dedicated executor thread per database file,
+    so a single event loop can keep thousands of requests in flight while each
+    file sees a serialized stream of operations. Session operations are in-memory
+    and complete without leaving the event loop. With a ShardedRepository each
+    user's work is queued on the threads of the user's shard file.
+    """
+    def __init__(self, manager: Optional[CreditCardManager] = None, max_pending: int = 1000):
+        """
+        Initializes an AsyncCreditCardManager object.
+
+        Parameters:
+        - manager (CreditCardManager, optional): The synchronous manager to wrap. A new one is created if omitted.
+        - max_pending (int): The maximum number of requests queued per database thread.
+        """
+        self.manager: CreditCardManager = manager or CreditCardManager()
+        self.max_pending: int = max_pending
+
+    async def create_account(self, user_id: str) -> Account:
+        """
+        Creates a new account for the given user ID.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - Account: The created Account object.
+        """
+        return await self._account_executor(user_id).run(self.manager.create_account, user_id)
+
+    async def get_account(self, user_id: str) -> Account:
+        """
+        Retrieves the account for the given user ID.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - Account: The retrieved Account object.
+        """
+        return await self._account_executor(user_id).run(self.manager.get_account, user_id)
+
+    async def list_accounts(self) -> List[str]:
+        """
+        Returns a list of all user IDs with accounts.
+
+        Every shard is queried on its own accounts thread and the results are concatenated
+        in shard order, as in CreditCardManager.list_accounts.
+
+        Returns:
+        - List[str]: List of user IDs with accounts.
+        """
+        shards = await asyncio.gather(*(
+            get_executor(shard.account_db.db_name, self.max_pending).run(shard.account_db.get_all_accounts)
+            for shard in self.manager.repository.shards))
+        return [account[1] for accounts in shards for account in accounts]
+
+    async def create_session(self, user_id: str) -> str:
+        """
+        Creates a new session for the given user ID.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - str: The token associated with the created session.
+        """
+        return self.manager.create_session(user_id)
+
+    async def get_session(self, token: str) -> Optional[Session]:
+        """
+        Retrieves the session associated with the given token.
+
+        Parameters:
+        - token (str): The session token.
+
+        Returns:
+        - Session: The retrieved Session object if found and valid, else None.
+        """
+        return self.manager.get_session(token)
+
+    async def invalidate_session(self, token: str) -> None:
+        """
+        Invalidates the session associated with the given token.
+
+        Parameters:
+        - token (str): The session token.
+        """
+        self.manager.invalidate_session(token)
+
+    async def initiate_payment(self, account_id: str, card_number: str, amount: float, merchant: str) -> bool:
+        """
+        Initiates a payment using the specified card and updates the account balance if successful.
+
+        The payment ends in a transactions write, so it is queued on the transactions thread.
+
+        Parameters:
+        - account_id (str): The ID of the account.
+        - card_number (str): The credit card number for payment.
+        - amount (float): The amount to be paid.
+        - merchant (str): The merchant for the payment.
+
+        Returns:
+        - bool: True if the payment is successful, False otherwise.
+        """
+        return await self._transaction_executor(account_id).run(self.manager.initiate_payment, account_id,
+                                                                card_number, amount, merchant)
+
+    async def get_transactions(self, user_id: str) -> List[Tuple]:
+        """
+        Retrieves all transactions of a user.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - List[Tuple]: The transaction records (id, user_id, amount, date, merchant).
+        """
+        transaction_db = self.manager.repository.for_user(user_id).transaction_db
+        return await self._transaction_executor(user_id).run(transaction_db.get_transactions_by_user_id, user_id)
+
+    async def get_balance(self, user_id: str, start_date: Optional[datetime] = None,
+                          end_date: Optional[datetime] = None, transaction_type: Optional[str] = None,
+                          merchant: Optional[str] = None) -> float:
+        """
+        Retrieves a user's balance with the same filters as Account.get_balance_v2.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+        - start_date (datetime, optional): The start date of the date range filter.
+        - end_date (datetime, optional): The end date of the date range filter.
+        - transaction_type (str, optional): The type of transactions to include ('purchase' or 'refund').
+        - merchant (str, optional): The merchant to include in the balance calculation.
+
+        Returns:
+        - float: The balance based on the specified criteria.
+        """
+        def get_balance_v2() -> float:
+            return Account(user_id, self.manager.repository).get_balance_v2(start_date, end_date, transaction_type, merchant)
+
+        return await self._transaction_executor(user_id).run(get_balance_v2)
+
+    def _account_executor(self, user_id: str) -> DatabaseExecutor:
+        """
+        Returns the executor of the file holding a user's account.
+        """
+        return get_executor(self.manager.repository.for_user(user_id).account_db.db_name, self.max_pending)
+
+    def _transaction_executor(self, user_id: str) -> DatabaseExecutor:
+        """
+        Returns the executor of the file holding a user's transactions.
+        """
+        return get_executor(self.manager.repository.for_user(user_id).transaction_db.db_name, self.max_pending)
+
+    def close(self) -> None:
+        """
+        Stops the wrapped manager's background work. The shared database threads keep running
+        for other managers; use storage.executor.shutdown_all() at process exit.
+        """
+        self.manager.close()
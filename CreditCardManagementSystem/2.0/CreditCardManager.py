@@ -1,22 +1,81 @@
 import datetime
+from datetime import timedelta
 from hashlib import sha256
 import secrets
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Union
 from account.account import Account
 from account.database import AccountDatabase
-from session import Session
-from credit_card.database import CreditCardDatabase
+from session import DEFAULT_SESSION_TTL, Session
+from session_store import SessionStore, SessionSweeper
+from credit_card.database import CreditCardDatabase, TransactionDatabase
+from storage.repository import Repository
+from storage.sharding import ShardedRepository
 from credit_card.transaction import Transaction
-from credit_card.credit_card import CreditCard
 
 class CreditCardManager:
     """
     Provides an interface for manipulating Account objects.
     """
-    def __init__(self):
-        self.account_db = AccountDatabase()
-        self.credit_card_db = CreditCardDatabase()
-        self.sessions = {}
+    def __init__(self, session_ttl: timedelta = DEFAULT_SESSION_TTL, sweep_interval: float = 60.0,
+                 repository: Optional[Union[Repository, ShardedRepository]] = None):
+        """
+        Initializes a CreditCardManager object.
+
+        Parameters:
+        - session_ttl (timedelta): How long new sessions stay valid.
+        - sweep_interval (float): Seconds between background evictions of expired sessions;
+          0 disables the background sweeper.
+        - repository (Repository or ShardedRepository, optional): The databases to use. Defaults to the
+          three-file layout; pass Repository.unified() to keep every table in one file, or a
+          ShardedRepository to spread users over several files.
+        """
+        self.repository: Union[Repository, ShardedRepository] = repository or Repository()
+        self.session_ttl: timedelta = session_ttl
+        self.sessions: SessionStore = SessionStore()
+        self.session_sweeper: Optional[SessionSweeper] = None
+        if sweep_interval > 0:
+            self.session_sweeper = SessionSweeper(self.sessions, sweep_interval)
+            self.session_sweeper.start()
+
+    @property
+    def account_db(self) -> AccountDatabase:
+        """
+        The accounts database of an unsharded repository.
+        """
+        return self._single_repository().account_db
+
+    @property
+    def credit_card_db(self) -> CreditCardDatabase:
+        """
+        The credit card database of an unsharded repository.
+        """
+        return self._single_repository().credit_card_db
+
+    @property
+    def transaction_db(self) -> TransactionDatabase:
+        """
+        The transaction database of an unsharded repository.
+        """
+        return self._single_repository().transaction_db
+
+    def _single_repository(self) -> Repository:
+        """
+        Returns the repository if it is not sharded.
+
+        Raises:
+        - AttributeError: With a ShardedRepository, which has no single database; a user's
+          databases are reached through repository.for_user(user_id).
+        """
+        if isinstance(self.repository, ShardedRepository):
+            raise AttributeError("A sharded manager has no single database; use repository.for_user(user_id)")
+        return self.repository
+
+    def close(self) -> None:
+        """
+        Stops the background session sweeper.
+        """
+        if self.session_sweeper is not None:
+            self.session_sweeper.stop()
 
     def create_account(self, user_id: str) -> Account:
         """
@@ -28,9 +87,35 @@ class CreditCardManager:
         Returns:
         - Account: The created Account object.
         """
-        self.account_db.add_account(user_id)
+        account_db = self.repository.for_user(user_id).account_db
+        account_db.add_account(user_id)
 
-        return Account(self.account_db.get_account_by_user_id(user_id)[1])
+        return self._account(account_db.get_account_by_user_id(user_id)[1])
+
+    def create_accounts(self, user_ids: Iterable[str], chunk_size: int = 10000) -> Dict[str, int]:
+        """
+        Creates accounts for many user IDs at once. Existing accounts are left unchanged.
+
+        Rows are inserted in chunked transactions and the account IDs are read back with
+        one query per shard; no Account objects are built. With a ShardedRepository the
+        account IDs are only unique within a shard.
+
+        Parameters:
+        - user_ids (Iterable[str]): The IDs of the users.
+        - chunk_size (int): The number of accounts inserted per transaction.
+
+        Returns:
+        - Dict[str, int]: The account ID of every given user ID.
+        """
+        by_shard: Dict[Repository, List[str]] = {shard: [] for shard in self.repository.shards}
+        for user_id in user_ids:
+            by_shard[self.repository.for_user(user_id)].append(user_id)
+        account_ids: Dict[str, int] = {}
+        for shard, shard_user_ids in by_shard.items():
+            if shard_user_ids:
+                shard.account_db.add_accounts(shard_user_ids, chunk_size)
+                account_ids.update(shard.account_db.get_account_ids(shard_user_ids))
+        return account_ids
 
     def get_account(self, user_id: str)  -> Account:
         """
@@ -42,7 +127,19 @@ class CreditCardManager:
         Returns:
         - Account: The retrieved Account object if found, else None.
         """
-        return Account(self.account_db.get_account_by_user_id(user_id)[1])
+        return self._account(self.repository.for_user(user_id).account_db.get_account_by_user_id(user_id)[1])
+
+    def _account(self, user_id: str) -> Account:
+        """
+        Creates an Account handle backed by this manager's databases.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - Account: The Account object.
+        """
+        return Account(user_id, self.repository)
 
     def remove_account(self, user_id: str):
         """
@@ -53,16 +150,20 @@ class CreditCardManager:
         """
         account = self.get_account(user_id)
         if account:
-            self.account_db.delete_account(account.user_id)  
+            self.repository.for_user(user_id).account_db.delete_account(account.user_id)
 
     def list_accounts(self) -> List[str]:
         """
         Returns a list of all user IDs with accounts.
 
+        With a ShardedRepository every shard is queried concurrently and the results are
+        concatenated in shard order.
+
         Returns:
         - List[str]: List of user IDs with accounts.
         """
-        return [account[1] for account in self.account_db.get_all_accounts()]
+        return [account[1] for accounts in self.repository.scatter(lambda shard: shard.account_db.get_all_accounts())
+                for account in accounts]
 
     def create_session(self, user_id: str) -> str:
         """
@@ -74,8 +175,8 @@ class CreditCardManager:
         Returns:
         - str: The token associated with the created session.
         """
-        session = Session(user_id)
-        self.sessions[user_id] = session
+        session = Session(user_id, self.session_ttl)
+        self.sessions.add(session)
         return session.token
 
     def get_session(self, token: str) -> Session:
@@ -88,10 +189,7 @@ class CreditCardManager:
         Returns:
         - Session: The retrieved Session object if found and valid, else None.
         """
-        for session in self.sessions.values():
-            if session.token == token and session.is_valid():
-                return session
-        return None
+        return self.sessions.get(token)
 
     def invalidate_session(self, token: str):
         """
@@ -100,15 +198,15 @@ class CreditCardManager:
         Parameters:
         - token (str): The session token.
         """
-        for user_id, session in self.sessions.items():
-            if session.token == token:
-                del self.sessions[user_id]
-                break
+        self.sessions.invalidate(token)
 
     def initiate_payment(self, account_id: str, card_number: str, amount: float, merchant: str) -> bool:
         """
         Initiates a payment using the specified card and updates the account balance if successful.
 
+        With a unified or sharded repository the lookups and the transaction insert run in a
+        single database transaction on the user's shard, so the payment costs one commit.
+
         Parameters:
         - account_id (str): The ID of the account.
         - card_number (str): The credit card number for payment.
@@ -118,21 +216,21 @@ class CreditCardManager:
         Returns:
         - bool: True if the payment is successful, False otherwise.
         """
+        shard = self.repository.for_user(account_id)
+        with shard.transaction():
+            account_row = shard.account_db.get_account_by_id(account_id)
+            if not account_row:
+                return False
 
-        account: Optional[Account] = Account(self.account_db.get_account_by_id(account_id)[1])
-        if not account:
-            return False
+            account: Account = self._account(account_row[1])
+            if account.find_card(card_number) is None:
+                return False
 
-        card: CreditCard = CreditCard(*account.get_card(2)[1:])
-
-        if card.number == card_number:
             transaction: Transaction = Transaction(account.user_id,amount, datetime.datetime.now(), merchant)
             transaction.payment_processed = True  # Simulating payment processing
             account.update_balance(transaction)
             account.add_transaction(transaction.amount, transaction.date, transaction.merchant)
             return True
-
-        return False        
             
     def authenticate_user(self, user_id: str, password: str) -> bool:
         """
@@ -145,7 +243,7 @@ class CreditCardManager:
         Returns:
         - bool: True if authentication is successful, False otherwise.
         """
-        account = self.account_db.get_account_by_user_id(user_id)
+        account = self.repository.for_user(user_id).account_db.get_account_by_user_id(user_id)
         if account:
             hashed_password = "HASEDPASSWORDS"  # Assuming password hash is stored in the third column
             if self._verify_password(password, hashed_password):
@@ -2,25 +2,61 @@
 from datetime import datetime
 import random
 import string
-from typing import Optional, Tuple, List
+from typing import Iterator, Optional, Tuple, List, Union
 from credit_card.database import CreditCardDatabase, TransactionDatabase
+from credit_card.money import from_cents
 from credit_card.transaction import Transaction
+from storage.repository import Repository
+from storage.sharding import ShardedRepository
 
 class Account:
     """
     Manages a collection of CreditCard and Transaction objects for a user.
     """
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, repository: Optional[Union[Repository, ShardedRepository]] = None):
         """
         Initializes an Account object.
 
+        Constructing an Account does no I/O: the card and transaction databases are
+        borrowed from the repository, or opened with their default files, on first use.
+
         Parameters:
         - user_id (str): The ID of the user.
+        - repository (Repository or ShardedRepository, optional): The databases to use; a sharded
+          repository resolves to the user's shard. Defaults to the default database files.
         """
         self.user_id: str = user_id
-        self.credit_card_db: CreditCardDatabase = CreditCardDatabase()
-        self.transaction_db: TransactionDatabase = TransactionDatabase()
-        self.balance: float = 0.0
+        self.repository: Optional[Union[Repository, ShardedRepository]] = repository
+        self._credit_card_db: Optional[CreditCardDatabase] = None
+        self._transaction_db: Optional[TransactionDatabase] = None
+        self.balance_cents: int = 0
+
+    @property
+    def balance(self) -> float:
+        """
+        The in-memory balance in currency units, kept as integer cents in balance_cents.
+        """
+        return from_cents(self.balance_cents)
+
+    @property
+    def credit_card_db(self) -> CreditCardDatabase:
+        """
+        The credit card database, resolved on first use.
+        """
+        if self._credit_card_db is None:
+            self._credit_card_db = (self.repository.for_user(self.user_id).credit_card_db if self.repository
+                                    else CreditCardDatabase())
+        return self._credit_card_db
+
+    @property
+    def transaction_db(self) -> TransactionDatabase:
+        """
+        The transaction database, resolved on first use.
+        """
+        if self._transaction_db is None:
+            self._transaction_db = (self.repository.for_user(self.user_id).transaction_db if self.repository
+                                    else TransactionDatabase())
+        return self._transaction_db
 
     def add_card(self, number: str, expiration_date: str, cvv: str) -> None:
         """
@@ -31,7 +67,7 @@ class Account:
         - expiration_date (str): The expiration date of the credit card.
         - cvv (str): The CVV code of the credit card.
         """
-        self.credit_card_db.add_credit_card(number, expiration_date, cvv)
+        self.credit_card_db.add_credit_card(number, expiration_date, cvv, self.user_id)
 
     def remove_card(self, card_id: int) -> None:
         """
@@ -54,6 +90,18 @@ class Account:
         """
         return self.credit_card_db.get_credit_card_by_id(card_id)
 
+    def find_card(self, card_number: str):
+        """
+        Finds one of the account's credit cards by its number.
+
+        Parameters:
+        - card_number (str): The credit card number.
+
+        Returns:
+        - Tuple[int, str, str, str]: The card's ID, number, expiration date and CVV if the account owns it, else None.
+        """
+        return self.credit_card_db.find_card(self.user_id, card_number)
+
     def add_transaction(self, amount: float, date: str, merchant: str) -> None:
         """
         Adds a new transaction to the account.
@@ -82,52 +130,56 @@ class Account:
         - List[Transaction]: A list of Transaction objects representing the transactions.
         """
         return self.transaction_db.get_transactions_by_user_id(self.user_id)
+
+    def get_transactions_in_range(self, start_date: Optional[datetime] = None,
+                                  end_date: Optional[datetime] = None) -> List[Tuple]:
+        """
+        Retrieves the account's transactions within a date range, ordered by date.
+
+        Parameters:
+        - start_date (datetime, optional): Only include transactions on or after this date.
+        - end_date (datetime, optional): Only include transactions on or before this date; a bare date includes the whole day.
+
+        Returns:
+        - List[Tuple]: The transaction records (id, user_id, amount, date, merchant).
+        """
+        return self.transaction_db.get_transactions_in_range(self.user_id, start_date, end_date)
+
+    def iter_transactions(self, page_size: int = 500, after_date: Optional[datetime] = None,
+                          after_id: Optional[int] = None) -> Iterator[Tuple]:
+        """
+        Streams the account's transactions ordered by date, fetching one page at a time.
+
+        Parameters:
+        - page_size (int): The number of transactions fetched per query.
+        - after_date (datetime, optional): Resume after this date (the date of the last row seen).
+        - after_id (int, optional): Resume after this transaction ID (the ID of the last row seen).
+
+        Returns:
+        - Iterator[Tuple]: The transaction records (id, user_id, amount, date, merchant).
+        """
+        return self.transaction_db.iter_transactions(self.user_id, after_date, after_id, page_size)
     
     
     def get_balance_v2(self, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, 
                        transaction_type: Optional[str] = None, merchant: Optional[str] = None) -> float:
         """
         Retrieves the current account balance based on specified criteria for filtering transactions.
+        Date-only queries are answered from the balance ledger; other filters are summed inside
+        SQLite, so no transaction rows are loaded either way.
 
         Parameters:
         - start_date (datetime, optional): The start date of the date range filter.
         - end_date (datetime, optional): The end date of the date range filter.
-        - transaction_type (str, optional): The type of transactions to include (e.g., 'purchase', 'refund').
+        - transaction_type (str, optional): The type of transactions to include ('purchase' or 'refund').
         - merchant (str, optional): The merchant to include in the balance calculation.
 
         Returns:
         - float: The current account balance based on the specified criteria.
         """
-        transactions = self.transaction_db.get_transactions_by_user_id(self.user_id)
-        filtered_transactions = self._filter_transactions(transactions, start_date, end_date, transaction_type, merchant)
-        balance = sum(transaction[2] for transaction in filtered_transactions)  # Assuming amount is stored in the third column
-        return balance
-
-    def _filter_transactions(self, transactions: List[Tuple], start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, 
-                             transaction_type: Optional[str] = None, merchant: Optional[str] = None) -> List[Tuple]:
-        """
-        Filters transactions based on specified criteria.
-
-        Parameters:
-        - transactions (list): List of transactions to filter.
-        - start_date (datetime, optional): The start date of the date range filter.
-        - end_date (datetime, optional): The end date of the date range filter.
-        - transaction_type (str, optional): The type of transactions to include (e.g., 'purchase', 'refund').
-        - merchant (str, optional): The merchant to include in the filter.
-
-        Returns:
-        - list: Filtered list of transactions.
-        """
-        filtered_transactions = transactions
-        if start_date:
-            filtered_transactions = [t for t in filtered_transactions if t[3] >= start_date]  # Assuming date is stored in the fourth column
-        if end_date:
-            filtered_transactions = [t for t in filtered_transactions if t[3] <= end_date]  # Assuming date is stored in the fourth column
-        if transaction_type:
-            filtered_transactions = [t for t in filtered_transactions if t[4] == transaction_type]  # Assuming transaction type is stored in the fifth column
-        if merchant:
-            filtered_transactions = [t for t in filtered_transactions if t[5] == merchant]  # Assuming merchant is stored in the sixth column
-        return filtered_transactions
+        if transaction_type is None and merchant is None:
+            return self.transaction_db.get_balance(self.user_id, start_date, end_date)
+        return self.transaction_db.sum_transactions(self.user_id, start_date, end_date, transaction_type, merchant)
 
     def update_balance(self, transaction: Transaction) -> None:
         """
@@ -137,9 +189,9 @@ class Account:
             transaction (Transaction): The transaction object to update the balance.
         """
         if transaction.payment_processed:
-            self.balance += transaction.amount
+            self.balance_cents += transaction.amount_cents
         else:
-            self.balance -= transaction.amount
+            self.balance_cents -= transaction.amount_cents
 
     def enable_two_factor_authentication(self) -> None:
         """
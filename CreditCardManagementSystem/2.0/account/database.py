@@ -1,5 +1,23 @@
-import sqlite3
-from typing import List, Tuple, Optional
+import json
+from typing import Dict, Iterable, List, Tuple, Optional
+from storage.cache import LRUCache, get_cache
+from storage.migrations import Migration, apply_migrations
+from storage.pool import ConnectionPool, get_pool
+
+ACCOUNT_MIGRATIONS: List[Migration] = [
+    Migration(1, 'Create accounts table', [
+        '''
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT
+        )
+        ''',
+    ]),
+    Migration(2, 'Deduplicate accounts and index user_id', [
+        'DELETE FROM accounts WHERE id NOT IN (SELECT MIN(id) FROM accounts GROUP BY user_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_accounts_user_id ON accounts (user_id)',
+    ]),
+]
 
 class AccountDatabase:
     def __init__(self, db_name: str = 'accounts.db') -> None:
@@ -9,44 +27,95 @@ class AccountDatabase:
         Parameters:
         - db_name (str): The name of the SQLite database file.
         """
-        self.connection = sqlite3.connect(db_name)
-        self.cursor = self.connection.cursor()
-        self.create_tables()
+        self.db_name: str = db_name
+        self.pool: ConnectionPool = get_pool(db_name)
+        self.cache: LRUCache = get_cache(db_name, 'accounts')
+        self.pool.initialize_once('accounts', self.create_tables)
 
     def create_tables(self) -> None:
         """
-        Create necessary tables if they don't exist in the database.
+        Create necessary tables and indexes by applying pending schema migrations.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS accounts (
-                id INTEGER PRIMARY KEY,
-                user_id TEXT
-            )
-        ''')
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            apply_migrations(connection, 'accounts', ACCOUNT_MIGRATIONS)
 
     def close(self) -> None:
         """
-        Close the database connection.
+        Close the idle connections of the shared pool; they are reopened on demand.
         """
-        self.connection.close()
+        self.pool.close()
 
     def add_account(self, user_id: str) -> None:
         """
-        Add an account to the database.
+        Add an account to the database. Adding an existing user ID has no effect.
 
         Parameters:
         - user_id (str): The ID of the user associated with the account.
         """
-        self.cursor.execute('''
-            INSERT INTO accounts (user_id)
-            VALUES (?)
-        ''', (user_id,))
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            connection.execute('''
+                INSERT OR IGNORE INTO accounts (user_id)
+                VALUES (?)
+            ''', (user_id,))
+
+    def add_accounts(self, user_ids: Iterable[str], chunk_size: int = 10000) -> int:
+        """
+        Add many accounts, committing once per chunk. Existing user IDs are skipped.
+
+        Parameters:
+        - user_ids (Iterable[str]): The user IDs to add; consumed lazily, one chunk at a time.
+        - chunk_size (int): The number of rows inserted per transaction.
+
+        Returns:
+        - int: The number of accounts actually created.
+        """
+        created = 0
+        chunk: List[Tuple[str]] = []
+        for user_id in user_ids:
+            chunk.append((user_id,))
+            if len(chunk) >= chunk_size:
+                created += self._insert_accounts(chunk)
+                chunk = []
+        if chunk:
+            created += self._insert_accounts(chunk)
+        return created
+
+    def _insert_accounts(self, rows: List[Tuple[str]]) -> int:
+        """
+        Insert one chunk of accounts in a single transaction.
+
+        Parameters:
+        - rows (List[Tuple[str]]): The (user_id,) rows to insert.
+
+        Returns:
+        - int: The number of rows inserted.
+        """
+        with self.pool.transaction() as connection:
+            return connection.executemany('INSERT OR IGNORE INTO accounts (user_id) VALUES (?)', rows).rowcount
+
+    def get_account_ids(self, user_ids: Iterable[str]) -> Dict[str, int]:
+        """
+        Resolve many user IDs to account IDs with a single query.
+
+        The user IDs are passed as one JSON array parameter, so the query is not limited by
+        SQLite's maximum number of bound variables.
+
+        Parameters:
+        - user_ids (Iterable[str]): The user IDs to resolve.
+
+        Returns:
+        - Dict[str, int]: Account IDs keyed by user ID; unknown user IDs are omitted.
+        """
+        with self.pool.connection() as connection:
+            return dict(connection.execute('''
+                SELECT accounts.user_id, accounts.id
+                FROM json_each(?) AS requested
+                JOIN accounts ON accounts.user_id = requested.value
+            ''', (json.dumps(list(user_ids)),)))
 
     def get_account_by_id(self, account_id: int) -> Optional[Tuple[int, str]]:
         """
-        Retrieve an account by its ID from the database.
+        Retrieve an account by its ID, from the cache when possible.
 
         Parameters:
         - account_id (int): The ID of the account.
@@ -55,13 +124,11 @@ class AccountDatabase:
         - Tuple[int, str]: A tuple containing the account ID and user ID,
           or None if no account with the given ID exists.
         """
-        self.cursor.execute('SELECT * FROM accounts WHERE user_id=?', (account_id,))
-        account = self.cursor.fetchone()
-        return account
+        return self.cache.get_or_load(account_id, lambda: self._select_account(account_id))
 
     def get_account_by_user_id(self, user_id: str) -> Optional[Tuple[int, str]]:
         """
-        Retrieve an account by its associated user ID from the database.
+        Retrieve an account by its associated user ID, from the cache when possible.
 
         Parameters:
         - user_id (str): The ID of the user associated with the account.
@@ -70,8 +137,20 @@ class AccountDatabase:
         - Tuple[int, str]: A tuple containing the account ID and user ID,
           or None if no account with the given user ID exists.
         """
-        self.cursor.execute('SELECT * FROM accounts WHERE user_id=?', (user_id,))
-        return self.cursor.fetchone()
+        return self.cache.get_or_load(user_id, lambda: self._select_account(user_id))
+
+    def _select_account(self, user_id: str) -> Optional[Tuple[int, str]]:
+        """
+        Read an account row from the database, bypassing the cache.
+
+        Parameters:
+        - user_id (str): The ID of the user associated with the account.
+
+        Returns:
+        - Tuple[int, str]: The account row, or None if it does not exist.
+        """
+        with self.pool.connection() as connection:
+            return connection.execute('SELECT * FROM accounts WHERE user_id=?', (user_id,)).fetchone()
 
     def get_all_accounts(self) -> List[Tuple[int, str]]:
         """
@@ -80,8 +159,8 @@ class AccountDatabase:
         Returns:
         - List[Tuple[int, str]]: A list of tuples containing account ID and user ID.
         """
-        self.cursor.execute('SELECT * FROM accounts')
-        return self.cursor.fetchall()
+        with self.pool.connection() as connection:
+            return connection.execute('SELECT * FROM accounts').fetchall()
 
     def update_account(self, account_id: int, user_id: str) -> None:
         """
@@ -91,12 +170,14 @@ class AccountDatabase:
         - account_id (int): The ID of the account to update.
         - user_id (str): The updated user ID associated with the account.
         """
-        self.cursor.execute('''
-            UPDATE accounts
-            SET user_id=?
-            WHERE id=?
-        ''', (user_id, account_id))
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            previous = connection.execute('SELECT user_id FROM accounts WHERE id=?', (account_id,)).fetchone()
+            connection.execute('''
+                UPDATE accounts
+                SET user_id=?
+                WHERE id=?
+            ''', (user_id, account_id))
+        self.cache.invalidate(user_id, *(previous or ()))
 
     def delete_account(self, account_id: int) -> None:
         """
@@ -105,5 +186,6 @@ class AccountDatabase:
         Parameters:
         - account_id (int): The ID of the account to delete.
         """
-        self.cursor.execute('DELETE FROM accounts WHERE user_id=?', (account_id,))
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            connection.execute('DELETE FROM accounts WHERE user_id=?', (account_id,))
+        self.cache.invalidate(account_id)
@@ -0,0 +1,297 @@
+import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from credit_card.database import TransactionDatabase
+from credit_card.dates import end_bound, normalize_date
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("The analytics package requires NumPy; install it with 'pip install numpy'.") from error
+
+# Dimensions accepted by TransactionColumns.aggregate().
+GROUP_KEYS = ('user', 'merchant', 'day')
+
+# Aggregations accepted by TransactionColumns.aggregate().
+AGGREGATIONS = ('sum', 'count', 'mean', 'percentile')
+
+
+class TransactionColumns:
+    """
+    An in-memory, column-oriented copy of the transactions table for spending reports.
+
+    Each column is a NumPy array: ids as int64, amounts as int64 cents, dates as
+    datetime64[us], and user IDs and merchants dictionary-encoded as int32 codes into
+    label lists. Group-by aggregations run as vectorized passes over those arrays.
+    Rows are appended incrementally with refresh(), which reads only the transactions
+    inserted since the last load; updates and deletes require a fresh load().
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """
+        Initializes an empty TransactionColumns object.
+
+        Parameters:
+        - capacity (int): The number of rows allocated up front; the arrays grow by doubling.
+        """
+        self.size: int = 0
+        self.last_id: int = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.amount_cents = np.empty(capacity, dtype=np.int64)
+        self.dates = np.empty(capacity, dtype='datetime64[us]')
+        self.user_codes = np.empty(capacity, dtype=np.int32)
+        self.merchant_codes = np.empty(capacity, dtype=np.int32)
+        self.users: List[str] = []
+        self.merchants: List[str] = []
+        self._user_index: Dict[str, int] = {}
+        self._merchant_index: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def load(cls, transaction_db: TransactionDatabase, chunk_size: int = 100000) -> 'TransactionColumns':
+        """
+        Loads the whole transactions table into columns.
+
+        Parameters:
+        - transaction_db (TransactionDatabase): The database to read.
+        - chunk_size (int): The number of rows read and converted per query.
+
+        Returns:
+        - TransactionColumns: The loaded columns.
+        """
+        columns = cls()
+        columns.refresh(transaction_db, chunk_size)
+        return columns
+
+    def refresh(self, transaction_db: TransactionDatabase, chunk_size: int = 100000) -> int:
+        """
+        Appends the transactions inserted since the last load or refresh.
+
+        Parameters:
+        - transaction_db (TransactionDatabase): The database to read.
+        - chunk_size (int): The number of rows read and converted per query.
+
+        Returns:
+        - int: The number of rows appended.
+        """
+        transaction_db.flush()
+        appended = 0
+        while True:
+            with transaction_db.pool.connection() as connection:
+                rows = connection.execute(
+                    'SELECT id, user_id, amount_cents, date, merchant FROM transactions WHERE id > ? ORDER BY id LIMIT ?',
+                    (self.last_id, chunk_size)).fetchall()
+            appended += self.append(rows)
+            if len(rows) < chunk_size:
+                return appended
+
+    def append(self, rows: Sequence[Tuple[int, str, int, str, str]]) -> int:
+        """
+        Appends transaction records to the columns.
+
+        Parameters:
+        - rows (Sequence[Tuple]): Records (id, user_id, amount_cents, date, merchant) in increasing id order.
+
+        Returns:
+        - int: The number of rows appended.
+        """
+        count = len(rows)
+        if not count:
+            return 0
+        self._reserve(self.size + count)
+        ids, user_ids, amounts_cents, dates, merchants = zip(*rows)
+        end = self.size + count
+        self.ids[self.size:end] = ids
+        self.amount_cents[self.size:end] = amounts_cents
+        self.dates[self.size:end] = _parse_dates(dates)
+        self.user_codes[self.size:end] = _encode(user_ids, self.users, self._user_index)
+        self.merchant_codes[self.size:end] = _encode(merchants, self.merchants, self._merchant_index)
+        self.size = end
+        self.last_id = max(self.last_id, int(ids[-1]))
+        return count
+
+    def _reserve(self, capacity: int) -> None:
+        """
+        Grows every column to hold at least the given number of rows.
+
+        Parameters:
+        - capacity (int): The number of rows needed.
+        """
+        if capacity <= len(self.ids):
+            return
+        capacity = max(capacity, 2 * len(self.ids))
+        for name in ('ids', 'amount_cents', 'dates', 'user_codes', 'merchant_codes'):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def aggregate(self, by: str, how: str = 'sum', q: float = 50.0, user_id: Optional[str] = None,
+                  start_date: Optional[Union[datetime.date, str]] = None,
+                  end_date: Optional[Union[datetime.date, str]] = None) -> Dict[str, float]:
+        """
+        Groups the transactions and aggregates their amounts.
+
+        Parameters:
+        - by (str): The grouping dimension: 'user', 'merchant' or 'day'.
+        - how (str): The aggregation: 'sum', 'count', 'mean' or 'percentile'.
+        - q (float): The percentile (0-100) computed when how is 'percentile'.
+        - user_id (str, optional): Only include this user's transactions.
+        - start_date (date or str, optional): Only include transactions on or after this date.
+        - end_date (date or str, optional): Only include transactions on or before this date; a bare
+          date ('YYYY-MM-DD' or a date object) includes that whole day, as in the database queries.
+
+        Returns:
+        - Dict[str, float]: The aggregate per group label; amounts are in currency units
+          and counts are integers. Groups without matching transactions are omitted.
+
+        Raises:
+        - ValueError: If the dimension or aggregation is unknown.
+        """
+        if by not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key: {by!r}")
+        if how not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation: {how!r}")
+        mask = self._mask(user_id, start_date, end_date)
+        codes, labels = self._group_codes(by, mask)
+        amounts = self.amount_cents[:self.size][mask]
+        counts = np.bincount(codes, minlength=len(labels))
+        present = np.flatnonzero(counts)
+        if how == 'count':
+            values = counts
+        elif how == 'percentile':
+            values = _grouped_percentile(codes, amounts, counts, q) / 100
+        else:
+            values = np.bincount(codes, weights=amounts, minlength=len(labels)) / 100
+            if how == 'mean':
+                values = values / np.maximum(counts, 1)
+        return {labels[code]: values[code].item() for code in present}
+
+    def sum(self, by: str, **filters) -> Dict[str, float]:
+        """
+        Sums amounts per group; see aggregate() for the arguments.
+        """
+        return self.aggregate(by, 'sum', **filters)
+
+    def count(self, by: str, **filters) -> Dict[str, float]:
+        """
+        Counts transactions per group; see aggregate() for the arguments.
+        """
+        return self.aggregate(by, 'count', **filters)
+
+    def mean(self, by: str, **filters) -> Dict[str, float]:
+        """
+        Averages amounts per group; see aggregate() for the arguments.
+        """
+        return self.aggregate(by, 'mean', **filters)
+
+    def percentile(self, by: str, q: float, **filters) -> Dict[str, float]:
+        """
+        Computes the q-th percentile of amounts per group with linear interpolation; see aggregate().
+        """
+        return self.aggregate(by, 'percentile', q, **filters)
+
+    def _mask(self, user_id: Optional[str], start_date: Optional[Union[datetime.date, str]],
+              end_date: Optional[Union[datetime.date, str]]) -> np.ndarray:
+        """
+        Builds the boolean row filter for aggregate().
+
+        Returns:
+        - np.ndarray: True for each loaded row that matches the filters.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        if user_id is not None:
+            code = self._user_index.get(user_id)
+            mask &= self.user_codes[:self.size] == (-1 if code is None else code)
+        if start_date:
+            mask &= self.dates[:self.size] >= np.datetime64(normalize_date(start_date), 'us')
+        if end_date:
+            mask &= self.dates[:self.size] < np.datetime64(end_bound(end_date), 'us')
+        return mask
+
+    def _group_codes(self, by: str, mask: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        """
+        Returns the group code of every selected row and the label of every code.
+
+        Parameters:
+        - by (str): The grouping dimension.
+        - mask (np.ndarray): The row filter.
+
+        Returns:
+        - Tuple[np.ndarray, List[str]]: The codes of the selected rows and the code labels.
+        """
+        if by == 'user':
+            return self.user_codes[:self.size][mask], self.users
+        if by == 'merchant':
+            return self.merchant_codes[:self.size][mask], self.merchants
+        days, codes = np.unique(self.dates[:self.size][mask].astype('datetime64[D]'), return_inverse=True)
+        return codes.astype(np.int32), [str(day) for day in days]
+
+
+def _encode(values: Iterable[str], labels: List[str], index: Dict[str, int]) -> List[int]:
+    """
+    Dictionary-encodes values, adding unseen values to the label list.
+
+    Parameters:
+    - values (Iterable[str]): The values to encode.
+    - labels (List[str]): The labels by code, extended in place.
+    - index (Dict[str, int]): The codes by label, extended in place.
+
+    Returns:
+    - List[int]: The code of every value.
+    """
+    codes = []
+    for value in values:
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(labels)
+            labels.append(value)
+        codes.append(code)
+    return codes
+
+
+def _parse_dates(dates: Sequence[str]) -> np.ndarray:
+    """
+    Parses stored date strings into datetime64[us]; unparseable values become NaT.
+
+    Parameters:
+    - dates (Sequence[str]): The stored dates.
+
+    Returns:
+    - np.ndarray: The parsed dates.
+    """
+    try:
+        return np.array(dates, dtype='datetime64[us]')
+    except ValueError:
+        parsed = np.empty(len(dates), dtype='datetime64[us]')
+        for i, date in enumerate(dates):
+            try:
+                parsed[i] = np.datetime64(date, 'us')
+            except ValueError:
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
+
+def _grouped_percentile(codes: np.ndarray, amounts: np.ndarray, counts: np.ndarray, q: float) -> np.ndarray:
+    """
+    Computes a percentile per group in one sort, with linear interpolation like numpy.percentile.
+
+    Parameters:
+    - codes (np.ndarray): The group code of every row.
+    - amounts (np.ndarray): The amount of every row.
+    - counts (np.ndarray): The number of rows per group code.
+    - q (float): The percentile, between 0 and 100.
+
+    Returns:
+    - np.ndarray: The percentile per group code; groups without rows get 0.
+    """
+    if not len(amounts):
+        return np.zeros(len(counts))
+    ordered = amounts[np.lexsort((amounts, codes))].astype(np.float64)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    last = np.minimum(starts + np.maximum(counts - 1, 0), len(ordered) - 1)
+    position = starts + (q / 100) * np.maximum(counts - 1, 0)
+    low = np.minimum(np.floor(position).astype(np.int64), last)
+    high = np.minimum(low + 1, last)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
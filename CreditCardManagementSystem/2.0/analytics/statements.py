@@ -0,0 +1,179 @@
+import csv
+import datetime
+import multiprocessing
+import os
+import sqlite3
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from credit_card.dates import normalize_date
+from credit_card.money import from_cents
+
+# The totals file written next to the statements. statement_path() percent-encodes '+',
+# so no user's statement can have this name.
+SUMMARY_FILE = '+summary.csv'
+
+# Columns of SUMMARY_FILE, one row per account; amounts are in currency units.
+SUMMARY_COLUMNS = ('user_id', 'opening_balance', 'purchases', 'refunds', 'closing_balance', 'transactions')
+
+# (user_id, opening, purchases, refunds, closing in cents, number of transactions)
+StatementSummary = Tuple[str, int, int, int, int, int]
+
+
+def statement_period(month: str) -> Tuple[str, str]:
+    """
+    Returns the stored-date bounds of a calendar month.
+
+    Parameters:
+    - month (str): The month as 'YYYY-MM'.
+
+    Returns:
+    - Tuple[str, str]: The inclusive start and exclusive end, normalized like stored dates.
+
+    Raises:
+    - ValueError: If month is not 'YYYY-MM'.
+    """
+    start = datetime.datetime.strptime(month, '%Y-%m')
+    end = (start + datetime.timedelta(days=32)).replace(day=1)
+    return normalize_date(start), normalize_date(end)
+
+
+def open_read_only(database: str) -> sqlite3.Connection:
+    """
+    Opens a connection that cannot write to the database, outside the shared pools.
+
+    Parameters:
+    - database (str): The SQLite database file.
+
+    Returns:
+    - sqlite3.Connection: The read-only connection.
+    """
+    return sqlite3.connect(f"file:{urllib.parse.quote(os.path.abspath(database))}?mode=ro", uri=True)
+
+
+def statement_path(directory: str, user_id: str) -> str:
+    """
+    Returns the file a user's statement is written to; the user ID is percent-encoded.
+    """
+    return os.path.join(directory, urllib.parse.quote(user_id, safe='') + '.csv')
+
+
+def _amount(cents: int) -> str:
+    return f"{from_cents(cents):.2f}"
+
+
+def write_statement(connection: sqlite3.Connection, user_id: str, start: str, end: str,
+                    directory: str) -> StatementSummary:
+    """
+    Writes one user's statement for a period and returns its totals.
+
+    The line items are streamed from the (user_id, date) index straight into the file,
+    so memory use does not depend on the number of transactions. The opening balance
+    comes from the daily rollups, which is exact because periods start at midnight.
+
+    Parameters:
+    - connection (sqlite3.Connection): A connection to the user's transaction database.
+    - user_id (str): The ID of the user.
+    - start (str): The inclusive start of the period, as returned by statement_period().
+    - end (str): The exclusive end of the period.
+    - directory (str): The directory the statement file is written to.
+
+    Returns:
+    - StatementSummary: The user ID, the opening balance, purchases, refunds and closing
+      balance in cents, and the number of line items.
+    """
+    opening = connection.execute('SELECT COALESCE(SUM(total_cents), 0) FROM daily_balances '
+                                 'WHERE user_id=? AND day < ?', (user_id, start[:10])).fetchone()[0]
+    purchases = refunds = count = 0
+    with open(statement_path(directory, user_id), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(('date', 'merchant', 'amount'))
+        for date, merchant, cents in connection.execute(
+                'SELECT date, merchant, amount_cents FROM transactions '
+                'WHERE user_id=? AND date >= ? AND date < ? ORDER BY date, id', (user_id, start, end)):
+            writer.writerow((date, merchant, _amount(cents)))
+            if cents > 0:
+                purchases += cents
+            else:
+                refunds += cents
+            count += 1
+        closing = opening + purchases + refunds
+        writer.writerows((('', 'opening balance', _amount(opening)), ('', 'purchases', _amount(purchases)),
+                          ('', 'refunds', _amount(refunds)), ('', 'closing balance', _amount(closing))))
+    return user_id, opening, purchases, refunds, closing, count
+
+
+def _statement_batch(database: str, user_ids: List[str], start: str, end: str,
+                     directory: str) -> List[StatementSummary]:
+    """
+    Writes the statements of a batch of users sharing one database; runs in a worker process.
+    """
+    connection = open_read_only(database)
+    try:
+        return [write_statement(connection, user_id, start, end, directory) for user_id in user_ids]
+    finally:
+        connection.close()
+
+
+def generate_statements(manager, month: str, directory: str, processes: Optional[int] = None,
+                        batch_size: int = 200,
+                        progress: Optional[Callable[[int, int], None]] = None) -> List[StatementSummary]:
+    """
+    Writes the monthly statement of every account, in parallel worker processes.
+
+    Accounts from manager.list_accounts() are grouped by the file holding their
+    transactions (one per shard with a ShardedRepository) and split into batches of
+    batch_size. Each batch runs in a worker with its own read-only connection, so
+    workers share no state and never block the manager's writers. Every account gets
+    a '<user_id>.csv' file and directory/+summary.csv lists the totals of all accounts.
+
+    Workers are spawned, so scripts calling this must guard their entry point with
+    if __name__ == '__main__'.
+
+    Parameters:
+    - manager (CreditCardManager): The manager whose accounts are billed.
+    - month (str): The statement month as 'YYYY-MM'.
+    - directory (str): The output directory, created if needed.
+    - processes (int, optional): The number of worker processes. Defaults to the number of CPUs;
+      0 writes every batch in the calling process.
+    - batch_size (int): The number of accounts per worker task.
+    - progress (Callable[[int, int], None], optional): Called with the number of accounts done
+      and the total after each batch.
+
+    Returns:
+    - List[StatementSummary]: The totals of every account, ordered by user ID.
+    """
+    start, end = statement_period(month)
+    os.makedirs(directory, exist_ok=True)
+    for shard in manager.repository.shards:
+        shard.transaction_db.flush()
+    by_database: Dict[str, List[str]] = {}
+    for user_id in manager.list_accounts():
+        by_database.setdefault(manager.repository.for_user(user_id).transaction_db.db_name, []).append(user_id)
+    batches = [(database, user_ids[i:i + batch_size])
+               for database, user_ids in by_database.items() for i in range(0, len(user_ids), batch_size)]
+    total = sum(len(user_ids) for user_ids in by_database.values())
+
+    summaries: List[StatementSummary] = []
+
+    def collect(batch: List[StatementSummary]) -> None:
+        summaries.extend(batch)
+        if progress is not None:
+            progress(len(summaries), total)
+
+    if processes == 0:
+        for database, user_ids in batches:
+            collect(_statement_batch(database, user_ids, start, end, directory))
+    elif batches:
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = [executor.submit(_statement_batch, database, user_ids, start, end, directory)
+                       for database, user_ids in batches]
+            for future in as_completed(futures):
+                collect(future.result())
+
+    summaries.sort()
+    with open(os.path.join(directory, SUMMARY_FILE), 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(SUMMARY_COLUMNS)
+        writer.writerows((user_id, *map(_amount, amounts), count) for user_id, *amounts, count in summaries)
+    return summaries
@@ -0,0 +1,63 @@
+"""
+CreditCardManager.get_account latency with lazy Account handles and with the
+previous eager construction, which opened a CreditCardDatabase and a
+TransactionDatabase for every Account.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_account_handles --accounts 1000 --lookups 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from account.account import Account
+from credit_card.database import CreditCardDatabase, TransactionDatabase
+from CreditCardManager import CreditCardManager
+from storage import pool
+
+
+class EagerAccount(Account):
+    """
+    An Account that opens its own databases on construction, as Account did before.
+    """
+
+    def __init__(self, user_id: str, repository=None) -> None:
+        super().__init__(user_id)
+        self._credit_card_db = CreditCardDatabase()
+        self._transaction_db = TransactionDatabase()
+
+
+class EagerManager(CreditCardManager):
+    def _account(self, user_id: str) -> Account:
+        return EagerAccount(user_id)
+
+
+def timed(manager: CreditCardManager, accounts: int, lookups: int) -> float:
+    start = time.perf_counter()
+    for i in range(lookups):
+        manager.get_account(f"user{i % accounts}").user_id
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def run(accounts: int, lookups: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        lazy = CreditCardManager(sweep_interval=0)
+        lazy.create_accounts(f"user{i}" for i in range(accounts))
+        eager = EagerManager(sweep_interval=0)
+        timed(lazy, accounts, accounts)  # Warm the lookup cache for both managers.
+        print(f"eager Account  {timed(eager, accounts, lookups):8.2f} us/get_account")
+        print(f"lazy Account   {timed(lazy, accounts, lookups):8.2f} us/get_account")
+        lazy.close()
+        eager.close()
+        pool.close_all()
+        os.chdir(os.path.dirname(directory))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    args = parser.parse_args()
+    run(args.accounts, args.lookups)
@@ -0,0 +1,47 @@
+"""
+Bulk account provisioning with create_accounts against one create_account call per user.
+
+The per-account path is timed on a smaller sample and extrapolated, since it
+commits and builds an Account object for every user.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_account_provisioning --accounts 1000000 --sample 2000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from CreditCardManager import CreditCardManager
+from storage import pool
+
+
+def run(accounts: int, sample: int, chunk_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        manager = CreditCardManager(sweep_interval=0)
+
+        start = time.perf_counter()
+        for i in range(sample):
+            manager.create_account(f"single{i}")
+        single = (time.perf_counter() - start) / sample
+
+        start = time.perf_counter()
+        ids = manager.create_accounts((f"bulk{i}" for i in range(accounts)), chunk_size)
+        bulk = time.perf_counter() - start
+        assert len(ids) == accounts
+
+        print(f"create_account   {1 / single:>12.0f} accounts/s  (~{single * accounts:,.0f} s for {accounts:,})")
+        print(f"create_accounts  {accounts / bulk:>12.0f} accounts/s  ({bulk:,.1f} s for {accounts:,})")
+        manager.close()
+        pool.close_all()
+        os.chdir(os.path.dirname(directory))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=1000000)
+    parser.add_argument('--sample', type=int, default=2000, help='accounts created one at a time')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    args = parser.parse_args()
+    run(args.accounts, args.sample, args.chunk_size)
@@ -0,0 +1,66 @@
+"""
+Spending reports over the transactions table: Python loops over fetched tuples
+against the NumPy columnar engine in analytics.columnar.
+
+Requires NumPy. Run from the 2.0 directory:
+    python -m benchmarks.bench_analytics --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+
+from analytics.columnar import TransactionColumns
+from credit_card.database import TransactionDatabase
+
+
+def python_report(transaction_db: TransactionDatabase) -> dict:
+    totals = defaultdict(int)
+    counts = defaultdict(int)
+    with transaction_db.pool.connection() as connection:
+        for _, _, amount_cents, date, merchant in connection.execute('SELECT * FROM transactions'):
+            totals[merchant, date[:10]] += amount_cents
+            counts[merchant] += 1
+    return {'merchant_day_totals': totals, 'merchant_counts': counts}
+
+
+def columnar_report(columns: TransactionColumns) -> dict:
+    return {'day_totals': columns.sum('day'), 'merchant_counts': columns.count('merchant'),
+            'merchant_p95': columns.percentile('merchant', 95), 'user_means': columns.mean('user')}
+
+
+def run(rows: int, users: int, merchants: int) -> None:
+    random.seed(0)
+    transaction_db = TransactionDatabase('transactions.db')
+    transaction_db.add_transactions(
+        (f"user{random.randrange(users)}", round(random.uniform(1, 500), 2),
+         f"2024-{random.randrange(1, 13):02d}-{random.randrange(1, 29):02d} 12:00:00", f"merchant{random.randrange(merchants)}")
+        for _ in range(rows))
+
+    start = time.perf_counter()
+    python_report(transaction_db)
+    python_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = TransactionColumns.load(transaction_db)
+    load_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    columnar_report(columns)
+    report_seconds = time.perf_counter() - start
+
+    print(f"python loop report     {python_seconds * 1e3:10.1f} ms")
+    print(f"columnar load          {load_seconds * 1e3:10.1f} ms  (once, then refresh())")
+    print(f"columnar 4 reports     {report_seconds * 1e3:10.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--merchants', type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        run(args.rows, args.users, args.merchants)
@@ -0,0 +1,70 @@
+"""
+Before/after benchmark for the shared connection pool.
+
+The "unpooled" run reproduces what every CreditCardManager.get_account call used
+to cost: one connection per database class, CREATE TABLE IF NOT EXISTS and a
+commit on each, followed by the lookup. The "pooled" run calls the real
+CreditCardManager.get_account with the lookup caches disabled, so every call
+reaches the database through a pooled connection.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_connection_pool --requests 2000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from CreditCardManager import CreditCardManager
+from storage.cache import configure_caches
+
+
+def unpooled_get_account(user_id: str) -> str:
+    """
+    Emulates the per-request connection churn of the pre-pool database classes.
+    """
+    accounts = sqlite3.connect('accounts.db')
+    accounts.execute('CREATE TABLE IF NOT EXISTS accounts (id INTEGER PRIMARY KEY, user_id TEXT)')
+    accounts.commit()
+    row = accounts.execute('SELECT * FROM accounts WHERE user_id=?', (user_id,)).fetchone()
+    cards = sqlite3.connect('credit_cards.db')
+    cards.execute('CREATE TABLE IF NOT EXISTS credit_cards '
+                  '(id INTEGER PRIMARY KEY, number TEXT, expiration_date TEXT, cvv TEXT)')
+    cards.commit()
+    transactions = sqlite3.connect('transactions.db')
+    transactions.execute('CREATE TABLE IF NOT EXISTS transactions '
+                         '(id INTEGER PRIMARY KEY, user_id TEXT, amount REAL, date TEXT, merchant TEXT)')
+    transactions.commit()
+    for connection in (accounts, cards, transactions):
+        connection.close()
+    return row[1]
+
+
+def run(requests: int) -> None:
+    manager = CreditCardManager()
+    manager.create_account('bench-user')
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        unpooled_get_account('bench-user')
+    unpooled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        manager.get_account('bench-user').user_id
+    pooled = time.perf_counter() - start
+
+    print(f"unpooled: {requests / unpooled:10.0f} req/s")
+    print(f"pooled:   {requests / pooled:10.0f} req/s")
+    print(f"speedup:  {unpooled / pooled:10.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    configure_caches(max_size=0)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        run(args.requests)
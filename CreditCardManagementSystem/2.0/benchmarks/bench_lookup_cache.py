@@ -0,0 +1,54 @@
+"""
+Payment throughput with and without the account and card lookup caches.
+
+Payments are spread over a set of active users, so after the first payment per
+user the account and card lookups in initiate_payment are served from memory.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_lookup_cache --users 100 --payments 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from CreditCardManager import CreditCardManager
+from storage import cache, pool
+
+CARD_NUMBER = '4111111111111111'
+
+
+def run_once(users: int, payments: int, cache_size: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        cache.configure_caches(max_size=cache_size)
+        manager = CreditCardManager(sweep_interval=0)
+        for i in range(users):
+            account = manager.create_account(f"user{i}")
+            account.add_card('4000000000000002', '2030-01-01', '000')
+            account.add_card(CARD_NUMBER, '2030-01-01', '123')
+
+        start = time.perf_counter()
+        for i in range(payments):
+            manager.initiate_payment(f"user{i % users}", CARD_NUMBER, 1.25, 'bench')
+        elapsed = time.perf_counter() - start
+
+        metrics = manager.account_db.cache.get_metrics()
+        card_metrics = manager.credit_card_db.cache.get_metrics()
+        print(f"{cache_size:>10} {payments / elapsed:>12.0f} {metrics['hits']:>12} {metrics['misses']:>12}"
+              f" {card_metrics['hits']:>10} {card_metrics['misses']:>11}")
+        manager.close()
+        pool.close_all()
+        cache.clear_all()
+        os.chdir(os.path.dirname(directory))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--payments', type=int, default=5000)
+    args = parser.parse_args()
+    print(f"{'cache size':>10} {'payments/s':>12} {'account hits':>12} {'account miss':>12}"
+          f" {'card hits':>10} {'card misses':>11}")
+    for cache_size in (0, 1024):
+        run_once(args.users, args.payments, cache_size)
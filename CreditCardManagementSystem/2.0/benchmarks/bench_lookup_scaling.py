@@ -0,0 +1,86 @@
+"""
+Lookup latency as the transactions, accounts and credit_cards tables grow.
+
+Each step grows the tables and times get_transactions_by_user_id,
+get_account_by_user_id and find_card for a user with a fixed number of rows,
+once through the indexes created by the schema migrations and once with the
+indexes bypassed (NOT INDEXED), which is what every lookup cost before the
+migrations existed. The lookup caches are disabled so every call reaches SQLite.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_lookup_scaling --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from account.database import AccountDatabase
+from credit_card.database import CreditCardDatabase, TransactionDatabase, hash_card_number
+from storage.cache import configure_caches
+
+ROWS_PER_USER = 50
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def run(sizes, repeat: int) -> None:
+    accounts = AccountDatabase('accounts.db')
+    transactions = TransactionDatabase('transactions.db')
+    cards = CreditCardDatabase('credit_cards.db')
+    loaded = 0
+    print(f"{'rows':>10} {'tx indexed':>12} {'tx scan':>12} {'acct indexed':>14} {'acct scan':>12}"
+          f" {'card indexed':>14} {'card scan':>12}  (us/lookup)")
+    for size in sizes:
+        transactions.add_transactions(
+            (f"user{i // ROWS_PER_USER}", 1.0, f"2024-01-01 00:00:{i % 60:02d}", f"merchant{i % 100}")
+            for i in range(loaded, size))
+        with accounts.pool.transaction() as connection:
+            connection.executemany('INSERT OR IGNORE INTO accounts (user_id) VALUES (?)',
+                                   ((f"user{i}",) for i in range(loaded // ROWS_PER_USER, size // ROWS_PER_USER)))
+        with cards.pool.transaction() as connection:
+            connection.executemany(
+                'INSERT INTO credit_cards (number, expiration_date, cvv, account_id, pan_hash) VALUES (?, ?, ?, ?, ?)',
+                ((f"4{i:015d}", '2030-01-01', '123', f"user{i}", hash_card_number(f"4{i:015d}"))
+                 for i in range(loaded // ROWS_PER_USER, size // ROWS_PER_USER)))
+        loaded = size
+        user_index = size // ROWS_PER_USER // 2
+        user_id, card_number = f"user{user_index}", f"4{user_index:015d}"
+
+        def scan_transactions():
+            with transactions.pool.connection() as connection:
+                connection.execute('SELECT * FROM transactions NOT INDEXED WHERE user_id=?', (user_id,)).fetchall()
+
+        def scan_accounts():
+            with accounts.pool.connection() as connection:
+                connection.execute('SELECT * FROM accounts NOT INDEXED WHERE user_id=?', (user_id,)).fetchone()
+
+        def scan_cards():
+            with cards.pool.connection() as connection:
+                connection.execute('SELECT * FROM credit_cards NOT INDEXED WHERE account_id=? AND number=?',
+                                   (user_id, card_number)).fetchone()
+
+        scan_repeat = max(1, repeat // 20)
+        print(f"{size:>10} "
+              f"{timed(lambda: transactions.get_transactions_by_user_id(user_id), repeat):>12.1f} "
+              f"{timed(scan_transactions, scan_repeat):>12.1f} "
+              f"{timed(lambda: accounts.get_account_by_user_id(user_id), repeat):>14.1f} "
+              f"{timed(scan_accounts, scan_repeat):>12.1f} "
+              f"{timed(lambda: cards.find_card(user_id, card_number), repeat):>14.1f} "
+              f"{timed(scan_cards, scan_repeat):>12.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+    configure_caches(max_size=0)
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        run(sorted(args.sizes), args.repeat)
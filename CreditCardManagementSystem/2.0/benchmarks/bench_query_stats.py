@@ -0,0 +1,61 @@
+"""
+Payment throughput with different prepared-statement cache sizes, with and without
+query instrumentation, followed by the statements that took the most time.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_query_stats --accounts 200 --payments 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from CreditCardManager import CreditCardManager
+from storage import pool
+
+
+def run_payments(accounts: int, payments: int, **options):
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        pool.configure_pools(**options)
+        manager = CreditCardManager(sweep_interval=0)
+        manager.create_accounts(f"user{i}" for i in range(accounts))
+        for i in range(accounts):
+            manager.get_account(f"user{i}").add_card(f"4000{i:012d}", '12/30', '123')
+        start = time.perf_counter()
+        for i in range(payments):
+            manager.initiate_payment(f"user{i % accounts}", f"4000{i % accounts:012d}", 1.25, 'shop')
+        rate = payments / (time.perf_counter() - start)
+        metrics = pool.get_query_stats()
+        manager.close()
+        pool.close_all()
+        os.chdir(os.path.dirname(directory))
+    return rate, metrics
+
+
+def report(metrics, top: int) -> None:
+    rows = [(database, sql, stats) for database, queries in metrics.items() for sql, stats in queries.items()]
+    rows.sort(key=lambda row: -row[2]['total_ms'])
+    print(f"{'calls':>8} {'rows':>8} {'mean ms':>8} {'max ms':>8}  statement")
+    for database, sql, stats in rows[:top]:
+        print(f"{stats['calls']:8d} {stats['rows']:8d} {stats['mean_ms']:8.3f} {stats['max_ms']:8.3f}  "
+              f"{os.path.basename(database)}: {sql[:70]}")
+
+
+def run(accounts: int, payments: int, top: int) -> None:
+    for cached_statements in (0, 128):
+        for instrument in (False, True):
+            rate, metrics = run_payments(accounts, payments, cached_statements=cached_statements,
+                                         instrument=instrument)
+            print(f"cached_statements={cached_statements:<4} instrument={instrument!s:<6} {rate:10.0f} payments/s")
+    print()
+    report(metrics, top)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=200)
+    parser.add_argument('--payments', type=int, default=20000)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+    run(args.accounts, args.payments, args.top)
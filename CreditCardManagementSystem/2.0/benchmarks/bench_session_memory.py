@@ -0,0 +1,68 @@
+"""
+Bytes per session for the previous Session class, the slotted Session kept in a
+SessionStore, and the array-backed SessionTable. Legacy sessions are held in a
+plain token dict, without the user index and expiry wheel the other two include.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_session_memory --sessions 100000
+"""
+import argparse
+import secrets
+import tracemalloc
+from datetime import datetime, timedelta
+
+from session import Session
+from session_store import SessionStore, SessionTable
+
+
+class LegacySession:
+    """
+    The session layout before the compact representation: a datetime expiry, a hex
+    token and a per-instance dict.
+    """
+
+    def __init__(self, user_id: str) -> None:
+        self.user_id = user_id
+        self.token = secrets.token_hex(16)
+        self.expiration_time = datetime.now() + timedelta(hours=1)
+        self.sessions = {}
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return after - before
+
+
+def run(count: int) -> None:
+    user_ids = [f"user{i}" for i in range(count)]
+
+    def legacy():
+        return {session.token: session for session in (LegacySession(user_id) for user_id in user_ids)}
+
+    def compact():
+        store = SessionStore()
+        for user_id in user_ids:
+            store.add(Session(user_id))
+        return store
+
+    def table():
+        sessions = SessionTable()
+        for user_id in user_ids:
+            sessions.create(user_id)
+        return sessions
+
+    for name, build in (('legacy Session + dict', legacy), ('Session + SessionStore', compact),
+                        ('SessionTable', table)):
+        print(f"{name:<24} {measure(build) / count:8.0f} bytes/session")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=100000)
+    args = parser.parse_args()
+    run(args.sessions)
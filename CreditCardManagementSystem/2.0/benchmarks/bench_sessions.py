@@ -0,0 +1,45 @@
+"""
+Session lookup and invalidation latency as the number of live sessions grows.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_sessions --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+from session import Session
+from session_store import SessionStore
+
+
+def run(sizes, lookups: int) -> None:
+    store = SessionStore()
+    tokens = []
+    print(f"{'sessions':>10} {'get (ns)':>10} {'invalidate (ns)':>16}")
+    for size in sorted(sizes):
+        while len(store) < size:
+            session = Session(f"user{len(store) % (size // 2 + 1)}")
+            store.add(session)
+            tokens.append(session.token)
+        sample = random.sample(tokens, min(lookups, len(tokens)))
+
+        start = time.perf_counter_ns()
+        for token in sample:
+            store.get(token)
+        get_ns = (time.perf_counter_ns() - start) / len(sample)
+
+        start = time.perf_counter_ns()
+        for token in sample:
+            store.invalidate(token)
+        invalidate_ns = (time.perf_counter_ns() - start) / len(sample)
+
+        tokens = [token for token in tokens if token in store]
+        print(f"{size:>10} {get_ns:>10.0f} {invalidate_ns:>16.0f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+    run(args.sizes, args.lookups)
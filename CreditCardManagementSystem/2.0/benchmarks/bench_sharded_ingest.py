@@ -0,0 +1,65 @@
+"""
+Bulk transaction ingest into one unified file versus a ShardedRepository, in-process
+and with one worker process per shard.
+
+Scaling with shard count depends on free cores: each worker is CPU bound on record
+conversion, so on an N-core machine the speedup levels off at about N.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_sharded_ingest --rows 1000000 --shards 1 2 4 8
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from CreditCardManager import CreditCardManager
+from storage import pool
+from storage.repository import Repository
+from storage.sharding import ShardedRepository
+
+
+def records(rows: int, accounts: int):
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(rows):
+        yield f"user{i % accounts}", 10.0 + i % 50, start + datetime.timedelta(seconds=i), f"merchant{i % 20}"
+
+
+def ingest(repository, rows: int, accounts: int) -> float:
+    manager = CreditCardManager(sweep_interval=0, repository=repository)
+    manager.create_accounts(f"user{i}" for i in range(accounts))
+    start = time.perf_counter()
+    if isinstance(repository, ShardedRepository):
+        inserted = repository.add_transactions(records(rows, accounts))
+    else:
+        inserted = repository.transaction_db.add_transactions(records(rows, accounts))
+    elapsed = time.perf_counter() - start
+    assert inserted == rows and len(manager.list_accounts()) == accounts
+    manager.close()
+    repository.close()
+    return rows / elapsed
+
+
+def run(rows: int, accounts: int, shard_counts) -> None:
+    print(f"{rows} transactions, {accounts} accounts, {os.cpu_count()} cores")
+    with tempfile.TemporaryDirectory() as directory:
+        baseline = ingest(Repository.unified(os.path.join(directory, 'bank.db')), rows, accounts)
+        print(f"{'unified file':28} {baseline:12.0f} rows/s")
+        for shards in shard_counts:
+            for processes in (0, shards):
+                repository = ShardedRepository(shards, os.path.join(directory, f'shards{shards}-{processes}'),
+                                               processes)
+                rate = ingest(repository, rows, accounts)
+                label = f"{shards} shards, {processes or 'no'} workers"
+                print(f"{label:28} {rate:12.0f} rows/s  {rate / baseline:5.2f}x")
+        pool.close_all()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=400000)
+    parser.add_argument('--accounts', type=int, default=10000)
+    parser.add_argument('--shards', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    run(args.rows, args.accounts, args.shards)
@@ -0,0 +1,51 @@
+"""
+Time to the first statement page as one user's transaction history grows.
+
+For each history size the script times reading the full history with
+get_transactions_by_user_id against reading the first page and a page deep in
+the history with keyset pagination (get_transactions_page).
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_statement_paging --sizes 1000 10000 100000 --page-size 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from credit_card.database import TransactionDatabase
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def run(sizes, page_size: int, repeat: int) -> None:
+    transactions = TransactionDatabase('transactions.db')
+    loaded = 0
+    print(f"{'history':>10} {'fetchall':>12} {'first page':>12} {'deep page':>12}  (ms)")
+    for size in sizes:
+        transactions.add_transactions(
+            ('statement', 1.0, f"2024-{i // 28 % 12 + 1:02d}-{i % 28 + 1:02d} {i % 86400 // 3600:02d}:00:00",
+             f"merchant{i % 100}")
+            for i in range(loaded, size))
+        loaded = size
+        middle = transactions.get_transactions_page('statement', page_size=size // 2)[-1]
+        print(f"{size:>10} "
+              f"{timed(lambda: transactions.get_transactions_by_user_id('statement'), max(1, repeat // 10)):>12.2f} "
+              f"{timed(lambda: transactions.get_transactions_page('statement', page_size=page_size), repeat):>12.2f} "
+              f"{timed(lambda: transactions.get_transactions_page('statement', middle[3], middle[0], page_size), repeat):>12.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        run(sorted(args.sizes), args.page_size, args.repeat)
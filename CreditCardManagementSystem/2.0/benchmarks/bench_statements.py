@@ -0,0 +1,74 @@
+"""
+Monthly statement generation: the sequential Account.get_transactions/get_balance_v2
+loop versus analytics.statements.generate_statements in-process and in worker processes.
+
+The fixture spans the year before 2025-01-01 and statements are written for --month.
+Worker scaling depends on free cores; the job is CPU bound on row formatting.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_statements --accounts 10000 --transactions 1000000 --processes 2 4
+"""
+import argparse
+import csv
+import datetime
+import os
+import tempfile
+import time
+
+from CreditCardManager import CreditCardManager
+from analytics.statements import generate_statements, statement_path, statement_period
+from benchmarks import fixtures
+from storage import pool
+from storage.repository import Repository
+
+
+def sequential(manager: CreditCardManager, month: str, directory: str) -> None:
+    """
+    The loop the batch job replaces: every account's full history, filtered in Python.
+    """
+    start, end = statement_period(month)
+    # get_balance_v2 takes an inclusive end; a bare last day covers the same window as date < end.
+    last_day = datetime.date.fromisoformat(end[:10]) - datetime.timedelta(days=1)
+    os.makedirs(directory, exist_ok=True)
+    for user_id in manager.list_accounts():
+        account = manager.get_account(user_id)
+        balance = account.get_balance_v2(end_date=last_day)
+        with open(statement_path(directory, user_id), 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('date', 'merchant', 'amount'))
+            writer.writerows((date, merchant, f"{amount:.2f}")
+                             for _, _, amount, date, merchant in account.get_transactions() if start <= date < end)
+            writer.writerow(('', 'closing balance', f"{balance:.2f}"))
+
+
+def run(accounts: int, transactions: int, month: str, process_counts) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        paths = fixtures.database_paths(directory)
+        fixtures.materialize(directory, accounts=accounts, transactions=transactions)
+        manager = CreditCardManager(sweep_interval=0, repository=Repository(*paths))
+        print(f"{accounts} accounts, {transactions} transactions, {os.cpu_count()} cores")
+
+        start = time.perf_counter()
+        sequential(manager, month, os.path.join(directory, 'sequential'))
+        baseline = time.perf_counter() - start
+        print(f"{'sequential loop':24} {baseline:8.2f} s  {accounts / baseline:10.0f} accounts/s")
+
+        for processes in [0] + list(process_counts):
+            output = os.path.join(directory, f'statements{processes}')
+            start = time.perf_counter()
+            generate_statements(manager, month, output, processes)
+            elapsed = time.perf_counter() - start
+            label = f"batch, {processes or 'no'} workers"
+            print(f"{label:24} {elapsed:8.2f} s  {accounts / elapsed:10.0f} accounts/s  {baseline / elapsed:5.2f}x")
+        manager.close()
+        pool.close_all()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--accounts', type=int, default=5000)
+    parser.add_argument('--transactions', type=int, default=500000)
+    parser.add_argument('--month', default='2024-12')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    args = parser.parse_args()
+    run(args.accounts, args.transactions, args.month, args.processes)
@@ -0,0 +1,53 @@
+"""
+Ingest benchmark for TransactionDatabase: per-row commits versus group commit
+versus the executemany bulk API.
+
+Run from the 2.0 directory:
+    python -m benchmarks.bench_transaction_ingest --rows 20000
+"""
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+from credit_card.database import TransactionDatabase
+
+
+def records(count: int):
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(count):
+        yield (f"user{i % 100}", 10.0 + i % 50, str(start + datetime.timedelta(minutes=i)), f"merchant{i % 20}")
+
+
+def run(rows: int, batch_size: int) -> None:
+    per_row = TransactionDatabase('per_row.db')
+    start = time.perf_counter()
+    for record in records(rows // 10):
+        per_row.add_transaction(*record)
+    elapsed = time.perf_counter() - start
+    print(f"per-row commit: {rows // 10 / elapsed:10.0f} rows/s  ({rows // 10} rows)")
+
+    batched = TransactionDatabase('batched.db', batch_size=batch_size)
+    start = time.perf_counter()
+    for record in records(rows):
+        batched.add_transaction(*record)
+    batched.flush()
+    elapsed = time.perf_counter() - start
+    print(f"group commit:   {rows / elapsed:10.0f} rows/s  (batch_size={batch_size})")
+
+    bulk = TransactionDatabase('bulk.db')
+    start = time.perf_counter()
+    bulk.add_transactions(records(rows))
+    elapsed = time.perf_counter() - start
+    print(f"executemany:    {rows / elapsed:10.0f} rows/s")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        run(args.rows, args.batch_size)
@@ -0,0 +1,355 @@
+"""
+Seeded generator that bulk-loads accounts, Luhn-valid cards and Zipf-distributed
+transactions into the 2.0 SQLite schema.
+
+The databases are migrated through Repository first, so the files match what the
+application creates. Each table is then filled with executemany in a single
+transaction on a plain connection with synchronous=OFF. The table's indexes and
+triggers are dropped for the load and recreated afterwards. The daily_balances
+rollup is summed in memory as the transactions stream past, instead of by a
+trigger per row, and balances is then summed from daily_balances.
+The same arguments and --seed always produce the same rows. With --cache-dir, the
+first run keeps a snapshot of the files and later runs with the same arguments just
+copy it.
+
+Users, merchants, price points and days are drawn from Zipf distributions with
+exponent --zipf. A few users and merchants account for most transactions, small
+amounts are far more common than large ones, and recent days are busier than old
+ones.
+
+Run from the 2.0 directory:
+    python -m benchmarks.fixtures --directory /tmp/warm --accounts 1000000 --transactions 10000000
+    python -m benchmarks.fixtures --directory /tmp/run1 --cache-dir ~/.cache/ccms-fixtures
+"""
+import argparse
+import calendar
+import datetime
+import hashlib
+import itertools
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from account.database import ACCOUNT_MIGRATIONS
+from credit_card.database import CREDIT_CARD_MIGRATIONS, TRANSACTION_MIGRATIONS, hash_card_number
+from storage.repository import Repository
+
+# Part of the snapshot key; bump it whenever the generated rows change.
+GENERATOR_VERSION = 1
+
+# Card networks as (prefixes, number length, share of cards).
+CARD_NETWORKS = ((('4',), 16, 0.5), (('51', '52', '53', '54', '55'), 16, 0.35), (('34', '37'), 15, 0.15))
+
+# Multiplier that scatters sequential card serials over the account-number space;
+# being odd and not a multiple of 5 makes it a bijection modulo any power of ten.
+SERIAL_SCRAMBLE = 6_700_417_003
+
+# Transaction price points in cents, from $1 to $2,000 on a log scale; rank 1 (cheapest) is the most common.
+PRICE_POINTS = sorted({round(100 * 2000 ** (i / 199)) for i in range(200)})
+
+# Rows generated per executemany batch. Fixed, because the random draws depend on it.
+CHUNK = 50000
+
+# 'HH:MM:SS' for every second of a day.
+TIMES_OF_DAY = [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}" for second in range(86400)]
+
+# Maps a digit in a doubled Luhn position to its contribution (2d, minus 9 above 9).
+_DOUBLED = str.maketrans('0123456789', '0246813579')
+
+
+def luhn_check_digit(partial: str) -> str:
+    """
+    Returns the digit that makes partial + digit pass the Luhn check.
+
+    Parameters:
+    - partial (str): The card number without its check digit.
+
+    Returns:
+    - str: The check digit.
+    """
+    reverse = partial[::-1]
+    total = sum(reverse[::2].translate(_DOUBLED).encode()) + sum(reverse[1::2].encode()) - 48 * len(partial)
+    return str(-total % 10)
+
+
+def is_luhn_valid(number: str) -> bool:
+    """
+    Checks a card number against its Luhn check digit.
+    """
+    return number.isdigit() and luhn_check_digit(number[:-1]) == number[-1]
+
+
+def zipf_cumulative_weights(count: int, exponent: float) -> List[float]:
+    """
+    Returns cumulative Zipf weights of ranks 1..count, for random.choices(cum_weights=...).
+    """
+    return list(itertools.accumulate(1 / rank ** exponent for rank in range(1, count + 1)))
+
+
+_NETWORK_WEIGHTS = list(itertools.accumulate(network[2] for network in CARD_NETWORKS))
+
+
+def card_number(rng: random.Random, serial: int) -> str:
+    """
+    Returns a Luhn-valid card number that is unique for each serial.
+    """
+    draw = rng.random() * _NETWORK_WEIGHTS[-1]
+    prefixes, length, _ = next(network for network, bound in zip(CARD_NETWORKS, _NETWORK_WEIGHTS) if draw < bound)
+    prefix = prefixes[int(rng.random() * len(prefixes))]
+    digits = length - len(prefix) - 1
+    body = prefix + f"{serial * SERIAL_SCRAMBLE % 10 ** digits:0{digits}d}"
+    return body + luhn_check_digit(body)
+
+
+def user_ids(accounts: int) -> List[str]:
+    return [f"user{i:08d}" for i in range(accounts)]
+
+
+def account_rows(accounts: int) -> Iterator[Tuple[str]]:
+    return ((user_id,) for user_id in user_ids(accounts))
+
+
+def card_rows(rng: random.Random, accounts: int, cards_per_account: int,
+              today: datetime.date) -> Iterator[Tuple[str, str, str, str, str]]:
+    """
+    Yields (number, expiration_date, cvv, account_id, pan_hash) rows, cards_per_account per account.
+    """
+    # The last day of each of the next 72 months.
+    expirations = [f"{year}-{month:02d}-{calendar.monthrange(year, month)[1]:02d} 00:00:00"
+                   for year in range(today.year, today.year + 6) for month in range(1, 13)]
+    serial = 0
+    for user_id in user_ids(accounts):
+        for _ in range(cards_per_account):
+            number = card_number(rng, serial)
+            serial += 1
+            expiration = expirations[int(rng.random() * len(expirations))]
+            # American Express numbers (15 digits) have four-digit security codes.
+            cvv = f"{int(rng.random() * 10000):04d}" if len(number) == 15 else f"{int(rng.random() * 1000):03d}"
+            yield number, expiration, cvv, user_id, hash_card_number(number)
+
+
+def transaction_rows(rng: random.Random, accounts: int, transactions: int, merchants: int, days: int,
+                     end_date: datetime.date, exponent: float,
+                     refund_rate: float) -> Iterator[Tuple[str, int, str, str]]:
+    """
+    Yields (user_id, amount_cents, date, merchant) rows in the stored format.
+    """
+    users = user_ids(accounts)
+    rng.shuffle(users)  # So the heaviest users are spread over the id range.
+    user_weights = zipf_cumulative_weights(accounts, exponent)
+    merchant_names = [f"merchant{i:05d}" for i in range(merchants)]
+    merchant_weights = zipf_cumulative_weights(merchants, exponent)
+    price_weights = zipf_cumulative_weights(len(PRICE_POINTS), exponent)
+    day_names = [(end_date - datetime.timedelta(days=i)).isoformat() for i in range(1, days + 1)]
+    day_weights = zipf_cumulative_weights(days, exponent / 2)
+    for start in range(0, transactions, CHUNK):
+        size = min(CHUNK, transactions - start)
+        chunk_users = rng.choices(users, cum_weights=user_weights, k=size)
+        chunk_merchants = rng.choices(merchant_names, cum_weights=merchant_weights, k=size)
+        chunk_prices = rng.choices(PRICE_POINTS, cum_weights=price_weights, k=size)
+        chunk_days = rng.choices(day_names, cum_weights=day_weights, k=size)
+        random_ = rng.random
+        for user_id, merchant, price, day in zip(chunk_users, chunk_merchants, chunk_prices, chunk_days):
+            cents = price + int(random_() * 100) - 50
+            yield (user_id, -cents if random_() < refund_rate else cents,
+                   f"{day} {TIMES_OF_DAY[int(random_() * 86400)]}.{int(random_() * 1000000):06d}", merchant)
+
+
+def _daily_totals(rows: Iterator[Tuple[str, int, str, str]],
+                  totals: Dict[Tuple[str, str], List[int]]) -> Iterator[Tuple[str, int, str, str]]:
+    """
+    Passes transaction rows through while summing [total_cents, count] per (user_id, day) into totals.
+    """
+    for row in rows:
+        key = (row[0], row[2][:10])
+        entry = totals.get(key)
+        if entry is None:
+            totals[key] = [row[1], 1]
+        else:
+            entry[0] += row[1]
+            entry[1] += 1
+        yield row
+
+
+def _load_rollups(connection: sqlite3.Connection, totals: Dict[Tuple[str, str], List[int]]) -> None:
+    """
+    Fills daily_balances from the summed totals and balances from daily_balances.
+    """
+    connection.executemany('INSERT INTO daily_balances (user_id, day, total_cents, transaction_count) '
+                           'VALUES (?, ?, ?, ?)', (key + tuple(value) for key, value in totals.items()))
+    connection.execute('''
+        INSERT INTO balances (user_id, balance_cents, transaction_count)
+        SELECT user_id, SUM(total_cents), SUM(transaction_count) FROM daily_balances GROUP BY user_id
+    ''')
+
+
+def _bulk_load(database: str, table: str, columns: Sequence[str], rows: Iterator[tuple],
+               finish: Optional[Callable[[sqlite3.Connection], None]] = None) -> int:
+    """
+    Inserts rows into an empty table with its indexes and triggers dropped, then
+    recreates them and calls finish(connection), all in one transaction.
+
+    Raises:
+    - ValueError: If the table already has rows.
+    """
+    connection = sqlite3.connect(database, isolation_level=None)
+    try:
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute('PRAGMA cache_size = -262144')
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if connection.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone():
+                raise ValueError(f"{database}: table {table} is not empty")
+            schema = connection.execute(
+                "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = ? AND type IN ('index', 'trigger') "
+                "AND sql IS NOT NULL", (table,)).fetchall()
+            for kind, name, _ in schema:
+                connection.execute(f'DROP {kind.upper()} {name}')
+            placeholders = ', '.join('?' for _ in columns)
+            count = 0
+            while True:
+                chunk = list(itertools.islice(rows, CHUNK))
+                if not chunk:
+                    break
+                connection.executemany(f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({placeholders})', chunk)
+                count += len(chunk)
+            for _, _, sql in schema:
+                connection.execute(sql)
+            if finish is not None:
+                finish(connection)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return count
+    finally:
+        connection.close()
+
+
+def generate(accounts_db: str = 'accounts.db', credit_cards_db: str = 'credit_cards.db',
+             transactions_db: str = 'transactions.db', accounts: int = 10000, cards_per_account: int = 2,
+             transactions: int = 100000, merchants: int = 5000, days: int = 365,
+             end_date: Optional[datetime.date] = None, exponent: float = 1.1, refund_rate: float = 0.02,
+             seed: int = 42) -> Dict[str, int]:
+    """
+    Migrates the databases and bulk-loads generated accounts, cards and transactions.
+
+    Parameters:
+    - accounts_db (str): The accounts database; all three may be the same file.
+    - credit_cards_db (str): The credit cards database.
+    - transactions_db (str): The transactions database.
+    - accounts (int): The number of accounts.
+    - cards_per_account (int): The number of cards owned by every account.
+    - transactions (int): The number of transactions.
+    - merchants (int): The number of distinct merchants.
+    - days (int): The number of days before end_date the transactions fall in.
+    - end_date (date, optional): The day after the last transaction; defaults to 2025-01-01.
+    - exponent (float): The Zipf exponent of users, merchants and price points; days use half of it.
+    - refund_rate (float): The share of transactions that are refunds (negative amounts).
+    - seed (int): The random seed.
+
+    Returns:
+    - Dict[str, int]: The number of rows loaded per table.
+
+    Raises:
+    - ValueError: If a target table already has rows.
+    """
+    end_date = end_date or datetime.date(2025, 1, 1)
+    Repository(accounts_db, credit_cards_db, transactions_db).close()
+    rng = random.Random(seed)
+    totals: Dict[Tuple[str, str], List[int]] = {}
+    return {
+        'accounts': _bulk_load(accounts_db, 'accounts', ('user_id',), account_rows(accounts)),
+        'credit_cards': _bulk_load(
+            credit_cards_db, 'credit_cards', ('number', 'expiration_date', 'cvv', 'account_id', 'pan_hash'),
+            card_rows(rng, accounts, cards_per_account, end_date)),
+        'transactions': _bulk_load(
+            transactions_db, 'transactions', ('user_id', 'amount_cents', 'date', 'merchant'),
+            _daily_totals(transaction_rows(rng, accounts, transactions, merchants, days, end_date, exponent,
+                                           refund_rate), totals),
+            finish=lambda connection: _load_rollups(connection, totals)),
+    }
+
+
+def database_paths(directory: str, unified: bool = False) -> List[str]:
+    """
+    Returns the accounts, credit cards and transactions database paths in a directory.
+    """
+    if unified:
+        return [os.path.join(directory, 'bank.db')] * 3
+    return [os.path.join(directory, name) for name in ('accounts.db', 'credit_cards.db', 'transactions.db')]
+
+
+def materialize(directory: str, unified: bool = False, cache_dir: Optional[str] = None, **options) -> Dict[str, int]:
+    """
+    Creates fixture databases in a directory, copying them from a snapshot in cache_dir
+    if one was generated with the same options, and generating that snapshot otherwise.
+
+    Parameters:
+    - directory (str): Where to create the database files; it must not contain them yet.
+    - unified (bool): Create a single bank.db instead of one file per table group.
+    - cache_dir (str, optional): The snapshot directory; None always generates in place.
+    - **options: Keyword arguments accepted by generate().
+
+    Returns:
+    - Dict[str, int]: The number of rows per table.
+
+    Raises:
+    - ValueError: If the directory already holds a database file.
+    """
+    paths = database_paths(directory, unified)
+    if any(os.path.exists(path) for path in paths):
+        raise ValueError(f"{directory} already holds fixture databases")
+    os.makedirs(directory, exist_ok=True)
+    if cache_dir is None:
+        return generate(*paths, **options)
+    schema = [len(ACCOUNT_MIGRATIONS), len(CREDIT_CARD_MIGRATIONS), len(TRANSACTION_MIGRATIONS)]
+    key = json.dumps({'generator': GENERATOR_VERSION, 'schema': schema, 'unified': unified, **options},
+                     sort_keys=True, default=str)
+    snapshot = os.path.join(cache_dir, hashlib.sha256(key.encode()).hexdigest()[:16])
+    if not os.path.exists(snapshot):
+        os.makedirs(cache_dir, exist_ok=True)
+        building = tempfile.mkdtemp(dir=cache_dir)
+        counts = generate(*database_paths(building, unified), **options)
+        with open(os.path.join(building, 'counts.json'), 'w') as file:
+            json.dump(counts, file)
+        try:
+            os.rename(building, snapshot)
+        except OSError:  # Another process finished the same snapshot first.
+            shutil.rmtree(building)
+    for source, target in zip(database_paths(snapshot, unified), paths):
+        if not os.path.exists(target):
+            shutil.copyfile(source, target)
+    with open(os.path.join(snapshot, 'counts.json')) as file:
+        return json.load(file)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--directory', default='.', help='Where to create the database files.')
+    parser.add_argument('--unified', action='store_true', help='Load all tables into one bank.db.')
+    parser.add_argument('--accounts', type=int, default=10000)
+    parser.add_argument('--cards-per-account', type=int, default=2)
+    parser.add_argument('--transactions', type=int, default=100000)
+    parser.add_argument('--merchants', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--end-date', type=datetime.date.fromisoformat, default=None)
+    parser.add_argument('--zipf', type=float, default=1.1)
+    parser.add_argument('--refund-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-dir', help='Keep and reuse snapshots of generated databases here.')
+    args = parser.parse_args()
+    start = time.perf_counter()
+    counts = materialize(args.directory, args.unified, args.cache_dir, accounts=args.accounts,
+                         cards_per_account=args.cards_per_account, transactions=args.transactions,
+                         merchants=args.merchants, days=args.days, end_date=args.end_date, exponent=args.zipf,
+                         refund_rate=args.refund_rate, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(', '.join(f"{count} {table}" for table, count in counts.items()) +
+          f" in {elapsed:.1f} s ({total / elapsed:.0f} rows/s)")
@@ -0,0 +1,249 @@
+"""
+Benchmark harness for the CreditCardManager hot paths across the 1.0, 1.5 and 2.0 trees.
+
+For every tree and every --rows scale, a worker process seeds fresh SQLite files
+in a temporary directory with --accounts accounts and --rows transactions, then
+times create_account, create_session, get_session, add_card, add_transaction,
+get_transactions, get_balance_v2 and initiate_payment through the tree's public
+API. It reports p50/p99 latency and ops/sec per operation. Operations a tree does
+not have are reported as unsupported. Each tree runs in its own interpreter,
+because all trees use the same top-level module names.
+
+Results are written as JSON with --output. With --baseline, they are compared
+against an earlier output, and the exit status is 1 if any p50 regressed by more
+than --tolerance.
+
+Run from the 2.0 directory:
+    python -m benchmarks.harness --rows 1000 100000 --output results.json
+    python -m benchmarks.harness --trees ../1.5 . --rows 10000000 --accounts 100000 --max-seconds 5
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+OPERATIONS = ('create_account', 'create_session', 'get_session', 'add_card', 'add_transaction',
+              'get_transactions', 'get_balance_v2', 'initiate_payment')
+
+# Operations called on an Account rather than on the CreditCardManager.
+ACCOUNT_OPERATIONS = ('add_card', 'add_transaction', 'get_transactions', 'get_balance_v2')
+
+# Accounts the per-account operations cycle through.
+SAMPLE_ACCOUNTS = 100
+
+
+def percentile(samples: List[int], q: float) -> int:
+    """
+    Returns the nearest-rank percentile of sorted samples.
+    """
+    return samples[min(len(samples) - 1, int(round(q / 100 * (len(samples) - 1))))]
+
+
+def measure(operation: Callable[[int], Any], ops: int, max_seconds: float) -> Dict[str, Any]:
+    """
+    Calls operation(i) for i in range(ops), stopping early once max_seconds have passed.
+
+    Returns:
+    - Dict[str, Any]: The number of calls, ops/sec and p50/p99/max latency in microseconds.
+    """
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(ops):
+        start = time.perf_counter_ns()
+        operation(i)
+        samples.append(time.perf_counter_ns() - start)
+        if time.perf_counter() > deadline:
+            break
+    total = sum(samples)
+    samples.sort()
+    return {'ops': len(samples), 'ops_per_sec': len(samples) / (total / 1e9) if total else 0.0,
+            'p50_us': percentile(samples, 50) / 1000, 'p99_us': percentile(samples, 99) / 1000,
+            'max_us': samples[-1] / 1000}
+
+
+def transaction_records(count: int, accounts: int):
+    start = datetime.datetime(2024, 1, 1)
+    for i in range(count):
+        yield (f"user{i % accounts}", 10.0 + i % 50, str(start + datetime.timedelta(seconds=i)), f"merchant{i % 20}")
+
+
+def seed(manager, transaction_db, accounts: int, rows: int) -> None:
+    """
+    Fills the account and transaction tables through the fastest path the tree offers:
+    its bulk APIs if it has them, else executemany on its own connection.
+    """
+    user_ids = [f"user{i}" for i in range(accounts)]
+    if hasattr(manager, 'create_accounts'):
+        manager.create_accounts(user_ids)
+    else:
+        manager.account_db.connection.executemany('INSERT INTO accounts (user_id) VALUES (?)',
+                                                  ((user_id,) for user_id in user_ids))
+        manager.account_db.connection.commit()
+    records = transaction_records(rows, accounts)
+    if hasattr(transaction_db, 'add_transactions'):
+        transaction_db.add_transactions(records)
+    else:
+        transaction_db.connection.executemany(
+            'INSERT INTO transactions (user_id, amount, date, merchant) VALUES (?, ?, ?, ?)', records)
+        transaction_db.connection.commit()
+
+
+def run_tree(tree: str, rows: int, accounts: int, ops: int, max_seconds: float) -> Dict[str, Any]:
+    """
+    Seeds and benchmarks one tree in the current directory; runs inside a worker process.
+    """
+    sys.path.insert(0, tree)
+    from CreditCardManager import CreditCardManager
+    from credit_card.database import TransactionDatabase
+
+    manager = CreditCardManager()
+    transaction_db = getattr(manager, 'transaction_db', None) or TransactionDatabase()
+    start = time.perf_counter()
+    seed(manager, transaction_db, accounts, rows)
+    seed_seconds = time.perf_counter() - start
+
+    sample = [f"user{i}" for i in range(min(accounts, SAMPLE_ACCOUNTS))]
+    handles = [manager.get_account(user_id) for user_id in sample]
+    tokens: List[str] = []
+    when = datetime.datetime(2025, 1, 1)
+
+    def card_number(i: int) -> str:
+        return f"4000{i:012d}"
+
+    def pay(i: int) -> None:
+        index = i % len(sample)
+        if hasattr(handles[index], 'find_card'):
+            # Payments are checked against the paying account's own cards.
+            number = card_number(index)
+        else:
+            # 1.5 always charges the card with id 2, whoever owns it.
+            number = card_number(1)
+        # Both trees look the paying account up by user ID.
+        if not manager.initiate_payment(sample[index], number, 1.25, 'merchant0'):
+            raise RuntimeError(f"initiate_payment failed for {sample[index]}")
+
+    benchmarks = {
+        'create_account': lambda i: manager.create_account(f"bench{i}"),
+        'create_session': lambda i: tokens.append(manager.create_session(sample[i % len(sample)])),
+        'get_session': lambda i: manager.get_session(tokens[i % len(tokens)]),
+        'add_card': lambda i: handles[i % len(sample)].add_card(card_number(i), '2030-12-31', '123'),
+        'add_transaction': lambda i: handles[i % len(sample)].add_transaction(
+            12.5, str(when + datetime.timedelta(seconds=i)), 'merchant1'),
+        'get_transactions': lambda i: handles[i % len(sample)].get_transactions(),
+        'get_balance_v2': lambda i: handles[i % len(sample)].get_balance_v2(),
+        'initiate_payment': pay,
+    }
+    results: Dict[str, Any] = {}
+    for name in OPERATIONS:
+        if not hasattr(handles[0] if name in ACCOUNT_OPERATIONS else manager, name):
+            results[name] = {'unsupported': True}
+            continue
+        # add_card runs before initiate_payment, so card i belongs to sample[i % len(sample)].
+        count = max(ops, len(sample)) if name == 'add_card' else ops
+        results[name] = measure(benchmarks[name], count, max_seconds if name != 'add_card' else float('inf'))
+    return {'tree': os.path.basename(os.path.normpath(tree)), 'path': tree, 'rows': rows, 'accounts': accounts,
+            'seed_seconds': seed_seconds, 'operations': results}
+
+
+def run_worker(tree: str, rows: int, accounts: int, ops: int, max_seconds: float) -> Dict[str, Any]:
+    """
+    Runs run_tree() for one tree and scale in a fresh interpreter and temporary directory.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        result_file = os.path.join(directory, 'result.json')
+        workdir = os.path.join(directory, 'data')
+        os.mkdir(workdir)
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', result_file, '--trees', tree,
+                        '--rows', str(rows), '--accounts', str(accounts), '--ops', str(ops),
+                        '--max-seconds', str(max_seconds)],
+                       cwd=workdir, check=True, stdout=subprocess.DEVNULL)
+        with open(result_file) as file:
+            return json.load(file)
+
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    for rows in sorted({result['rows'] for result in results}):
+        batch = [result for result in results if result['rows'] == rows]
+        print(f"\n{rows} transactions, {batch[0]['accounts']} accounts")
+        print(f"{'operation':18}" + ''.join(f"{result['tree'] + ' p50/p99 us':>24}{'ops/s':>10}" for result in batch))
+        for name in OPERATIONS:
+            line = f"{name:18}"
+            for result in batch:
+                stats = result['operations'][name]
+                if stats.get('unsupported'):
+                    line += f"{'unsupported':>24}{'':>10}"
+                else:
+                    line += f"{stats['p50_us']:>12.1f} /{stats['p99_us']:>10.1f}{stats['ops_per_sec']:>10.0f}"
+            print(line)
+
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> bool:
+    """
+    Prints the p50 ratio against a baseline run and returns whether nothing regressed.
+    """
+    previous = {(result['tree'], result['rows']): result['operations'] for result in baseline}
+    ok = True
+    print(f"\nagainst baseline (p50 ratio, >{1 + tolerance:.2f} is a regression)")
+    for result in results:
+        before = previous.get((result['tree'], result['rows']))
+        if before is None:
+            continue
+        for name, stats in result['operations'].items():
+            old = before.get(name)
+            if stats.get('unsupported') or not old or old.get('unsupported') or not old['p50_us']:
+                continue
+            ratio = stats['p50_us'] / old['p50_us']
+            regressed = ratio > 1 + tolerance
+            ok &= not regressed
+            print(f"{result['tree']:>6} {result['rows']:>10} {name:18} {ratio:6.2f}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def default_trees() -> List[str]:
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return [os.path.join(root, name) for name in ('1.0', '1.5', '2.0')
+            if os.path.exists(os.path.join(root, name, 'CreditCardManager.py'))]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--trees', nargs='+', default=None, help='Tree directories; defaults to 1.0, 1.5 and 2.0.')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--accounts', type=int, default=1000)
+    parser.add_argument('--ops', type=int, default=1000, help='Calls per operation.')
+    parser.add_argument('--max-seconds', type=float, default=10.0, help='Time budget per operation.')
+    parser.add_argument('--output', help='Write the results to this JSON file.')
+    parser.add_argument('--baseline', help='Compare against the JSON output of an earlier run.')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        result = run_tree(os.path.abspath(args.trees[0]), args.rows[0], args.accounts, args.ops, args.max_seconds)
+        with open(args.worker, 'w') as file:
+            json.dump(result, file)
+        return 0
+
+    results = [run_worker(os.path.abspath(tree), rows, args.accounts, args.ops, args.max_seconds)
+               for rows in args.rows for tree in args.trees or default_trees()]
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version,
+                       'platform': platform.platform(), 'created': datetime.datetime.now().isoformat(),
+                       'results': results}, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            return 0 if compare(results, json.load(file)['results'], args.tolerance) else 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
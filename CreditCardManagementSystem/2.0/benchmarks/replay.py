@@ -0,0 +1,313 @@
+"""
+Replays JSONL traffic captures against CreditCardManager and reports throughput,
+latency percentiles and error counts.
+
+Each line of a capture is one request:
+
+    {"t": 0.125, "op": "initiate_payment", "user_id": "user7", "card_number": "4111111111111111",
+     "amount": 12.5, "merchant": "shop"}
+
+"op" names a key of OPERATIONS, and the other fields are its arguments. "t" is the
+optional offset in seconds from the start of the capture. Session operations take a
+user_id and use the token of that user's latest create_session, because captured
+tokens cannot be replayed. Lines without an "op" are counted as skipped.
+
+The replay is open loop: every request has an intended start time, from --rate
+(requests per second) or else from the "t" offsets divided by --speed. Latency is
+measured from that intended start, so queueing behind slow requests is counted.
+With --rate 0, or without "t" offsets, requests are sent as fast as possible and
+latency is the service time. The
+requests are spread over --threads worker threads in each of --processes
+processes. Requests of one user always go to the same worker, so they run in
+capture order.
+
+Run from the 2.0 directory:
+    python -m benchmarks.replay capture.jsonl --threads 8 --rate 500
+    python -m benchmarks.replay capture.jsonl --processes 4 --threads 4 --speed 2 --json report.json
+"""
+import argparse
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Request handlers by op: each takes the manager, the worker's session tokens by
+# user ID, and the record, and returns False when the call reports a failure.
+OPERATIONS: Dict[str, Callable[[Any, Dict[str, str], Dict[str, Any]], bool]] = {
+    'create_account': lambda manager, tokens, r: manager.create_account(r['user_id']) is not None,
+    'get_account': lambda manager, tokens, r: manager.get_account(r['user_id']) is not None,
+    'remove_account': lambda manager, tokens, r: manager.remove_account(r['user_id']) or True,
+    'create_session': lambda manager, tokens, r: tokens.__setitem__(
+        r['user_id'], manager.create_session(r['user_id'])) or True,
+    'get_session': lambda manager, tokens, r: manager.get_session(tokens.get(r['user_id'], '')) is not None,
+    'invalidate_session': lambda manager, tokens, r: manager.invalidate_session(
+        tokens.pop(r['user_id'], '')) or True,
+    'add_card': lambda manager, tokens, r: manager.get_account(r['user_id']).add_card(
+        r['number'], r['expiration_date'], r['cvv']) or True,
+    'add_transaction': lambda manager, tokens, r: manager.get_account(r['user_id']).add_transaction(
+        r['amount'], r['date'], r['merchant']) or True,
+    'get_transactions': lambda manager, tokens, r: manager.get_account(r['user_id']).get_transactions() is not None,
+    'get_balance': lambda manager, tokens, r: manager.get_account(r['user_id']).get_balance_v2(
+        r.get('start_date'), r.get('end_date'), r.get('transaction_type'), r.get('merchant')) is not None,
+    'initiate_payment': lambda manager, tokens, r: manager.initiate_payment(
+        r['user_id'], r['card_number'], r['amount'], r['merchant']),
+}
+
+
+def read_capture(path: str) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Reads the replayable records of a JSONL capture.
+
+    Parameters:
+    - path (str): The capture file.
+
+    Returns:
+    - Tuple[List[Dict[str, Any]], int]: The records with a known "op", and the number of lines skipped.
+    """
+    records, skipped = [], 0
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('op') in OPERATIONS:
+                records.append(record)
+            else:
+                skipped += 1
+    return records, skipped
+
+
+def schedule(records: List[Dict[str, Any]], rate: Optional[float], speed: float) -> List[Optional[float]]:
+    """
+    Returns the intended start offset, in seconds, of every record.
+
+    Parameters:
+    - records (List[Dict[str, Any]]): The records in capture order.
+    - rate (float, optional): Requests per second; 0 sends as fast as possible. None uses the "t" offsets.
+    - speed (float): The factor by which "t" offsets are compressed.
+
+    Returns:
+    - List[Optional[float]]: The offsets; all None when sending as fast as possible.
+    """
+    if rate:
+        return [i / rate for i in range(len(records))]
+    if rate is None and records and 't' in records[0]:
+        first = records[0]['t']
+        return [(record.get('t', first) - first) / speed for record in records]
+    return [None] * len(records)
+
+
+def worker_index(record: Dict[str, Any], workers: int, stride: int = 1) -> int:
+    """
+    Routes a record to a worker by user ID, keeping each user's requests in order.
+
+    Processes are picked by the hash modulo the process count and threads by the
+    quotient (stride is the process count), so the thread index does not depend on the
+    process index and every thread of a process gets users even when the counts share
+    a factor.
+    """
+    return zlib.crc32(str(record.get('user_id', '')).encode()) // stride % workers
+
+
+def _empty_results() -> Dict[str, Any]:
+    return {'operations': {op: {'latencies': [], 'service': [], 'failed': 0, 'errors': 0} for op in OPERATIONS},
+            'error_samples': [], 'idle_threads': 0, 'began': float('inf'), 'finished': 0.0}
+
+
+def _merge(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combines the results of several workers.
+    """
+    merged = _empty_results()
+    for part in parts:
+        for op, stats in part['operations'].items():
+            target = merged['operations'][op]
+            target['latencies'].extend(stats['latencies'])
+            target['service'].extend(stats['service'])
+            target['failed'] += stats['failed']
+            target['errors'] += stats['errors']
+        merged['error_samples'].extend(part['error_samples'][:10 - len(merged['error_samples'])])
+        merged['idle_threads'] += part['idle_threads']
+        merged['began'] = min(merged['began'], part['began'])
+        merged['finished'] = max(merged['finished'], part['finished'])
+    return merged
+
+
+def replay_partition(records: List[Tuple[Optional[float], Dict[str, Any]]], threads: int, start: float,
+                     workdir: str, processes: int = 1) -> Dict[str, Any]:
+    """
+    Replays scheduled records with a pool of threads sharing one CreditCardManager.
+
+    Parameters:
+    - records (List[Tuple[float, Dict]]): (offset, record) pairs in capture order; a None
+      offset runs the record as soon as its worker is free.
+    - threads (int): The number of worker threads.
+    - start (float): The wall-clock time (time.time()) at which offset 0 falls.
+    - workdir (str): The directory holding the database files.
+    - processes (int): The number of processes the capture was split over, passed to worker_index().
+
+    Returns:
+    - Dict[str, Any]: Per op, the 'latencies' and 'service' times in seconds and the
+      'failed' and 'errors' counts; plus the first few 'error_samples', the number of
+      'idle_threads' that were routed no records, and the wall-clock times at which the
+      replay 'began' and 'finished'.
+    """
+    os.chdir(workdir)
+    from CreditCardManager import CreditCardManager
+    from storage import pool
+    from storage.pool import MULTI_WORKER_OPTIONS
+
+    pool.configure_pools(**MULTI_WORKER_OPTIONS)
+    manager = CreditCardManager(sweep_interval=0)
+    tokens: Dict[str, str] = {}
+    parts = [_empty_results() for _ in range(threads)]
+    origin = time.perf_counter() + (start - time.time())
+    queues: List[queue.Queue] = [queue.Queue() for _ in range(threads)]
+
+    def work(inbox: queue.Queue, results: Dict[str, Any]) -> None:
+        while True:
+            item = inbox.get()
+            if item is None:
+                return
+            due, record = item
+            if due is not None:
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            stats = results['operations'][record['op']]
+            began = time.perf_counter()
+            if due is None:
+                due = began
+            try:
+                if not OPERATIONS[record['op']](manager, tokens, record):
+                    stats['failed'] += 1
+            except Exception as error:
+                stats['errors'] += 1
+                if len(results['error_samples']) < 10:
+                    results['error_samples'].append(f"{record['op']}: {type(error).__name__}: {error}")
+            finished = time.perf_counter()
+            stats['latencies'].append(finished - due)
+            stats['service'].append(finished - began)
+
+    workers = [threading.Thread(target=work, args=(inbox, results), daemon=True)
+               for inbox, results in zip(queues, parts)]
+    began = start if any(offset is not None for offset, _ in records) else time.time()
+    for worker in workers:
+        worker.start()
+    routed = [0] * threads
+    for offset, record in records:
+        index = worker_index(record, threads, processes)
+        routed[index] += 1
+        queues[index].put((None if offset is None else origin + offset, record))
+    for inbox in queues:
+        inbox.put(None)
+    for worker in workers:
+        worker.join()
+    finished = time.time()
+    manager.close()
+    pool.close_all()
+    merged = _merge(parts)
+    merged['began'], merged['finished'] = began, finished
+    merged['idle_threads'] = routed.count(0)
+    return merged
+
+
+def replay(records: List[Dict[str, Any]], offsets: List[Optional[float]], threads: int, processes: int,
+           workdir: str) -> Tuple[Dict[str, Any], float]:
+    """
+    Replays records across processes, each replaying the users routed to it.
+
+    Returns:
+    - Tuple[Dict[str, Any], float]: The merged results of replay_partition() and the elapsed wall time.
+    """
+    start = time.time() + 0.2 * processes
+    if processes == 1:
+        merged = replay_partition(list(zip(offsets, records)), threads, start, workdir)
+        return merged, merged['finished'] - merged['began']
+    partitions = [[] for _ in range(processes)]
+    for offset, record in zip(offsets, records):
+        partitions[worker_index(record, processes)].append((offset, record))
+    with ProcessPoolExecutor(processes) as executor:
+        parts = list(executor.map(replay_partition, partitions, [threads] * processes, [start] * processes,
+                                  [workdir] * processes, [processes] * processes))
+    merged = _merge(parts)
+    return merged, merged['finished'] - merged['began']
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """
+    Returns the count and p50/p90/p99/max of latency samples, in milliseconds.
+    """
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))] * 1000
+
+    return {'count': len(ordered), 'p50_ms': at(50), 'p90_ms': at(90), 'p99_ms': at(99), 'max_ms': at(100)}
+
+
+def report(merged: Dict[str, Any], elapsed: float, skipped: int) -> Dict[str, Any]:
+    """
+    Builds the replay report and prints it as a table.
+    """
+    operations = {}
+    for op, stats in merged['operations'].items():
+        if stats['latencies']:
+            operations[op] = {**summarize(stats['latencies']), 'service_p50_ms': summarize(stats['service'])['p50_ms'],
+                              'failed': stats['failed'], 'errors': stats['errors']}
+    every = [sample for stats in merged['operations'].values() for sample in stats['latencies']]
+    total = len(every)
+    summary = {'requests': total, 'skipped': skipped, 'seconds': elapsed,
+               'throughput': total / elapsed if elapsed > 0 else 0.0,
+               'failed': sum(stats['failed'] for stats in operations.values()),
+               'errors': sum(stats['errors'] for stats in operations.values()),
+               'latency': summarize(every) if every else {}, 'operations': operations,
+               'error_samples': merged['error_samples'], 'idle_threads': merged['idle_threads']}
+
+    print(f"{total} requests in {elapsed:.2f} s: {summary['throughput']:.0f} req/s, "
+          f"{summary['failed']} failed, {summary['errors']} errors, {skipped} skipped")
+    print(f"{'op':20}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'failed':>8}{'errors':>8}")
+    for op, stats in operations.items():
+        print(f"{op:20}{stats['count']:>8}{stats['p50_ms']:>10.2f}{stats['p90_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+              f"{stats['max_ms']:>10.2f}{stats['failed']:>8}{stats['errors']:>8}")
+    for sample in merged['error_samples']:
+        print(f"  error: {sample}")
+    if merged['idle_threads']:
+        print(f"  warning: {merged['idle_threads']} worker threads were routed no requests")
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('capture', help='The JSONL capture to replay.')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Requests per second; 0 sends as fast as possible. Defaults to the "t" offsets.')
+    parser.add_argument('--speed', type=float, default=1.0, help='Replay the "t" offsets this many times faster.')
+    parser.add_argument('--threads', type=int, default=4, help='Worker threads per process.')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--workdir', help='Directory of the database files; defaults to a fresh temporary one.')
+    parser.add_argument('--json', help='Write the report to this JSON file.')
+    args = parser.parse_args(argv)
+
+    records, skipped = read_capture(args.capture)
+    if not records:
+        parser.exit(1, f"No replayable records in {args.capture} ({skipped} lines skipped).\n")
+    offsets = schedule(records, args.rate, args.speed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        workdir = os.path.abspath(args.workdir or directory)
+        merged, elapsed = replay(records, offsets, args.threads, args.processes, workdir)
+        os.chdir(cwd)
+    summary = report(merged, elapsed, skipped)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
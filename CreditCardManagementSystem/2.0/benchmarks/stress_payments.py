@@ -0,0 +1,84 @@
+"""
+Concurrency stress test for the database layer in multi-worker mode.
+
+For each thread count, N threads call CreditCardManager.initiate_payment in a loop
+against fresh database files. The run reports payments per second, and it checks
+that every successful payment produced exactly one transaction row and that the
+balance ledger agrees with the rows, i.e. that no write was lost. With --unified
+all tables share one file and each payment commits once.
+
+Run from the 2.0 directory:
+    python -m benchmarks.stress_payments --threads 1 2 4 8 --payments 500 [--unified]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from CreditCardManager import CreditCardManager
+from storage import pool
+from storage.pool import MULTI_WORKER_OPTIONS
+from storage.repository import Repository
+
+USERS = 16
+CARD_NUMBER = '4111111111111111'
+
+
+def run_once(threads: int, payments: int, unified: bool = False) -> bool:
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        manager = CreditCardManager(sweep_interval=0, repository=Repository.unified() if unified else None)
+        for i in range(USERS):
+            account = manager.create_account(f"user{i}")
+            account.add_card('4000000000000002', '2030-01-01', '000')
+            account.add_card(CARD_NUMBER, '2030-01-01', '123')
+        successes = [0] * threads
+        errors = []
+
+        def worker(index: int) -> None:
+            try:
+                for i in range(payments):
+                    if manager.initiate_payment(f"user{(index + i) % USERS}", CARD_NUMBER, 1.25, 'stress'):
+                        successes[index] += 1
+            except Exception as error:  # Reported below; a failed worker must not hide lost writes.
+                errors.append(error)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        connection = sqlite3.connect(manager.transaction_db.db_name)
+        rows, total = connection.execute("SELECT COUNT(*), SUM(amount_cents) FROM transactions").fetchone()
+        ledger = connection.execute("SELECT SUM(balance_cents) FROM balances").fetchone()[0]
+        connection.close()
+        manager.close()
+        pool.close_all()
+        os.chdir(os.path.dirname(directory))
+
+    succeeded = sum(successes)
+    lost = succeeded - rows
+    ok = not errors and lost == 0 and total == ledger
+    print(f"{threads:>7} {succeeded / elapsed:>12.0f} {succeeded:>10} {rows:>10} {lost:>6} {len(errors):>7}"
+          f"  {'ok' if ok else 'FAILED'}")
+    for error in errors[:3]:
+        print(f"        {type(error).__name__}: {error}")
+    return ok
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--payments', type=int, default=500, help='payments per thread')
+    parser.add_argument('--unified', action='store_true', help='keep all tables in one database file')
+    args = parser.parse_args()
+    pool.configure_pools(**MULTI_WORKER_OPTIONS)
+    print(f"{'threads':>7} {'payments/s':>12} {'succeeded':>10} {'rows':>10} {'lost':>6} {'errors':>7}")
+    results = [run_once(threads, args.payments, args.unified) for threads in args.threads]
+    sys.exit(0 if all(results) else 1)
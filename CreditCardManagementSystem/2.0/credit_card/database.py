@@ -1,5 +1,275 @@
+import datetime
+import hashlib
 import sqlite3
-from typing import List, Tuple, Optional
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Tuple, Optional
+from credit_card.dates import DateLike, end_bound, normalize_date
+from credit_card.money import from_cents, to_cents
+from storage.cache import LRUCache, get_cache
+from storage.migrations import Migration, apply_migrations
+from storage.pool import ConnectionPool, get_pool
+
+def hash_card_number(number: str) -> str:
+    """
+    Hashes a card number (PAN) into the fixed-width key of the (account_id, pan_hash) index.
+
+    This is a lookup key, not protection: an unkeyed hash of a low-entropy PAN is easily
+    reversed by enumeration, and the number column itself is stored in plaintext.
+
+    Parameters:
+    - number (str): The credit card number.
+
+    Returns:
+    - str: The hex SHA-256 digest of the number.
+    """
+    return hashlib.sha256(str(number).encode()).hexdigest()
+
+
+def _add_card_owner_and_pan_hash(connection: sqlite3.Connection) -> None:
+    """
+    Adds the owning account and PAN hash columns to credit_cards and backfills the hashes.
+
+    Cards created before this migration have no recorded owner and keep a NULL account_id.
+    """
+    connection.execute('ALTER TABLE credit_cards ADD COLUMN account_id TEXT')
+    connection.execute('ALTER TABLE credit_cards ADD COLUMN pan_hash TEXT')
+    connection.executemany('UPDATE credit_cards SET pan_hash=? WHERE id=?',
+                           [(hash_card_number(number), card_id)
+                            for card_id, number in connection.execute('SELECT id, number FROM credit_cards')])
+    connection.execute('CREATE INDEX IF NOT EXISTS idx_credit_cards_owner_pan ON credit_cards (account_id, pan_hash)')
+
+
+# Statements of migration 4 run after the amounts are copied: they swap in the cents table
+# and rebuild its indexes, the ledger tables and the ledger triggers.
+_CENTS_LEDGER_SCHEMA: List[str] = [
+    'DROP TABLE transactions',
+    'ALTER TABLE transactions_cents RENAME TO transactions',
+    'CREATE INDEX idx_transactions_user_date ON transactions (user_id, date)',
+    'CREATE INDEX idx_transactions_merchant ON transactions (merchant)',
+    'DROP TABLE balances',
+    'DROP TABLE daily_balances',
+    '''
+    CREATE TABLE balances (
+        user_id TEXT PRIMARY KEY,
+        balance_cents INTEGER NOT NULL,
+        transaction_count INTEGER NOT NULL
+    )
+    ''',
+    '''
+    CREATE TABLE daily_balances (
+        user_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        total_cents INTEGER NOT NULL,
+        transaction_count INTEGER NOT NULL,
+        PRIMARY KEY (user_id, day)
+    ) WITHOUT ROWID
+    ''',
+    '''
+    CREATE TRIGGER transactions_ledger_insert AFTER INSERT ON transactions
+    BEGIN
+        INSERT INTO balances (user_id, balance_cents, transaction_count) VALUES (NEW.user_id, NEW.amount_cents, 1)
+        ON CONFLICT (user_id) DO UPDATE SET balance_cents = balance_cents + excluded.balance_cents,
+                                            transaction_count = transaction_count + 1;
+        INSERT INTO daily_balances (user_id, day, total_cents, transaction_count)
+        VALUES (NEW.user_id, substr(NEW.date, 1, 10), NEW.amount_cents, 1)
+        ON CONFLICT (user_id, day) DO UPDATE SET total_cents = total_cents + excluded.total_cents,
+                                                 transaction_count = transaction_count + 1;
+    END
+    ''',
+    '''
+    CREATE TRIGGER transactions_ledger_delete AFTER DELETE ON transactions
+    BEGIN
+        UPDATE balances SET balance_cents = balance_cents - OLD.amount_cents,
+                            transaction_count = transaction_count - 1
+        WHERE user_id = OLD.user_id;
+        UPDATE daily_balances SET total_cents = total_cents - OLD.amount_cents,
+                                  transaction_count = transaction_count - 1
+        WHERE user_id = OLD.user_id AND day = substr(OLD.date, 1, 10);
+    END
+    ''',
+    '''
+    CREATE TRIGGER transactions_ledger_update AFTER UPDATE OF user_id, amount_cents, date ON transactions
+    BEGIN
+        UPDATE balances SET balance_cents = balance_cents - OLD.amount_cents,
+                            transaction_count = transaction_count - 1
+        WHERE user_id = OLD.user_id;
+        UPDATE daily_balances SET total_cents = total_cents - OLD.amount_cents,
+                                  transaction_count = transaction_count - 1
+        WHERE user_id = OLD.user_id AND day = substr(OLD.date, 1, 10);
+        INSERT INTO balances (user_id, balance_cents, transaction_count) VALUES (NEW.user_id, NEW.amount_cents, 1)
+        ON CONFLICT (user_id) DO UPDATE SET balance_cents = balance_cents + excluded.balance_cents,
+                                            transaction_count = transaction_count + 1;
+        INSERT INTO daily_balances (user_id, day, total_cents, transaction_count)
+        VALUES (NEW.user_id, substr(NEW.date, 1, 10), NEW.amount_cents, 1)
+        ON CONFLICT (user_id, day) DO UPDATE SET total_cents = total_cents + excluded.total_cents,
+                                                 transaction_count = transaction_count + 1;
+    END
+    ''',
+    '''
+    INSERT INTO balances (user_id, balance_cents, transaction_count)
+    SELECT user_id, COALESCE(SUM(amount_cents), 0), COUNT(*) FROM transactions GROUP BY user_id
+    ''',
+    '''
+    INSERT INTO daily_balances (user_id, day, total_cents, transaction_count)
+    SELECT user_id, substr(date, 1, 10), COALESCE(SUM(amount_cents), 0), COUNT(*) FROM transactions
+    GROUP BY user_id, substr(date, 1, 10)
+    ''',
+]
+
+
+def _store_amounts_as_cents(connection: sqlite3.Connection) -> None:
+    """
+    Moves transaction amounts to an integer amount_cents column and rebuilds the ledger in cents.
+
+    Amounts are converted with to_cents(), so legacy rows round half to even like new
+    inserts do; SQLite's ROUND() would round halves away from zero.
+    """
+    connection.execute('''
+        CREATE TABLE transactions_cents (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT,
+            amount_cents INTEGER,
+            date TEXT,
+            merchant TEXT
+        )
+    ''')
+    connection.executemany('INSERT INTO transactions_cents (id, user_id, amount_cents, date, merchant) '
+                           'VALUES (?, ?, ?, ?, ?)',
+                           [(transaction_id, user_id, None if amount is None else to_cents(amount), date, merchant)
+                            for transaction_id, user_id, amount, date, merchant
+                            in connection.execute('SELECT id, user_id, amount, date, merchant FROM transactions')])
+    for statement in _CENTS_LEDGER_SCHEMA:
+        connection.execute(statement)
+
+
+def _normalize_transaction_dates(connection: sqlite3.Connection) -> None:
+    """
+    Rewrites stored transaction dates in the fixed-precision format of normalize_date().
+
+    Dates that are not ISO-8601 cannot be interpreted and are left unchanged.
+    """
+    updates = []
+    for transaction_id, date in connection.execute('SELECT id, date FROM transactions'):
+        try:
+            normalized = normalize_date(date)
+        except (TypeError, ValueError):
+            continue
+        if normalized != date:
+            updates.append((normalized, transaction_id))
+    connection.executemany('UPDATE transactions SET date=? WHERE id=?', updates)
+
+
+# Columns returned by card lookups, in the order CreditCard rows have always used.
+CREDIT_CARD_COLUMNS = 'id, number, expiration_date, cvv'
+
+CREDIT_CARD_MIGRATIONS: List[Migration] = [
+    Migration(1, 'Create credit_cards table', [
+        '''
+        CREATE TABLE IF NOT EXISTS credit_cards (
+            id INTEGER PRIMARY KEY,
+            number TEXT,
+            expiration_date TEXT,
+            cvv TEXT
+        )
+        ''',
+    ]),
+    Migration(2, 'Record card owners and index cards by owner and PAN hash', _add_card_owner_and_pan_hash),
+]
+
+TRANSACTION_MIGRATIONS: List[Migration] = [
+    Migration(1, 'Create transactions table', [
+        '''
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            user_id TEXT,
+            amount REAL,
+            date TEXT,
+            merchant TEXT
+        )
+        ''',
+    ]),
+    Migration(2, 'Index transactions by user and date, and by merchant', [
+        'CREATE INDEX IF NOT EXISTS idx_transactions_user_date ON transactions (user_id, date)',
+        'CREATE INDEX IF NOT EXISTS idx_transactions_merchant ON transactions (merchant)',
+    ]),
+    Migration(3, 'Maintain per-user balances and daily rollups with triggers', [
+        '''
+        CREATE TABLE IF NOT EXISTS balances (
+            user_id TEXT PRIMARY KEY,
+            balance REAL NOT NULL,
+            transaction_count INTEGER NOT NULL
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS daily_balances (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            total REAL NOT NULL,
+            transaction_count INTEGER NOT NULL,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS transactions_ledger_insert AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO balances (user_id, balance, transaction_count) VALUES (NEW.user_id, NEW.amount, 1)
+            ON CONFLICT (user_id) DO UPDATE SET balance = balance + excluded.balance,
+                                                transaction_count = transaction_count + 1;
+            INSERT INTO daily_balances (user_id, day, total, transaction_count)
+            VALUES (NEW.user_id, substr(NEW.date, 1, 10), NEW.amount, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET total = total + excluded.total,
+                                                     transaction_count = transaction_count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS transactions_ledger_delete AFTER DELETE ON transactions
+        BEGIN
+            UPDATE balances SET balance = balance - OLD.amount, transaction_count = transaction_count - 1
+            WHERE user_id = OLD.user_id;
+            UPDATE daily_balances SET total = total - OLD.amount, transaction_count = transaction_count - 1
+            WHERE user_id = OLD.user_id AND day = substr(OLD.date, 1, 10);
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS transactions_ledger_update AFTER UPDATE OF user_id, amount, date ON transactions
+        BEGIN
+            UPDATE balances SET balance = balance - OLD.amount, transaction_count = transaction_count - 1
+            WHERE user_id = OLD.user_id;
+            UPDATE daily_balances SET total = total - OLD.amount, transaction_count = transaction_count - 1
+            WHERE user_id = OLD.user_id AND day = substr(OLD.date, 1, 10);
+            INSERT INTO balances (user_id, balance, transaction_count) VALUES (NEW.user_id, NEW.amount, 1)
+            ON CONFLICT (user_id) DO UPDATE SET balance = balance + excluded.balance,
+                                                transaction_count = transaction_count + 1;
+            INSERT INTO daily_balances (user_id, day, total, transaction_count)
+            VALUES (NEW.user_id, substr(NEW.date, 1, 10), NEW.amount, 1)
+            ON CONFLICT (user_id, day) DO UPDATE SET total = total + excluded.total,
+                                                     transaction_count = transaction_count + 1;
+        END
+        ''',
+        '''
+        INSERT INTO balances (user_id, balance, transaction_count)
+        SELECT user_id, TOTAL(amount), COUNT(*) FROM transactions GROUP BY user_id
+        ''',
+        '''
+        INSERT INTO daily_balances (user_id, day, total, transaction_count)
+        SELECT user_id, substr(date, 1, 10), TOTAL(amount), COUNT(*) FROM transactions
+        GROUP BY user_id, substr(date, 1, 10)
+        ''',
+    ]),
+    Migration(4, 'Store amounts and ledger totals as integer cents', _store_amounts_as_cents),
+    Migration(5, 'Normalize transaction dates to fixed-precision ISO-8601', _normalize_transaction_dates),
+]
+
+# Columns returned by transaction row reads: amounts are stored as integer cents and
+# returned in currency units, so rows keep their (id, user_id, amount, date, merchant) shape.
+TRANSACTION_COLUMNS = 'id, user_id, amount_cents / 100.0 AS amount, date, merchant'
+
+# SQL conditions selecting each transaction type accepted by get_balance_v2.
+TRANSACTION_TYPE_CONDITIONS = {
+    'purchase': 'amount_cents > 0',
+    'refund': 'amount_cents < 0',
+}
 
 class CreditCardDatabase:
     def __init__(self, db_name: str = 'credit_cards.db') -> None:
@@ -9,31 +279,25 @@ class CreditCardDatabase:
         Parameters:
         - db_name (str): The name of the SQLite database file.
         """
-        self.connection = sqlite3.connect(db_name)
-        self.cursor = self.connection.cursor()
-        self.create_tables()
+        self.db_name: str = db_name
+        self.pool: ConnectionPool = get_pool(db_name)
+        self.cache: LRUCache = get_cache(db_name, 'credit_cards')
+        self.pool.initialize_once('credit_cards', self.create_tables)
 
     def create_tables(self) -> None:
         """
-        Create necessary tables if they don't exist in the database.
+        Create necessary tables by applying pending schema migrations.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS credit_cards (
-                id INTEGER PRIMARY KEY,
-                number TEXT,
-                expiration_date TEXT,
-                cvv TEXT
-            )
-        ''')
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            apply_migrations(connection, 'credit_cards', CREDIT_CARD_MIGRATIONS)
 
     def close(self) -> None:
         """
-        Close the database connection.
+        Close the idle connections of the shared pool; they are reopened on demand.
         """
-        self.connection.close()
+        self.pool.close()
 
-    def add_credit_card(self, number: str, expiration_date: str, cvv: str) -> None:
+    def add_credit_card(self, number: str, expiration_date: str, cvv: str, account_id: Optional[str] = None) -> None:
         """
         Add a credit card to the database.
 
@@ -41,16 +305,17 @@ class CreditCardDatabase:
         - number (str): The credit card number.
         - expiration_date (str): The expiration date of the credit card.
         - cvv (str): The CVV code of the credit card.
+        - account_id (str, optional): The user ID of the owning account.
         """
-        self.cursor.execute('''
-            INSERT INTO credit_cards (number, expiration_date, cvv)
-            VALUES (?, ?, ?)
-        ''', (number, expiration_date, cvv))
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            connection.execute('''
+                INSERT INTO credit_cards (number, expiration_date, cvv, account_id, pan_hash)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (number, expiration_date, cvv, account_id, hash_card_number(number)))
 
     def get_credit_card_by_id(self, card_id: int) -> Optional[Tuple[int, str, str, str]]:
         """
-        Retrieve a credit card by its ID from the database.
+        Retrieve a credit card by its ID, from the cache when possible.
 
         Parameters:
         - card_id (int): The ID of the credit card.
@@ -59,8 +324,40 @@ class CreditCardDatabase:
         - Tuple[int, str, str, str]: A tuple containing the credit card ID, number, expiration date, and CVV,
           or None if no credit card with the given ID exists.
         """
-        self.cursor.execute('SELECT * FROM credit_cards WHERE id=?', (card_id,))
-        return self.cursor.fetchone()
+        return self.cache.get_or_load(card_id, lambda: self._select_credit_card('id=?', (card_id,)))
+
+    def find_card(self, account_id: str, card_number: str) -> Optional[Tuple[int, str, str, str]]:
+        """
+        Find a card owned by an account by its number, from the cache when possible.
+
+        The lookup is a single query on the (account_id, pan_hash) index, so its cost does
+        not depend on how many cards exist.
+
+        Parameters:
+        - account_id (str): The user ID of the owning account.
+        - card_number (str): The credit card number.
+
+        Returns:
+        - Tuple[int, str, str, str]: A tuple containing the credit card ID, number, expiration date, and CVV,
+          or None if the account owns no card with that number.
+        """
+        key = (account_id, hash_card_number(card_number))
+        return self.cache.get_or_load(key, lambda: self._select_credit_card('account_id=? AND pan_hash=?', key))
+
+    def _select_credit_card(self, condition: str, params: Tuple) -> Optional[Tuple[int, str, str, str]]:
+        """
+        Read the first credit card row matching a condition, bypassing the cache.
+
+        Parameters:
+        - condition (str): The WHERE clause.
+        - params (Tuple): The parameters of the WHERE clause.
+
+        Returns:
+        - Tuple[int, str, str, str]: The credit card row, or None if no card matches.
+        """
+        with self.pool.connection() as connection:
+            return connection.execute(f'SELECT {CREDIT_CARD_COLUMNS} FROM credit_cards WHERE {condition}',
+                                      params).fetchone()
 
     def get_all_credit_cards(self) -> List[Tuple[int, str, str, str]]:
         """
@@ -69,8 +366,8 @@ class CreditCardDatabase:
         Returns:
         - List[Tuple[int, str, str, str]]: A list of tuples containing credit card ID, number, expiration date, and CVV.
         """
-        self.cursor.execute('SELECT * FROM credit_cards')
-        return self.cursor.fetchall()
+        with self.pool.connection() as connection:
+            return connection.execute(f'SELECT {CREDIT_CARD_COLUMNS} FROM credit_cards').fetchall()
 
     def update_credit_card(self, card_id: int, number: str, expiration_date: str, cvv: str) -> None:
         """
@@ -82,12 +379,14 @@ class CreditCardDatabase:
         - expiration_date (str): The updated expiration date of the credit card.
         - cvv (str): The updated CVV code of the credit card.
         """
-        self.cursor.execute('''
-            UPDATE credit_cards
-            SET number=?, expiration_date=?, cvv=?
-            WHERE id=?
-        ''', (number, expiration_date, cvv, card_id))
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            previous = self._owner_key(connection, card_id)
+            connection.execute('''
+                UPDATE credit_cards
+                SET number=?, expiration_date=?, cvv=?, pan_hash=?
+                WHERE id=?
+            ''', (number, expiration_date, cvv, hash_card_number(number), card_id))
+        self.cache.invalidate(card_id, previous)
 
     def delete_credit_card(self, card_id: int) -> None:
         """
@@ -96,8 +395,24 @@ class CreditCardDatabase:
         Parameters:
         - card_id (int): The ID of the credit card to delete.
         """
-        self.cursor.execute('DELETE FROM credit_cards WHERE id=?', (card_id,))
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            previous = self._owner_key(connection, card_id)
+            connection.execute('DELETE FROM credit_cards WHERE id=?', (card_id,))
+        self.cache.invalidate(card_id, previous)
+
+    @staticmethod
+    def _owner_key(connection: sqlite3.Connection, card_id: int) -> Optional[Tuple[str, str]]:
+        """
+        Read the (account_id, pan_hash) cache key of a card before it changes.
+
+        Parameters:
+        - connection (sqlite3.Connection): The connection holding the write transaction.
+        - card_id (int): The ID of the credit card.
+
+        Returns:
+        - Tuple[str, str]: The find_card cache key, or None if the card does not exist.
+        """
+        return connection.execute('SELECT account_id, pan_hash FROM credit_cards WHERE id=?', (card_id,)).fetchone()
 
 
 
@@ -107,53 +422,168 @@ class TransactionDatabase:
     A class for interacting with a SQLite database to store and manage transaction data.
     """
 
-    def __init__(self, db_name: str = 'transactions.db') -> None:
+    def __init__(self, db_name: str = 'transactions.db', batch_size: int = 0, flush_interval: float = 0.0,
+                 on_commit: Optional[Callable[[int], None]] = None) -> None:
         """
-        Initializes a connection to the SQLite database for transactions.
+        Initializes access to the pooled SQLite database for transactions.
 
         Args:
             db_name (str, optional): The name of the database file. Defaults to 'transactions.db'.
+            batch_size (int, optional): Enables group commit when greater than zero: add_transaction()
+                buffers records and commits them together once this many are pending. Defaults to 0
+                (commit every record).
+            flush_interval (float, optional): In batching mode, the longest time in seconds a buffered
+                record may wait before it is committed. Defaults to 0.0 (no time limit).
+            on_commit (Callable[[int], None], optional): Called with the number of records after every
+                commit that made transactions durable.
         """
-        self.connection: sqlite3.Connection = sqlite3.connect(db_name)
-        self.cursor: sqlite3.Cursor = self.connection.cursor()
-        self.create_table()
+        self.db_name: str = db_name
+        self.pool: ConnectionPool = get_pool(db_name)
+        self.pool.initialize_once('transactions', self.create_table)
+        self.batch_size: int = batch_size
+        self.flush_interval: float = flush_interval
+        self.on_commit: Optional[Callable[[int], None]] = on_commit
+        self._pending: List[Tuple[str, int, str, str]] = []
+        self._pending_since: float = 0.0
+        self._pending_lock = threading.RLock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._flush_error: Optional[Exception] = None
 
     def create_table(self) -> None:
         """
-        Creates the 'transactions' table in the database if it doesn't already exist.
+        Creates the 'transactions' table and its indexes by applying pending schema migrations.
         """
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transactions (
-                id INTEGER PRIMARY KEY,
-                user_id TEXT,
-                amount REAL,
-                date TEXT,
-                merchant TEXT
-            )
-        ''')
-        self.connection.commit()
+        with self.pool.transaction() as connection:
+            apply_migrations(connection, 'transactions', TRANSACTION_MIGRATIONS)
 
     def close(self) -> None:
         """
-        Closes the connection to the database.
+        Flushes buffered transactions and closes the idle connections of the shared pool;
+        they are reopened on demand.
         """
-        self.connection.close()
+        self.flush()
+        self.pool.close()
 
-    def add_transaction(self, user_id: str, amount: float, date: str, merchant: str) -> None:
+    def add_transaction(self, user_id: str, amount: float, date: DateLike, merchant: str) -> None:
         """
         Adds a new transaction record to the database.
 
+        In batching mode the record is buffered and becomes durable on the next flush.
+
         Args:
             user_id (str): The ID of the user who made the transaction.
-            amount (float): The transaction amount.
-            date (str): The date of the transaction (in a format suitable for storage in a TEXT column).
+            amount (float): The transaction amount in currency units; it is stored as integer cents.
+            date (datetime, date or str): The date of the transaction; it is stored as
+                'YYYY-MM-DD HH:MM:SS.ffffff' text (see credit_card.dates).
             merchant (str): The merchant for the transaction.
+
+        Raises:
+            Exception: The error of a background flush that failed since the last call. The record
+                is not added; the records already buffered are kept and retried by the next flush.
+        """
+        record = (user_id, to_cents(amount), normalize_date(date), merchant)
+        if self.batch_size <= 0:
+            self._insert([record])
+            return
+        with self._pending_lock:
+            if self._flush_error is not None:
+                error, self._flush_error = self._flush_error, None
+                raise error
+            if not self._pending:
+                self._pending_since = time.monotonic()
+                self._schedule_flush()
+            self._pending.append(record)
+            if len(self._pending) >= self.batch_size or (
+                    self.flush_interval > 0 and time.monotonic() - self._pending_since >= self.flush_interval):
+                self.flush()
+
+    def add_transactions(self, transactions: Iterable[Tuple[str, float, DateLike, str]]) -> int:
+        """
+        Adds many transaction records in a single database transaction.
+
+        Args:
+            transactions (Iterable[tuple]): Records of (user_id, amount, date, merchant), with amounts
+                in currency units.
+
+        Returns:
+            int: The number of records inserted.
+        """
+        self.flush()
+        return self._insert((user_id, to_cents(amount), normalize_date(date), merchant)
+                            for user_id, amount, date, merchant in transactions)
+
+    def flush(self) -> int:
+        """
+        Commits all buffered transaction records as one database transaction.
+
+        If anything fails before the commit, the records stay buffered for the next flush and
+        the error is raised. on_commit runs after the commit, so its errors never re-buffer
+        committed records.
+
+        Returns:
+            int: The number of records committed.
+        """
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            # This flush retries whatever a failed background flush left buffered.
+            self._flush_error = None
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, []
+            try:
+                count = self._commit(pending)
+            except BaseException:
+                self._pending = pending + self._pending
+                raise
+            self._notify(count)
+            return count
+
+    def _schedule_flush(self) -> None:
+        """
+        Starts a timer that flushes the buffer if no further records arrive in time.
         """
-        self.cursor.execute('''
-            INSERT INTO transactions (user_id, amount, date, merchant)
-            VALUES (?, ?, ?, ?)
-        ''', (user_id, amount, date, merchant))
-        self.connection.commit()
+        if self.flush_interval <= 0:
+            return
+        self._flush_timer = threading.Timer(self.flush_interval, self._timed_flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def _timed_flush(self) -> None:
+        """
+        Flushes from the timer thread, keeping a failure for the next add_transaction() to raise.
+        """
+        try:
+            self.flush()
+        except Exception as error:
+            with self._pending_lock:
+                self._flush_error = error
+
+    def _insert(self, records: Iterable[Tuple[str, int, str, str]]) -> int:
+        """
+        Inserts (user_id, amount_cents, date, merchant) records, commits them and notifies on_commit.
+        """
+        count = self._commit(records)
+        self._notify(count)
+        return count
+
+    def _commit(self, records: Iterable[Tuple[str, int, str, str]]) -> int:
+        """
+        Inserts (user_id, amount_cents, date, merchant) records with executemany and commits them.
+        """
+        with self.pool.transaction() as connection:
+            return connection.executemany('''
+                INSERT INTO transactions (user_id, amount_cents, date, merchant)
+                VALUES (?, ?, ?, ?)
+            ''', records).rowcount
+
+    def _notify(self, count: int) -> None:
+        """
+        Calls on_commit with the number of records a commit made durable.
+        """
+        if self.on_commit is not None and count:
+            self.on_commit(count)
 
     def get_transactions_by_user_id(self, user_id: str) -> list[tuple]:
         """
@@ -166,8 +596,240 @@ class TransactionDatabase:
             list[tuple]: A list of tuples where each tuple represents a transaction record
                 (id, user_id, amount, date, merchant).
         """
-        self.cursor.execute('SELECT * FROM transactions WHERE user_id=?', (user_id,))
-        return self.cursor.fetchall()
+        self.flush()
+        with self.pool.connection() as connection:
+            return connection.execute(f'SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE user_id=?',
+                                      (user_id,)).fetchall()
+
+    def get_transactions_in_range(self, user_id: str, start_date: Optional[DateLike] = None,
+                                  end_date: Optional[DateLike] = None) -> List[Tuple]:
+        """
+        Retrieves a user's transactions within a date range, ordered by date.
+
+        The query is a single range scan of the (user_id, date) index. A bare end date
+        ('YYYY-MM-DD' or a date object) includes that whole day.
+
+        Args:
+            user_id (str): The ID of the user.
+            start_date (datetime, date or str, optional): Only include transactions on or after this date.
+            end_date (datetime, date or str, optional): Only include transactions on or before this date.
+
+        Returns:
+            list[tuple]: The transaction records (id, user_id, amount, date, merchant).
+        """
+        where, params = self._build_filters(user_id, start_date, end_date)
+        self.flush()
+        with self.pool.connection() as connection:
+            return connection.execute(
+                f'SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE {where} ORDER BY date, id', params).fetchall()
+
+    def get_transactions_page(self, user_id: str, after_date: Optional[DateLike] = None,
+                              after_id: Optional[int] = None, page_size: int = 500) -> List[Tuple]:
+        """
+        Retrieves one page of a user's transactions ordered by (date, id), using keyset pagination.
+
+        The page starts right after the (after_date, after_id) cursor, which is normally the
+        date and id of the last row of the previous page, and is read with a single range scan
+        of the (user_id, date) index. Its cost depends on the page size, not on how far into
+        the history it starts.
+
+        Args:
+            user_id (str): The ID of the user whose transactions are listed.
+            after_date (date or str, optional): Only rows after this date are returned; with after_id,
+                rows on this date with a larger id are returned too.
+            after_id (int, optional): The id of the last row already seen. Without after_date, that
+                row's date is looked up first, and the row must belong to the user.
+            page_size (int, optional): The maximum number of rows returned. Defaults to 500.
+
+        Returns:
+            list[tuple]: Up to page_size transaction records (id, user_id, amount, date, merchant).
+
+        Raises:
+            ValueError: If after_id is given alone and no transaction of the user has that id.
+        """
+        self.flush()
+        with self.pool.connection() as connection:
+            if after_id is not None and after_date is None:
+                row = connection.execute('SELECT date FROM transactions WHERE id=? AND user_id=?',
+                                         (after_id, user_id)).fetchone()
+                if row is None:
+                    raise ValueError(f"Unknown transaction cursor for {user_id!r}: {after_id!r}")
+                after_date = row[0]
+            if after_date is None:
+                condition, params = 'user_id=?', [user_id]
+            elif after_id is None:
+                condition, params = 'user_id=? AND date > ?', [user_id, normalize_date(after_date)]
+            else:
+                condition, params = 'user_id=? AND (date, id) > (?, ?)', [user_id, normalize_date(after_date), after_id]
+            cursor = connection.execute(
+                f'SELECT {TRANSACTION_COLUMNS} FROM transactions WHERE {condition} ORDER BY date, id LIMIT ?',
+                params + [page_size])
+            return cursor.fetchmany(page_size)
+
+    def iter_transactions(self, user_id: str, after_date: Optional[DateLike] = None,
+                          after_id: Optional[int] = None, page_size: int = 500) -> Iterator[Tuple]:
+        """
+        Streams a user's transactions ordered by (date, id), one page per query.
+
+        Only one page is held in memory, and no pooled connection is kept between pages,
+        so a caller may stop iterating at any point.
+
+        Args:
+            user_id (str): The ID of the user whose transactions are streamed.
+            after_date (date or str, optional): The cursor date to resume after; see get_transactions_page.
+            after_id (int, optional): The cursor id to resume after; see get_transactions_page.
+            page_size (int, optional): The number of rows fetched per query. Defaults to 500.
+
+        Yields:
+            tuple: Transaction records (id, user_id, amount, date, merchant).
+        """
+        while True:
+            page = self.get_transactions_page(user_id, after_date, after_id, page_size)
+            yield from page
+            if len(page) < page_size:
+                return
+            after_id, after_date = page[-1][0], page[-1][3]
+
+    def sum_transactions(self, user_id: str, start_date: Optional[DateLike] = None,
+                         end_date: Optional[DateLike] = None,
+                         transaction_type: Optional[str] = None, merchant: Optional[str] = None) -> float:
+        """
+        Sums the amounts of a user's transactions matching the given filters inside SQLite.
+
+        Args:
+            user_id (str): The ID of the user whose transactions are summed.
+            start_date (datetime, optional): Only include transactions on or after this date.
+            end_date (datetime, optional): Only include transactions on or before this date.
+            transaction_type (str, optional): 'purchase' (positive amounts) or 'refund' (negative amounts).
+            merchant (str, optional): Only include transactions with this merchant.
+
+        Returns:
+            float: The sum of the matching amounts, 0.0 if nothing matches.
+        """
+        return from_cents(self.sum_transactions_cents(user_id, start_date, end_date, transaction_type, merchant))
+
+    def sum_transactions_cents(self, user_id: str, start_date: Optional[DateLike] = None,
+                               end_date: Optional[DateLike] = None,
+                               transaction_type: Optional[str] = None, merchant: Optional[str] = None) -> int:
+        """
+        Sums the amounts of a user's matching transactions as exact integer cents.
+
+        Args:
+            user_id (str): The ID of the user whose transactions are summed.
+            start_date (datetime, optional): Only include transactions on or after this date.
+            end_date (datetime, optional): Only include transactions on or before this date.
+            transaction_type (str, optional): 'purchase' (positive amounts) or 'refund' (negative amounts).
+            merchant (str, optional): Only include transactions with this merchant.
+
+        Returns:
+            int: The sum of the matching amounts in cents, 0 if nothing matches.
+        """
+        where, params = self._build_filters(user_id, start_date, end_date, transaction_type, merchant)
+        self.flush()
+        with self.pool.connection() as connection:
+            return connection.execute(f'SELECT COALESCE(SUM(amount_cents), 0) FROM transactions WHERE {where}',
+                                      params).fetchone()[0]
+
+    def get_balance(self, user_id: str, start_date: Optional[DateLike] = None,
+                    end_date: Optional[DateLike] = None) -> float:
+        """
+        Returns a user's balance from the ledger tables maintained by triggers.
+
+        Args:
+            user_id (str): The ID of the user.
+            start_date (datetime, optional): Only include transactions on or after this date.
+            end_date (datetime, optional): Only include transactions on or before this date.
+
+        Returns:
+            float: The balance over the requested range, 0.0 if there are no transactions.
+        """
+        return from_cents(self.get_balance_cents(user_id, start_date, end_date))
+
+    def get_balance_cents(self, user_id: str, start_date: Optional[DateLike] = None,
+                          end_date: Optional[DateLike] = None) -> int:
+        """
+        Returns a user's balance in integer cents from the ledger tables maintained by triggers.
+
+        Without dates this is a single primary-key read. With a date range, whole days
+        inside the range come from the daily rollups and only the transactions on the
+        first and last (partial) days are read from the transactions table.
+
+        Args:
+            user_id (str): The ID of the user.
+            start_date (datetime, optional): Only include transactions on or after this date.
+            end_date (datetime, optional): Only include transactions on or before this date.
+
+        Returns:
+            int: The balance over the requested range in cents, 0 if there are no transactions.
+        """
+        self.flush()
+        with self.pool.connection() as connection:
+            if not start_date and not end_date:
+                row = connection.execute('SELECT balance_cents FROM balances WHERE user_id=?', (user_id,)).fetchone()
+                return row[0] if row else 0
+            range_conditions, range_params = ['user_id=?'], [user_id]
+            rollup_conditions, rollup_params = ['user_id=?'], [user_id]
+            edge_conditions, edge_params = [], []
+            if start_date:
+                start = normalize_date(start_date)
+                start_day = start[:10]
+                range_conditions.append('date >= ?')
+                range_params.append(start)
+                if start.endswith('00:00:00.000000'):
+                    rollup_conditions.append('day >= ?')
+                else:
+                    next_day = str(datetime.date.fromisoformat(start_day) + datetime.timedelta(days=1))
+                    rollup_conditions.append('day > ?')
+                    edge_conditions.append('date < ?')
+                    edge_params.append(next_day)
+                rollup_params.append(start_day)
+            if end_date:
+                end = end_bound(end_date)
+                end_day = end[:10]
+                range_conditions.append('date < ?')
+                range_params.append(end)
+                rollup_conditions.append('day < ?')
+                rollup_params.append(end_day)
+                if not end.endswith('00:00:00.000000'):
+                    edge_conditions.append('date >= ?')
+                    edge_params.append(end_day)
+            balance = connection.execute(
+                f"SELECT COALESCE(SUM(total_cents), 0) FROM daily_balances WHERE {' AND '.join(rollup_conditions)}",
+                rollup_params).fetchone()[0]
+            if edge_conditions:
+                balance += connection.execute(
+                    f"SELECT COALESCE(SUM(amount_cents), 0) FROM transactions "
+                    f"WHERE {' AND '.join(range_conditions)} AND ({' OR '.join(edge_conditions)})",
+                    range_params + edge_params).fetchone()[0]
+            return balance
+
+    @staticmethod
+    def _build_filters(user_id: str, start_date: Optional[DateLike] = None,
+                       end_date: Optional[DateLike] = None,
+                       transaction_type: Optional[str] = None,
+                       merchant: Optional[str] = None) -> Tuple[str, List]:
+        """
+        Compiles transaction filters into a parameterized WHERE clause.
+
+        Returns:
+            tuple: The WHERE clause (without the keyword) and its parameters.
+        """
+        conditions = ['user_id=?']
+        params: List = [user_id]
+        if start_date:
+            conditions.append('date >= ?')
+            params.append(normalize_date(start_date))
+        if end_date:
+            conditions.append('date < ?')
+            params.append(end_bound(end_date))
+        if transaction_type:
+            if transaction_type not in TRANSACTION_TYPE_CONDITIONS:
+                raise ValueError(f"Unknown transaction type: {transaction_type!r}")
+            conditions.append(TRANSACTION_TYPE_CONDITIONS[transaction_type])
+        if merchant:
+            conditions.append('merchant=?')
+            params.append(merchant)
+        return ' AND '.join(conditions), params
 
     def delete_transaction(self, transaction_id: int) -> None:
         """
@@ -176,5 +838,6 @@ class TransactionDatabase:
         Args:
             transaction_id (int): The ID of the transaction to be deleted.
         """
-        self.cursor.execute('DELETE FROM transactions WHERE id=?', (transaction_id,))
-        self.connection.commit()
+        self.flush()
+        with self.pool.transaction() as connection:
+            connection.execute('DELETE FROM transactions WHERE id=?', (transaction_id,))
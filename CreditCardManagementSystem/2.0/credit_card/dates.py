@@ -0,0 +1,67 @@
+import datetime
+from typing import Union
+
+# Transaction dates are stored as fixed-precision ISO-8601 text, e.g. '2024-01-31 09:30:00.000000',
+# so that string order equals time order and the first 10 characters are the day.
+DATE_LENGTH = 26
+
+DateLike = Union[datetime.datetime, datetime.date, str]
+
+
+def to_datetime(value: DateLike) -> datetime.datetime:
+    """
+    Converts a datetime, date or ISO-8601 string to a naive datetime.
+
+    Dates become midnight. Timezone-aware values are converted to local time, matching
+    the naive local times produced by datetime.now().
+
+    Parameters:
+    - value (datetime, date or str): The value to convert.
+
+    Returns:
+    - datetime: The naive datetime.
+
+    Raises:
+    - ValueError: If a string is not ISO-8601.
+    """
+    if isinstance(value, datetime.datetime):
+        result = value
+    elif isinstance(value, datetime.date):
+        result = datetime.datetime(value.year, value.month, value.day)
+    else:
+        result = datetime.datetime.fromisoformat(str(value).strip())
+    if result.tzinfo is not None:
+        result = result.astimezone().replace(tzinfo=None)
+    return result
+
+
+def normalize_date(value: DateLike) -> str:
+    """
+    Formats a date for storage: 'YYYY-MM-DD HH:MM:SS.ffffff'.
+
+    Parameters:
+    - value (datetime, date or str): The date to store.
+
+    Returns:
+    - str: The normalized date string.
+    """
+    return to_datetime(value).isoformat(' ', 'microseconds')
+
+
+def end_bound(value: DateLike) -> str:
+    """
+    Returns the exclusive upper bound for an inclusive end date.
+
+    A bare date (a date object or a 'YYYY-MM-DD' string) covers the whole day, so its
+    bound is the following midnight; a datetime covers up to and including that instant.
+
+    Parameters:
+    - value (datetime, date or str): The inclusive end of a range.
+
+    Returns:
+    - str: The normalized exclusive bound.
+    """
+    is_day = (isinstance(value, datetime.date) and not isinstance(value, datetime.datetime)) or (
+        isinstance(value, str) and len(value.strip()) == 10)
+    step = datetime.timedelta(days=1) if is_day else datetime.timedelta(microseconds=1)
+    return normalize_date(to_datetime(value) + step)
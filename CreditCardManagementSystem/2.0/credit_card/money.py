@@ -0,0 +1,38 @@
+from decimal import Decimal, ROUND_HALF_EVEN
+from typing import Union
+
+# Number of minor units (cents) per currency unit.
+CENTS_PER_UNIT = 100
+
+
+def to_cents(amount: Union[int, float, str, Decimal]) -> int:
+    """
+    Converts an amount in currency units to integer cents.
+
+    Floats are rounded to the nearest cent, so binary representation error (e.g. 0.1 + 0.2)
+    never reaches storage; amounts with sub-cent digits are rounded half to even.
+
+    Parameters:
+    - amount (int, float, str or Decimal): The amount in currency units.
+
+    Returns:
+    - int: The amount in cents.
+    """
+    if isinstance(amount, int):
+        return amount * CENTS_PER_UNIT
+    if isinstance(amount, float):
+        return round(amount * CENTS_PER_UNIT)
+    return int((Decimal(amount) * CENTS_PER_UNIT).to_integral_value(ROUND_HALF_EVEN))
+
+
+def from_cents(cents: int) -> float:
+    """
+    Converts integer cents to a float amount in currency units for display and legacy APIs.
+
+    Parameters:
+    - cents (int): The amount in cents.
+
+    Returns:
+    - float: The amount in currency units.
+    """
+    return cents / CENTS_PER_UNIT
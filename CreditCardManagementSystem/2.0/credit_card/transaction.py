@@ -1,8 +1,11 @@
 import datetime
+from credit_card.money import from_cents, to_cents
 
 class Transaction:
     """
     Represents a financial transaction using a credit card.
+
+    The amount is held as integer cents in amount_cents; amount is a float view of it.
     """
 
     def __init__(self, user_id: str, amount: float, date: datetime.date, merchant: str, payment_processed: bool=False) -> None:
@@ -17,11 +20,22 @@ class Transaction:
             payment_processed: flag (boolean) indicating if the payment was successfully processed.
         """
         self.user_id: str = user_id
-        self.amount: float = amount
+        self.amount_cents: int = to_cents(amount)
         self.date: datetime.date = date
         self.merchant: str = merchant
         self.payment_processed = payment_processed
 
+    @property
+    def amount(self) -> float:
+        """
+        The transaction amount in currency units (float).
+        """
+        return from_cents(self.amount_cents)
+
+    @amount.setter
+    def amount(self, amount: float) -> None:
+        self.amount_cents = to_cents(amount)
+
     def get_transaction_details(self) -> str:
         """
         Returns a string containing the transaction details.
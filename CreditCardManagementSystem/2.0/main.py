@@ -24,7 +24,7 @@ user_account.add_card(card.number, card.expiration_date, card.cvv)
 transaction = Transaction(user_account.user_id,100.0, datetime.now(), "Amazon")
 user_account.add_transaction(100.0, datetime.now(), "Amazon")
 print(credit_card_manager.list_accounts())
-print(user_account.get_card(2))
+print(user_account.find_card(card.number))
 print(card.get_masked_number())
 
 # Printing the available transactions
@@ -54,12 +54,12 @@ else:
 # Retrieve account and credit card
 account: Account = credit_card_manager.get_account("user123")
 print("Retrieved Account:", account.user_id)
-credit_card = user_account.get_card(2)  # Assuming credit card ID is 2
+credit_card = user_account.find_card(card.number)
 print("Retrieved Credit Card:", credit_card)
 
 # Remove account and credit card
 credit_card_manager.remove_account("user123")
-user_account.remove_card(1)  # Assuming credit card ID is 1
+user_account.remove_card(credit_card[0])
 
 
 
@@ -1,22 +1,72 @@
 import secrets
+import time
 from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+DEFAULT_SESSION_TTL: timedelta = timedelta(hours=1)
+TOKEN_BYTES: int = 16
+
+def monotonic_ms() -> int:
+    """
+    Returns the monotonic clock in integer milliseconds, the clock used for session expiry.
+
+    Returns:
+        The current monotonic time in milliseconds (int).
+    """
+    return time.monotonic_ns() // 1_000_000
+
+def token_to_bytes(token: str) -> Optional[bytes]:
+    """
+    Converts a hex session token to its raw bytes.
+
+    Args:
+        token: The hex token handed out to clients (str).
+
+    Returns:
+        The raw token bytes, or None if the token is not valid hex of the right length.
+    """
+    try:
+        raw = bytes.fromhex(token)
+    except (TypeError, ValueError):
+        return None
+    return raw if len(raw) == TOKEN_BYTES else None
 
 class Session:
     """
     Manages user sessions using token-based authentication.
+
+    Sessions are compact: the token is kept as raw bytes and the expiry as an integer
+    on the monotonic clock, so validity checks need no datetime arithmetic.
     """
 
-    def __init__(self, user_id: int) -> None:
+    __slots__ = ('user_id', 'raw_token', 'expires_ms', 'sessions')
+
+    def __init__(self, user_id: int, ttl: timedelta = DEFAULT_SESSION_TTL) -> None:
         """
         Initializes a new Session object.
 
         Args:
             user_id: The user's ID (int).
+            ttl: How long the session stays valid (timedelta). Defaults to one hour.
         """
         self.user_id: int = user_id
-        self.token: str = secrets.token_hex(16)  # Generate a random token
-        self.expiration_time: datetime = datetime.now() + timedelta(hours=1)  # Set expiration time to 1 hour from now
-        self.sessions = {}
+        self.raw_token: bytes = secrets.token_bytes(TOKEN_BYTES)  # Generate a random token
+        self.expires_ms: int = monotonic_ms() + int(ttl.total_seconds() * 1000)
+        self.sessions: Optional[Dict[str, str]] = None
+
+    @property
+    def token(self) -> str:
+        """
+        The session token as handed out to clients (32 hex characters).
+        """
+        return self.raw_token.hex()
+
+    @property
+    def expiration_time(self) -> datetime:
+        """
+        The wall-clock time at which the session expires.
+        """
+        return datetime.now() + timedelta(milliseconds=self.expires_ms - monotonic_ms())
 
     def is_valid(self) -> bool:
         """
@@ -25,8 +75,17 @@ class Session:
         Returns:
             True if the token is valid, False otherwise.
         """
-        return datetime.now() < self.expiration_time
-    
+        return monotonic_ms() < self.expires_ms
+
+    def expires_at(self) -> int:
+        """
+        Returns the expiration time on the monotonic_ms() clock, as used by the session expiry wheel.
+
+        Returns:
+            The expiration time in milliseconds (int).
+        """
+        return self.expires_ms
+
     def authorize_session(self, user_id: str) -> str:
         """
         Generates and returns a session token for the authenticated user.
@@ -37,7 +96,9 @@ class Session:
         Returns:
         - str: The generated session token.
         """
-        session_token: str = secrets.token_hex(16)
+        session_token: str = secrets.token_hex(TOKEN_BYTES)
+        if self.sessions is None:
+            self.sessions = {}
         self.sessions[user_id] = session_token
         return session_token
 
@@ -52,4 +113,4 @@ class Session:
         Returns:
         - bool: True if the user is authorized, False otherwise.
         """
-        return user_id in self.sessions and self.sessions[user_id] == session_token
\ No newline at end of file
+        return self.sessions is not None and self.sessions.get(user_id) == session_token
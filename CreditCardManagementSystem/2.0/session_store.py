@@ -0,0 +1,428 @@
+import threading
+from array import array
+from datetime import timedelta
+from typing import Dict, Hashable, List, Optional, Set, Union
+import secrets
+from session import DEFAULT_SESSION_TTL, TOKEN_BYTES, Session, monotonic_ms, token_to_bytes
+
+class ExpiryWheel:
+    """
+    A hashed timing wheel that buckets tokens by the tick in which they expire.
+
+    Scheduling and cancelling are constant time, and advancing the wheel only visits
+    the buckets that have come due, so each expiry costs amortized O(1).
+    """
+
+    def __init__(self, resolution: int = 1000) -> None:
+        """
+        Initializes an empty ExpiryWheel.
+
+        Parameters:
+        - resolution (int): The width of one tick in clock units (milliseconds for sessions).
+          Tokens are expired at most this long after their expiration time.
+        """
+        self.resolution: int = resolution
+        self._buckets: Dict[int, Set[Hashable]] = {}
+        self._last_tick: Optional[int] = None
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def _tick(self, timestamp: int) -> int:
+        return -(-timestamp // self.resolution)
+
+    def schedule(self, token: Hashable, expires_at: int) -> None:
+        """
+        Schedules a token to expire at the given time.
+
+        Parameters:
+        - token (Hashable): The session token.
+        - expires_at (int): The expiration time in the clock used by advance().
+        """
+        self._buckets.setdefault(self._tick(expires_at), set()).add(token)
+
+    def cancel(self, token: Hashable, expires_at: int) -> None:
+        """
+        Removes a scheduled token, e.g. when its session is invalidated early.
+
+        Parameters:
+        - token (Hashable): The session token.
+        - expires_at (int): The expiration time the token was scheduled with.
+        """
+        tick = self._tick(expires_at)
+        bucket = self._buckets.get(tick)
+        if bucket is not None:
+            bucket.discard(token)
+            if not bucket:
+                del self._buckets[tick]
+
+    def advance(self, now: int) -> List[Hashable]:
+        """
+        Moves the wheel to the given time and returns every token that has expired.
+
+        Parameters:
+        - now (int): The current time in the clock used by schedule().
+
+        Returns:
+        - List[Hashable]: The expired tokens.
+        """
+        now_tick = now // self.resolution
+        if self._last_tick is None or now_tick - self._last_tick > len(self._buckets):
+            # After a long pause it is cheaper to visit the occupied buckets than every tick.
+            due = [tick for tick in self._buckets if tick <= now_tick]
+        else:
+            due = [tick for tick in range(self._last_tick + 1, now_tick + 1) if tick in self._buckets]
+        self._last_tick = now_tick
+        expired: List[Hashable] = []
+        for tick in due:
+            expired.extend(self._buckets.pop(tick))
+        return expired
+
+
+class SessionStore:
+    """
+    Stores sessions indexed by token and by user, so lookups and invalidation take
+    constant time regardless of how many sessions are live. Expired sessions are
+    evicted through an ExpiryWheel. Sessions are indexed by their raw token bytes,
+    so the index shares the key object with the session instead of a hex copy.
+    """
+
+    def __init__(self, resolution: float = 1.0) -> None:
+        """
+        Initializes an empty SessionStore.
+
+        Parameters:
+        - resolution (float): The expiry wheel tick in seconds.
+        """
+        self._sessions_by_token: Dict[bytes, Session] = {}
+        # A user with a single session maps straight to its token; a set is only
+        # allocated once the user opens a second session.
+        self._tokens_by_user: Dict[str, Union[bytes, Set[bytes]]] = {}
+        self._wheel: ExpiryWheel = ExpiryWheel(max(1, int(resolution * 1000)))
+        self._lock = threading.Lock()
+        self.evicted: int = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions_by_token)
+
+    def __contains__(self, token: str) -> bool:
+        return token_to_bytes(token) in self._sessions_by_token
+
+    def add(self, session: Session) -> None:
+        """
+        Adds a session. A user may hold several sessions at once.
+
+        Parameters:
+        - session (Session): The session to store.
+        """
+        with self._lock:
+            self._sessions_by_token[session.raw_token] = session
+            tokens = self._tokens_by_user.get(session.user_id)
+            if tokens is None:
+                self._tokens_by_user[session.user_id] = session.raw_token
+            elif isinstance(tokens, bytes):
+                self._tokens_by_user[session.user_id] = {tokens, session.raw_token}
+            else:
+                tokens.add(session.raw_token)
+            self._wheel.schedule(session.raw_token, session.expires_at())
+
+    def get(self, token: str) -> Optional[Session]:
+        """
+        Retrieves a valid session by its token. Expired sessions are removed on access.
+
+        Parameters:
+        - token (str): The session token.
+
+        Returns:
+        - Session: The session if found and valid, else None.
+        """
+        raw_token = token_to_bytes(token)
+        session = self._sessions_by_token.get(raw_token)
+        if session is None:
+            return None
+        if not session.is_valid():
+            if self._invalidate(raw_token):
+                self.evicted += 1
+            return None
+        return session
+
+    def get_user_sessions(self, user_id: str) -> List[Session]:
+        """
+        Retrieves all stored sessions of a user.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - List[Session]: The user's sessions, possibly including expired ones.
+        """
+        with self._lock:
+            return [self._sessions_by_token[token] for token in self._user_tokens(user_id)]
+
+    def invalidate(self, token: str) -> bool:
+        """
+        Removes the session with the given token.
+
+        Parameters:
+        - token (str): The session token.
+
+        Returns:
+        - bool: True if a session was removed, False if the token was unknown.
+        """
+        return self._invalidate(token_to_bytes(token))
+
+    def _invalidate(self, raw_token: Optional[bytes]) -> bool:
+        """
+        Removes a session by its raw token and cancels its scheduled expiry.
+        """
+        with self._lock:
+            session = self._remove(raw_token)
+            if session is None:
+                return False
+            self._wheel.cancel(raw_token, session.expires_at())
+            return True
+
+    def invalidate_user(self, user_id: str) -> int:
+        """
+        Removes every session of a user.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - int: The number of sessions removed.
+        """
+        with self._lock:
+            tokens = self._user_tokens(user_id)
+            self._tokens_by_user.pop(user_id, None)
+            for token in tokens:
+                session = self._sessions_by_token.pop(token, None)
+                if session is not None:
+                    self._wheel.cancel(token, session.expires_at())
+            return len(tokens)
+
+    def evict_expired(self, now: Optional[int] = None) -> int:
+        """
+        Removes every session whose expiration time has passed.
+
+        Parameters:
+        - now (int, optional): The current time in milliseconds. Defaults to monotonic_ms().
+
+        Returns:
+        - int: The number of sessions evicted.
+        """
+        with self._lock:
+            count = 0
+            for token in self._wheel.advance(monotonic_ms() if now is None else now):
+                if self._remove(token) is not None:
+                    count += 1
+            self.evicted += count
+            return count
+
+    def _remove(self, token: Optional[bytes]) -> Optional[Session]:
+        """
+        Drops a token from both indexes. Caller holds the lock.
+        """
+        session = self._sessions_by_token.pop(token, None)
+        if session is not None:
+            tokens = self._tokens_by_user.get(session.user_id)
+            if isinstance(tokens, bytes):
+                if tokens == token:
+                    del self._tokens_by_user[session.user_id]
+            elif tokens is not None:
+                tokens.discard(token)
+                if len(tokens) == 1:
+                    self._tokens_by_user[session.user_id] = next(iter(tokens))
+        return session
+
+    def _user_tokens(self, user_id: str) -> List[bytes]:
+        """
+        Returns the raw tokens of a user's sessions. Caller holds the lock.
+        """
+        tokens = self._tokens_by_user.get(user_id)
+        if tokens is None:
+            return []
+        if isinstance(tokens, bytes):
+            return [tokens]
+        return list(tokens)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Returns counters describing the store.
+
+        Returns:
+        - Dict[str, int]: 'live' sessions, 'users' with sessions and sessions 'evicted' so far.
+        """
+        return {'live': len(self._sessions_by_token), 'users': len(self._tokens_by_user), 'evicted': self.evicted}
+
+
+class SessionTable:
+    """
+    An array-backed alternative to SessionStore for very large session counts.
+
+    No Session object is kept per session: expiry times live in a packed array of
+    64-bit integers, user IDs in a list, and the token index maps raw token bytes to
+    a slot number. Freed slots are reused. Lookups return the user ID rather than a
+    Session object.
+    """
+
+    def __init__(self, resolution: float = 1.0) -> None:
+        """
+        Initializes an empty SessionTable.
+
+        Parameters:
+        - resolution (float): The expiry wheel tick in seconds.
+        """
+        self._slots: Dict[bytes, int] = {}
+        self._expires: array = array('q')
+        self._user_ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._wheel: ExpiryWheel = ExpiryWheel(max(1, int(resolution * 1000)))
+        self._lock = threading.Lock()
+        self.evicted: int = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, token: str) -> bool:
+        return token_to_bytes(token) in self._slots
+
+    def create(self, user_id: str, ttl: timedelta = DEFAULT_SESSION_TTL) -> str:
+        """
+        Creates a session for a user.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+        - ttl (timedelta): How long the session stays valid.
+
+        Returns:
+        - str: The hex token of the new session.
+        """
+        raw_token = secrets.token_bytes(TOKEN_BYTES)
+        expires_ms = monotonic_ms() + int(ttl.total_seconds() * 1000)
+        with self._lock:
+            if self._free:
+                slot = self._free.pop()
+                self._expires[slot] = expires_ms
+                self._user_ids[slot] = user_id
+            else:
+                slot = len(self._user_ids)
+                self._expires.append(expires_ms)
+                self._user_ids.append(user_id)
+            self._slots[raw_token] = slot
+            self._wheel.schedule(raw_token, expires_ms)
+        return raw_token.hex()
+
+    def validate(self, token: str) -> Optional[str]:
+        """
+        Checks a token and returns the user it belongs to.
+
+        Parameters:
+        - token (str): The session token.
+
+        Returns:
+        - str: The user ID if the session exists and is valid, else None.
+        """
+        slot = self._slots.get(token_to_bytes(token))
+        if slot is None:
+            return None
+        if monotonic_ms() >= self._expires[slot]:
+            return None
+        return self._user_ids[slot]
+
+    def invalidate(self, token: str) -> bool:
+        """
+        Removes the session with the given token.
+
+        Parameters:
+        - token (str): The session token.
+
+        Returns:
+        - bool: True if a session was removed, False if the token was unknown.
+        """
+        raw_token = token_to_bytes(token)
+        with self._lock:
+            slot = self._slots.get(raw_token)
+            if slot is None:
+                return False
+            self._wheel.cancel(raw_token, self._expires[slot])
+            self._release(raw_token)
+            return True
+
+    def evict_expired(self, now: Optional[int] = None) -> int:
+        """
+        Removes every session whose expiration time has passed.
+
+        Parameters:
+        - now (int, optional): The current time in milliseconds. Defaults to monotonic_ms().
+
+        Returns:
+        - int: The number of sessions evicted.
+        """
+        with self._lock:
+            count = 0
+            for raw_token in self._wheel.advance(monotonic_ms() if now is None else now):
+                if raw_token in self._slots:
+                    self._release(raw_token)
+                    count += 1
+            self.evicted += count
+            return count
+
+    def _release(self, raw_token: bytes) -> None:
+        """
+        Frees the slot of a token for reuse. Caller holds the lock.
+        """
+        slot = self._slots.pop(raw_token)
+        self._user_ids[slot] = None
+        self._free.append(slot)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Returns counters describing the table.
+
+        Returns:
+        - Dict[str, int]: 'live' sessions, allocated 'slots' and sessions 'evicted' so far.
+        """
+        return {'live': len(self._slots), 'slots': len(self._user_ids), 'evicted': self.evicted}
+
+
+class SessionSweeper:
+    """
+    Periodically evicts expired sessions from a SessionStore or SessionTable on a background thread.
+    """
+
+    def __init__(self, store: Union[SessionStore, SessionTable], interval: float = 60.0) -> None:
+        """
+        Initializes a SessionSweeper object.
+
+        Parameters:
+        - store (SessionStore or SessionTable): The store to sweep.
+        - interval (float): Seconds between sweeps.
+        """
+        self.store: Union[SessionStore, SessionTable] = store
+        self.interval: float = interval
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Starts the sweeper thread if it is not already running.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='session-sweeper', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the sweeper thread and waits for it to exit.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.store.evict_expired()
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class LRUCache:
+    """
+    A bounded, thread-safe least-recently-used cache with an optional time to live.
+
+    Lookups go through get_or_load(), which calls the loader on a miss and keeps
+    non-None results. Writers call invalidate() after changing the underlying row;
+    a load that overlaps an invalidation is returned but not stored, so a reader
+    racing a writer cannot put a stale row back into the cache.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None) -> None:
+        """
+        Initializes an empty LRUCache.
+
+        Parameters:
+        - max_size (int): The maximum number of entries kept; 0 disables caching.
+        - ttl (float, optional): Seconds an entry stays valid, bounding staleness from writes
+          made by other processes. None keeps entries until they are evicted or invalidated.
+        """
+        self.max_size: int = max_size
+        self.ttl: Optional[float] = ttl
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[Any, float]]' = OrderedDict()
+        self._generation: int = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure(self, max_size: Optional[int] = None, ttl: Optional[float] = None) -> None:
+        """
+        Changes the size bound or time to live, evicting entries that no longer fit.
+
+        Parameters:
+        - max_size (int, optional): The new maximum number of entries.
+        - ttl (float, optional): The new time to live in seconds.
+        """
+        with self._lock:
+            if max_size is not None:
+                self.max_size = max_size
+            if ttl is not None:
+                self.ttl = ttl
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the cached value for a key, loading and caching it on a miss.
+
+        Parameters:
+        - key (Hashable): The cache key.
+        - loader (Callable): Called without arguments to fetch the value on a miss.
+
+        Returns:
+        - Any: The cached or freshly loaded value.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            self.misses += 1
+            generation = self._generation
+        value = loader()
+        if value is not None and self.max_size > 0:
+            expires = now + self.ttl if self.ttl is not None else float('inf')
+            with self._lock:
+                if generation == self._generation:
+                    self._entries[key] = (value, expires)
+                    self._entries.move_to_end(key)
+                    if len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return value
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """
+        Drops the given keys; called by writers once their change is made.
+
+        Parameters:
+        - *keys (Hashable): The keys whose rows changed.
+        """
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drops every entry.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def get_metrics(self) -> Dict[str, int]:
+        """
+        Returns counters describing the cache.
+
+        Returns:
+        - Dict[str, int]: Cached 'entries', lookup 'hits' and 'misses', and LRU 'evictions'.
+        """
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+_caches: Dict[Tuple[str, str], LRUCache] = {}
+_default_options: Dict[str, Any] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(database: str, table: str, **options: Any) -> LRUCache:
+    """
+    Returns the process-wide cache for a table in a database file, creating it on first use.
+
+    Every database object for the same file shares the cache, so a write through
+    one of them invalidates the rows read through the others.
+
+    Parameters:
+    - database (str): The name of the SQLite database file.
+    - table (str): The cached table.
+    - **options: Keyword arguments for LRUCache, used only when the cache is created and
+      combined with the defaults set through configure_caches().
+
+    Returns:
+    - LRUCache: The shared cache for the table.
+    """
+    key = (database if database == ':memory:' else os.path.abspath(database), table)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = LRUCache(**{**_default_options, **options})
+        return cache
+
+
+def configure_caches(**options: Any) -> None:
+    """
+    Sets the size bound or time to live for every existing cache and every cache created afterwards.
+
+    Parameters:
+    - **options: max_size and/or ttl, as accepted by LRUCache.
+    """
+    with _caches_lock:
+        _default_options.update(options)
+        for cache in _caches.values():
+            cache.configure(**options)
+
+
+def clear_all() -> None:
+    """
+    Drops the entries of every cache, e.g. after another process rewrote the database files.
+    """
+    with _caches_lock:
+        for cache in _caches.values():
+            cache.clear()
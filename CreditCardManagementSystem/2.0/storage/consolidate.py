@@ -0,0 +1,88 @@
+"""
+Copies the three-file layout (accounts.db, credit_cards.db, transactions.db) into
+one unified database file for use with Repository.unified().
+
+Run from the directory holding the database files:
+    python -m storage.consolidate --target bank.db
+"""
+import argparse
+import sqlite3
+from typing import Dict, List
+from storage.repository import Repository
+
+TABLES = ('accounts', 'credit_cards', 'transactions')
+
+
+def _columns(connection: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    """
+    Returns the column names of a table in an attached schema.
+
+    Parameters:
+    - connection (sqlite3.Connection): The connection with the schema attached.
+    - schema (str): The schema name ('main' or an attached alias).
+    - table (str): The table name.
+
+    Returns:
+    - List[str]: The column names in declaration order.
+    """
+    return [row[1] for row in connection.execute(f"PRAGMA {schema}.table_info({table})")]
+
+
+def consolidate(target: str, accounts_db: str = 'accounts.db', credit_cards_db: str = 'credit_cards.db',
+                transactions_db: str = 'transactions.db') -> Dict[str, int]:
+    """
+    Copies every account, card and transaction row into a unified database file.
+
+    Both sides are first brought to the current schema by opening them through a
+    Repository. The copy runs in a single write transaction with the source files
+    attached, keeps row ids, and lets the ledger triggers rebuild the balance tables.
+
+    Parameters:
+    - target (str): The unified database file to create or fill. Its tables must be empty.
+    - accounts_db (str): The source accounts file.
+    - credit_cards_db (str): The source credit cards file.
+    - transactions_db (str): The source transactions file.
+
+    Returns:
+    - Dict[str, int]: The number of rows copied per table.
+    """
+    sources = dict(zip(TABLES, (accounts_db, credit_cards_db, transactions_db)))
+    Repository(accounts_db, credit_cards_db, transactions_db).close()
+    Repository.unified(target).close()
+
+    connection = sqlite3.connect(target, isolation_level=None)
+    try:
+        for table, source in sources.items():
+            connection.execute(f"ATTACH DATABASE ? AS source_{table}", (source,))
+        copied = {}
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            for table in TABLES:
+                if connection.execute(f"SELECT 1 FROM main.{table} LIMIT 1").fetchone():
+                    raise ValueError(f"Target table {table} in {target} is not empty")
+                source_columns = set(_columns(connection, f"source_{table}", table))
+                columns = ', '.join(column for column in _columns(connection, 'main', table)
+                                    if column in source_columns)
+                copied[table] = connection.execute(
+                    f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM source_{table}.{table}"
+                ).rowcount
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        for table in TABLES:
+            connection.execute(f"DETACH DATABASE source_{table}")
+    finally:
+        connection.close()
+    return copied
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--target', default='bank.db', help='the unified database file to write')
+    parser.add_argument('--accounts', default='accounts.db')
+    parser.add_argument('--credit-cards', default='credit_cards.db')
+    parser.add_argument('--transactions', default='transactions.db')
+    args = parser.parse_args()
+    for table, count in consolidate(args.target, args.accounts, args.credit_cards, args.transactions).items():
+        print(f"{table:<14} {count:>10} rows")
@@ -0,0 +1,93 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class DatabaseExecutor:
+    """
+    Runs blocking database work for one SQLite file on a dedicated thread.
+
+    Coroutines submit work with run(); at most max_pending requests are queued for
+    the thread at a time and further callers wait their turn on the event loop,
+    so a burst of requests applies backpressure instead of growing an unbounded queue.
+    """
+
+    def __init__(self, database: str, max_pending: int = 1000) -> None:
+        """
+        Initializes a DatabaseExecutor object.
+
+        Parameters:
+        - database (str): The name of the SQLite database file served by this executor.
+        - max_pending (int): The maximum number of requests queued for the thread.
+        """
+        self.database: str = database
+        self.max_pending: int = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1,
+                                            thread_name_prefix=f"db-{os.path.basename(database)}")
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._pending_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def run(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs a blocking function on the database thread and waits for its result.
+
+        Parameters:
+        - function (Callable): The blocking function to run.
+        - *args, **kwargs: Arguments passed to the function.
+
+        Returns:
+        - Any: The function's return value.
+        """
+        loop = asyncio.get_running_loop()
+        if self._pending_loop is not loop:
+            self._pending, self._pending_loop = asyncio.Semaphore(self.max_pending), loop
+        async with self._pending:
+            return await loop.run_in_executor(self._executor, functools.partial(function, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the database thread after the queued work finishes.
+
+        Parameters:
+        - wait (bool): Whether to block until the queued work is done.
+        """
+        self._executor.shutdown(wait=wait)
+
+
+_executors: Dict[str, DatabaseExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(database: str, max_pending: int = 1000) -> DatabaseExecutor:
+    """
+    Returns the process-wide executor for a database file, creating it on first use.
+
+    Parameters:
+    - database (str): The name of the SQLite database file.
+    - max_pending (int): The queue bound, used only when the executor is created.
+
+    Returns:
+    - DatabaseExecutor: The shared executor for the database.
+    """
+    key = database if database == ':memory:' else os.path.abspath(database)
+    with _executors_lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = _executors[key] = DatabaseExecutor(database, max_pending)
+        return executor
+
+
+def shutdown_all(wait: bool = True) -> None:
+    """
+    Stops every database executor and forgets them.
+
+    Parameters:
+    - wait (bool): Whether to block until queued work is done.
+    """
+    with _executors_lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=wait)
+        _executors.clear()
@@ -0,0 +1,184 @@
+import bisect
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in milliseconds, of the latency histogram buckets; a final bucket
+# collects everything slower than the last bound.
+LATENCY_BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+_BUCKET_BOUNDS = tuple(bound / 1000 for bound in LATENCY_BUCKETS_MS)
+
+
+class QueryStats:
+    """
+    Per-statement counters for one database: calls, rows returned, total and maximum
+    latency, and a latency histogram.
+
+    Statements are keyed by their SQL text with whitespace collapsed, so the same
+    statement issued from different call sites is counted once. Latency covers
+    executing the statement and fetching its rows.
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = None) -> None:
+        """
+        Initializes an empty QueryStats object.
+
+        Parameters:
+        - slow_query_ms (float, optional): Statements taking at least this many milliseconds
+          are logged as warnings on the 'storage.instrumentation' logger. None disables the log.
+        """
+        self.slow_query_ms: Optional[float] = slow_query_ms
+        self._queries: Dict[str, List] = {}
+        self._keys: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, elapsed: float, rows: int) -> None:
+        """
+        Adds one statement execution.
+
+        Parameters:
+        - sql (str): The SQL text as executed.
+        - elapsed (float): Seconds spent executing the statement and fetching its rows.
+        - rows (int): The number of rows fetched.
+        """
+        key = self._keys.get(sql)
+        if key is None:
+            key = self._keys[sql] = ' '.join(sql.split())
+        bucket = bisect.bisect_left(_BUCKET_BOUNDS, elapsed)
+        with self._lock:
+            entry = self._queries.get(key)
+            if entry is None:
+                entry = self._queries[key] = [0, 0, 0.0, 0.0, [0] * (len(_BUCKET_BOUNDS) + 1)]
+            entry[0] += 1
+            entry[1] += rows
+            entry[2] += elapsed
+            entry[3] = max(entry[3], elapsed)
+            entry[4][bucket] += 1
+        if self.slow_query_ms is not None and elapsed * 1000 >= self.slow_query_ms:
+            logger.warning("Slow query (%.1f ms, %d rows): %s", elapsed * 1000, rows, key)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the counters of every statement seen so far.
+
+        Returns:
+        - Dict[str, Dict[str, Any]]: Per SQL text, the number of 'calls', 'rows' returned,
+          'total_ms', 'mean_ms' and 'max_ms' latency, and the 'histogram' counts per
+          LATENCY_BUCKETS_MS bucket (plus one overflow bucket).
+        """
+        with self._lock:
+            return {sql: {'calls': calls, 'rows': rows, 'total_ms': total * 1000, 'mean_ms': total * 1000 / calls,
+                          'max_ms': longest * 1000, 'histogram': list(histogram)}
+                    for sql, (calls, rows, total, longest, histogram) in self._queries.items()}
+
+    def reset(self) -> None:
+        """
+        Drops all counters.
+        """
+        with self._lock:
+            self._queries.clear()
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    A cursor that reports each statement, including the time spent fetching its rows,
+    to the QueryStats of its connection.
+
+    A statement is recorded when the cursor runs its next statement, is closed, or is
+    garbage collected, so the usual connection.execute(...).fetchone() pattern is
+    recorded as soon as the expression finishes.
+    """
+
+    def __init__(self, connection: 'InstrumentedConnection') -> None:
+        super().__init__(connection)
+        self._stats: Optional[QueryStats] = connection.stats
+        self._sql: Optional[str] = None
+        self._elapsed: float = 0.0
+        self._rows: int = 0
+
+    def _finish(self) -> None:
+        if self._sql is not None and self._stats is not None:
+            self._stats.record(self._sql, self._elapsed, self._rows)
+        self._sql = None
+
+    def execute(self, sql: str, parameters: Any = ()) -> 'InstrumentedCursor':
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._sql, self._elapsed, self._rows = sql, time.perf_counter() - start, 0
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> 'InstrumentedCursor':
+        self._finish()
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._sql, self._elapsed, self._rows = sql, time.perf_counter() - start, 0
+
+    def fetchone(self) -> Any:
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._elapsed += time.perf_counter() - start
+        self._rows += row is not None
+        return row
+
+    def fetchmany(self, size: int = -1) -> List:
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size == -1 else size)
+        self._elapsed += time.perf_counter() - start
+        self._rows += len(rows)
+        return rows
+
+    def fetchall(self) -> List:
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._elapsed += time.perf_counter() - start
+        self._rows += len(rows)
+        return rows
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        finally:
+            self._elapsed += time.perf_counter() - start
+        self._rows += 1
+        return row
+
+    def close(self) -> None:
+        self._finish()
+        super().close()
+
+    def __del__(self) -> None:
+        try:
+            self._finish()
+        except Exception:  # Never raise from a finalizer, e.g. during interpreter shutdown.
+            pass
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    A connection whose execute() and executemany() shortcuts use InstrumentedCursor.
+
+    Statements run before stats is assigned (e.g. the PRAGMAs applied when a pool
+    opens the connection) are not recorded.
+    """
+
+    stats: Optional[QueryStats] = None
+
+    def execute(self, sql: str, parameters: Any = ()) -> sqlite3.Cursor:
+        if self.stats is None:
+            return super().execute(sql, parameters)
+        return self.cursor(InstrumentedCursor).execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Any) -> sqlite3.Cursor:
+        if self.stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor(InstrumentedCursor).executemany(sql, seq_of_parameters)
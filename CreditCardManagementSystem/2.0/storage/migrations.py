@@ -0,0 +1,89 @@
+import sqlite3
+from typing import Callable, Sequence, Union
+
+
+class Migration:
+    """
+    A single versioned schema change for one component of the database.
+    """
+
+    def __init__(self, version: int, description: str,
+                 apply: Union[Sequence[str], Callable[[sqlite3.Connection], None]]) -> None:
+        """
+        Initializes a Migration object.
+
+        Parameters:
+        - version (int): The schema version reached after this migration (starting at 1).
+        - description (str): A short human-readable summary of the change.
+        - apply (Sequence[str] or Callable): SQL statements to execute in order, or a
+          function receiving the connection for changes that need Python logic.
+        """
+        self.version: int = version
+        self.description: str = description
+        self.apply: Union[Sequence[str], Callable[[sqlite3.Connection], None]] = apply
+
+    def run(self, connection: sqlite3.Connection) -> None:
+        """
+        Applies the migration on the given connection.
+
+        Parameters:
+        - connection (sqlite3.Connection): The connection holding the migration transaction.
+        """
+        if callable(self.apply):
+            self.apply(connection)
+        else:
+            for statement in self.apply:
+                connection.execute(statement)
+
+
+def get_schema_version(connection: sqlite3.Connection, component: str) -> int:
+    """
+    Returns the schema version recorded for a component, or 0 if none is recorded.
+
+    Parameters:
+    - connection (sqlite3.Connection): The database connection.
+    - component (str): The component name (e.g. 'accounts').
+
+    Returns:
+    - int: The current schema version.
+    """
+    connection.execute('''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            component TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    row = connection.execute('SELECT version FROM schema_migrations WHERE component=?', (component,)).fetchone()
+    return row[0] if row else 0
+
+
+def apply_migrations(connection: sqlite3.Connection, component: str, migrations: Sequence[Migration]) -> int:
+    """
+    Brings a component's schema up to date by applying its pending migrations.
+
+    All pending migrations run inside one write transaction, so concurrent processes
+    starting up at the same time apply each migration exactly once, and a failing
+    migration leaves the schema at its previous version. Components sharing one
+    database file keep separate version counters.
+
+    Parameters:
+    - connection (sqlite3.Connection): The database connection.
+    - component (str): The component name (e.g. 'accounts').
+    - migrations (Sequence[Migration]): Every migration of the component.
+
+    Returns:
+    - int: The schema version after migrating.
+    """
+    if not connection.in_transaction:
+        connection.execute('BEGIN IMMEDIATE')
+    version = get_schema_version(connection, component)
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= version:
+            continue
+        migration.run(connection)
+        version = migration.version
+        connection.execute('''
+            INSERT INTO schema_migrations (component, version) VALUES (?, ?)
+            ON CONFLICT (component) DO UPDATE SET version=excluded.version
+        ''', (component, version))
+    return version
@@ -0,0 +1,396 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from storage.instrumentation import InstrumentedConnection, QueryStats
+
+# Pool options for running the database layer from many worker threads: every thread
+# keeps its own connection, readers never block the writer (WAL), commits skip the
+# per-transaction fsync of the WAL (synchronous=NORMAL), and lock contention waits.
+MULTI_WORKER_OPTIONS: Dict[str, Any] = {
+    'max_size': 64,
+    'thread_local': True,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 10000,
+}
+
+
+class PoolTimeoutError(RuntimeError):
+    """
+    Raised when no connection becomes available within the pool timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-aware pool of SQLite connections for a single database file.
+
+    Connections are checked out for the duration of one operation and returned
+    afterwards, so the cost of opening a connection is paid once per pooled
+    connection instead of once per request. In thread-local mode each thread keeps
+    the connection it first checked out until the thread exits.
+    """
+
+    def __init__(self, database: str, max_size: int = 8, timeout: float = 5.0,
+                 health_check_interval: float = 30.0, thread_local: bool = False,
+                 journal_mode: Optional[str] = None, synchronous: Optional[str] = None,
+                 busy_timeout: int = 5000, busy_retries: int = 10, cached_statements: int = 128,
+                 instrument: bool = False, slow_query_ms: Optional[float] = None) -> None:
+        """
+        Initializes a ConnectionPool object.
+
+        Parameters:
+        - database (str): The name of the SQLite database file.
+        - max_size (int): The maximum number of open connections.
+        - timeout (float): Seconds to wait for a free connection before giving up.
+        - health_check_interval (float): Idle seconds after which a connection is
+          pinged before being handed out again.
+        - thread_local (bool): Give every thread its own long-lived connection.
+        - journal_mode (str, optional): A PRAGMA journal_mode value such as 'WAL'.
+        - synchronous (str, optional): A PRAGMA synchronous value such as 'NORMAL'.
+        - busy_timeout (int): Milliseconds a statement waits on a locked database.
+        - busy_retries (int): How often a transaction retries to take the write lock
+          when the database is still busy after busy_timeout.
+        - cached_statements (int): The number of prepared statements each connection keeps
+          compiled, keyed by SQL text.
+        - instrument (bool): Record per-statement counts, rows and latency in the pool's stats.
+        - slow_query_ms (float, optional): With instrument, log statements taking at least
+          this many milliseconds.
+        """
+        if database == ':memory:':
+            # Every connection to ':memory:' is a separate database, so only one may exist.
+            max_size = 1
+            thread_local = False
+        self.database: str = database
+        self.max_size: int = max_size
+        self.timeout: float = timeout
+        self.health_check_interval: float = health_check_interval
+        self.thread_local: bool = thread_local
+        self.journal_mode: Optional[str] = journal_mode
+        self.synchronous: Optional[str] = synchronous
+        self.busy_timeout: int = busy_timeout
+        self.busy_retries: int = busy_retries
+        self.cached_statements: int = cached_statements
+        self.instrument: bool = instrument
+        self.slow_query_ms: Optional[float] = slow_query_ms
+        self.stats: QueryStats = QueryStats(slow_query_ms)
+        self.busy_waits: int = 0
+        self.created: int = 0
+        self.checkouts: int = 0
+        self.discarded: int = 0
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        self._size: int = 0
+        self._condition = threading.Condition()
+        self._local = threading.local()
+        self._initialized: Set[str] = set()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Opens a new connection that may be handed between threads.
+        """
+        connection = sqlite3.connect(self.database, timeout=self.busy_timeout / 1000, check_same_thread=False,
+                                     cached_statements=self.cached_statements,
+                                     factory=InstrumentedConnection if self.instrument else sqlite3.Connection)
+        connection.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout)}')
+        if self.journal_mode:
+            connection.execute(f'PRAGMA journal_mode = {self.journal_mode}')
+        if self.synchronous:
+            connection.execute(f'PRAGMA synchronous = {self.synchronous}')
+        if self.instrument:
+            connection.stats = self.stats
+        self.created += 1
+        return connection
+
+    def configure(self, **options: Any) -> None:
+        """
+        Changes pool options. Idle connections are closed so that new ones pick up the
+        options; connections owned by running threads keep their settings.
+
+        Parameters:
+        - **options: Any of the keyword arguments accepted by the constructor except database.
+        """
+        for name, value in options.items():
+            if name == 'database' or not hasattr(self, name):
+                raise TypeError(f"Unknown pool option: {name}")
+            setattr(self, name, value)
+        self.stats.slow_query_ms = self.slow_query_ms
+        self.close()
+
+    @staticmethod
+    def _is_healthy(connection: sqlite3.Connection) -> bool:
+        """
+        Checks that a connection can still execute statements.
+        """
+        try:
+            connection.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def checkout(self) -> sqlite3.Connection:
+        """
+        Takes a connection out of the pool, opening a new one if the pool is not full.
+
+        Returns:
+        - sqlite3.Connection: A connection owned by the caller until checkin().
+
+        Raises:
+        - PoolTimeoutError: If the pool is exhausted for longer than the timeout.
+        """
+        if self.thread_local:
+            owned = getattr(self._local, 'owned', None)
+            if owned is not None:
+                self.checkouts += 1
+                return owned
+        connection = self._checkout_shared()
+        if self.thread_local:
+            self._local.owned = connection
+            weakref.finalize(threading.current_thread(), self._release_owned, connection)
+        return connection
+
+    def _checkout_shared(self) -> sqlite3.Connection:
+        """
+        Takes an idle connection or opens a new one, waiting while the pool is full.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._condition:
+            while True:
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    if time.monotonic() - last_used < self.health_check_interval or self._is_healthy(connection):
+                        self.checkouts += 1
+                        return connection
+                    self._discard(connection)
+                    continue
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(f"No connection to {self.database} available after {self.timeout}s")
+                self._condition.wait(remaining)
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self.checkouts += 1
+        return connection
+
+    def checkin(self, connection: sqlite3.Connection) -> None:
+        """
+        Returns a connection to the pool, rolling back any transaction left open.
+
+        Parameters:
+        - connection (sqlite3.Connection): A connection obtained from checkout().
+        """
+        if self.thread_local and connection is getattr(self._local, 'owned', None):
+            if connection.in_transaction:
+                connection.rollback()
+            return
+        with self._condition:
+            try:
+                if connection.in_transaction:
+                    connection.rollback()
+                self._idle.append((connection, time.monotonic()))
+            except sqlite3.Error:
+                self._discard(connection)
+            self._condition.notify()
+
+    def _release_owned(self, connection: sqlite3.Connection) -> None:
+        """
+        Closes the connection of a thread that has exited and frees its slot.
+        """
+        with self._condition:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+            self._size -= 1
+            self._condition.notify()
+
+    def _begin(self, connection: sqlite3.Connection) -> None:
+        """
+        Starts a write transaction, retrying with backoff while the database is busy.
+
+        Taking the write lock up front (BEGIN IMMEDIATE) means a transaction never has
+        to upgrade a read lock later, which SQLite refuses with SQLITE_BUSY without
+        waiting. Nothing has run yet when BEGIN fails, so retrying it is always safe.
+        """
+        for attempt in range(self.busy_retries + 1):
+            try:
+                connection.execute('BEGIN IMMEDIATE')
+                return
+            except sqlite3.OperationalError as error:
+                if not _is_busy(error) or attempt == self.busy_retries:
+                    raise
+                self.busy_waits += 1
+                time.sleep(random.uniform(0, min(0.001 * 2 ** attempt, 0.25)))
+
+    def _discard(self, connection: sqlite3.Connection) -> None:
+        """
+        Closes a broken connection and frees its slot. Caller holds the condition.
+        """
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+        self._size -= 1
+        self.discarded += 1
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a connection for a read or a single statement.
+
+        Inside transaction() the calling thread's pinned connection is reused.
+        """
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            yield pinned
+            return
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a connection and commits once when the outermost block exits.
+
+        Nested transaction() and connection() blocks on the same thread share the
+        pinned connection, so several writes become a single commit. Any exception
+        rolls the whole transaction back.
+        """
+        pinned = getattr(self._local, 'connection', None)
+        if pinned is not None:
+            yield pinned
+            return
+        connection = self.checkout()
+        try:
+            self._begin(connection)
+        except BaseException:
+            self.checkin(connection)
+            raise
+        self._local.connection = connection
+        try:
+            yield connection
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            self._local.connection = None
+            self.checkin(connection)
+
+    def initialize_once(self, key: str, initializer: Callable[[], None]) -> None:
+        """
+        Runs a schema initializer the first time it is requested for this pool.
+
+        Parameters:
+        - key (str): A name identifying the initializer (e.g. the table name).
+        - initializer (Callable): The function creating the schema.
+        """
+        with self._condition:
+            if key in self._initialized:
+                return
+        initializer()
+        with self._condition:
+            self._initialized.add(key)
+
+    def close(self) -> None:
+        """
+        Closes all idle connections. The pool reopens connections on demand.
+        """
+        with self._condition:
+            while self._idle:
+                connection, _ = self._idle.pop()
+                connection.close()
+                self._size -= 1
+            self._condition.notify_all()
+
+
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """
+    Checks whether an error means another connection holds a conflicting lock.
+    """
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_default_options: Dict[str, Any] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(database: str, **options) -> ConnectionPool:
+    """
+    Returns the process-wide pool for a database file, creating it on first use.
+
+    Parameters:
+    - database (str): The name of the SQLite database file.
+    - **options: Keyword arguments for ConnectionPool, used only on creation and
+      combined with the defaults set through configure_pools().
+
+    Returns:
+    - ConnectionPool: The shared pool for the database.
+    """
+    key = database if database == ':memory:' else os.path.abspath(database)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(database, **{**_default_options, **options})
+        return pool
+
+
+def configure_pools(**options: Any) -> None:
+    """
+    Sets options for every existing pool and every pool created afterwards, e.g.
+    configure_pools(**MULTI_WORKER_OPTIONS) before starting worker threads.
+
+    Parameters:
+    - **options: Keyword arguments accepted by ConnectionPool.
+    """
+    with _pools_lock:
+        _default_options.update(options)
+        for pool in _pools.values():
+            pool.configure(**options)
+
+
+def get_query_stats(reset: bool = False) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """
+    Returns the statement counters of every pool, e.g. after configure_pools(instrument=True).
+
+    Parameters:
+    - reset (bool): Drop the counters after reading them.
+
+    Returns:
+    - Dict[str, Dict[str, Dict[str, Any]]]: Per database path, the QueryStats.get_metrics() of its pool.
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    metrics = {}
+    for key, pool in pools:
+        metrics[key] = pool.stats.get_metrics()
+        if reset:
+            pool.stats.reset()
+    return metrics
+
+
+def close_all() -> None:
+    """
+    Closes the idle connections of every pool and forgets the pools.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
@@ -0,0 +1,103 @@
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, List, TypeVar
+from account.database import AccountDatabase
+from credit_card.database import CreditCardDatabase, TransactionDatabase
+
+T = TypeVar('T')
+
+
+class Repository:
+    """
+    Groups the account, credit card and transaction databases used by one CreditCardManager.
+
+    By default each entity lives in its own SQLite file. A unified repository keeps all
+    tables in a single file, which lets a payment commit its reads and writes as one
+    atomic transaction.
+    """
+
+    def __init__(self, accounts_db: str = 'accounts.db', credit_cards_db: str = 'credit_cards.db',
+                 transactions_db: str = 'transactions.db') -> None:
+        """
+        Initializes a Repository object.
+
+        Parameters:
+        - accounts_db (str): The SQLite file holding the accounts table.
+        - credit_cards_db (str): The SQLite file holding the credit_cards table.
+        - transactions_db (str): The SQLite file holding the transactions and ledger tables.
+        """
+        self.account_db: AccountDatabase = AccountDatabase(accounts_db)
+        self.credit_card_db: CreditCardDatabase = CreditCardDatabase(credit_cards_db)
+        self.transaction_db: TransactionDatabase = TransactionDatabase(transactions_db)
+
+    @classmethod
+    def unified(cls, database: str = 'bank.db') -> 'Repository':
+        """
+        Creates a repository that stores every table in one SQLite file.
+
+        Parameters:
+        - database (str): The SQLite file holding all tables.
+
+        Returns:
+        - Repository: The unified repository.
+        """
+        return cls(database, database, database)
+
+    @property
+    def is_unified(self) -> bool:
+        """
+        Whether all three databases share one file (and therefore one connection pool).
+        """
+        return self.account_db.pool is self.credit_card_db.pool is self.transaction_db.pool
+
+    @property
+    def shards(self) -> List['Repository']:
+        """
+        The repositories holding the data: just this one, as it is not sharded.
+        """
+        return [self]
+
+    def for_user(self, user_id: str) -> 'Repository':
+        """
+        Returns the repository holding a user's rows, which is always this one.
+
+        Callers route through for_user() so they work unchanged with a ShardedRepository.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - Repository: This repository.
+        """
+        return self
+
+    def scatter(self, function: Callable[['Repository'], T]) -> List[T]:
+        """
+        Calls a function on every shard; here, once on this repository.
+
+        Parameters:
+        - function (Callable[[Repository], T]): The work to run against the repository.
+
+        Returns:
+        - List[T]: The single result.
+        """
+        return [function(self)]
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Groups the database operations inside the block into one atomic commit.
+
+        In a unified repository every read and write in the block shares one connection
+        and is committed once at the end. With separate files there is no cross-file
+        atomicity, so each operation keeps committing on its own.
+        """
+        with self.account_db.pool.transaction() if self.is_unified else nullcontext():
+            yield
+
+    def close(self) -> None:
+        """
+        Flushes buffered transactions and closes the idle connections of every database.
+        """
+        self.transaction_db.close()
+        self.credit_card_db.close()
+        self.account_db.close()
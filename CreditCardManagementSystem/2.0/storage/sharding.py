@@ -0,0 +1,192 @@
+import json
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, TypeVar
+from credit_card.database import TransactionDatabase
+from credit_card.dates import DateLike
+from storage.repository import Repository
+
+T = TypeVar('T')
+
+# Written next to the shard files so the data is never reopened with another shard count,
+# which would route users to shards that do not hold their rows.
+LAYOUT_FILE = 'shards.json'
+
+
+def shard_for(user_id: str, shards: int) -> int:
+    """
+    Returns the index of the shard holding a user's rows.
+
+    CRC-32 is stable across processes and Python versions, unlike hash().
+
+    Parameters:
+    - user_id (str): The ID of the user.
+    - shards (int): The number of shards.
+
+    Returns:
+    - int: The shard index, from 0 to shards - 1.
+    """
+    return zlib.crc32(user_id.encode('utf-8')) % shards
+
+
+def _ingest_transactions(database: str, transactions: List[Tuple[str, float, DateLike, str]]) -> int:
+    """
+    Inserts one chunk of transactions into one shard; runs in an ingest worker process.
+    """
+    return TransactionDatabase(database).add_transactions(transactions)
+
+
+class ShardedRepository:
+    """
+    Spreads accounts, cards and transactions over several unified SQLite files by a
+    hash of the user ID.
+
+    All rows of one user live in the same shard, so everything an Account does, and
+    a payment's reads and writes, stay within one file and keep the atomicity of a
+    unified Repository. Writers of different shards never wait on each other's
+    database lock: bulk transaction ingest runs one worker process per shard, and
+    queries over all users (e.g. list_accounts) are scattered to the shards and
+    gathered.
+
+    Account and card IDs are assigned per shard, so they are only unique together
+    with the user ID. The shard count is fixed when the directory is created.
+    """
+
+    def __init__(self, shards: int = 4, directory: str = 'shards', processes: Optional[int] = None) -> None:
+        """
+        Initializes a ShardedRepository object, creating the shard files if needed.
+
+        Parameters:
+        - shards (int): The number of shards.
+        - directory (str): The directory holding one SQLite file per shard.
+        - processes (int, optional): The number of ingest worker processes. Defaults to one per shard;
+          0 ingests in the calling process.
+
+        Raises:
+        - ValueError: If the directory already holds a different number of shards.
+        """
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        os.makedirs(directory, exist_ok=True)
+        layout = os.path.join(directory, LAYOUT_FILE)
+        if os.path.exists(layout):
+            with open(layout) as file:
+                existing = json.load(file)['shards']
+            if existing != shards:
+                raise ValueError(f"{directory} holds {existing} shards, not {shards}")
+        else:
+            with open(layout, 'w') as file:
+                json.dump({'shards': shards}, file)
+        self.directory: str = directory
+        self.processes: int = shards if processes is None else processes
+        self.shards: List[Repository] = [Repository.unified(os.path.join(directory, f'shard{index:02d}.db'))
+                                         for index in range(shards)]
+        self._scatter_pool: Optional[ThreadPoolExecutor] = None
+        self._ingest_pool: Optional[ProcessPoolExecutor] = None
+
+    def shard_index(self, user_id: str) -> int:
+        """
+        Returns the index of the shard holding a user's rows.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - int: The shard index.
+        """
+        return shard_for(user_id, len(self.shards))
+
+    def for_user(self, user_id: str) -> Repository:
+        """
+        Returns the shard holding a user's account, cards and transactions.
+
+        Parameters:
+        - user_id (str): The ID of the user.
+
+        Returns:
+        - Repository: The user's shard.
+        """
+        return self.shards[shard_for(user_id, len(self.shards))]
+
+    def scatter(self, function: Callable[[Repository], T]) -> List[T]:
+        """
+        Calls a function on every shard concurrently and gathers the results.
+
+        Parameters:
+        - function (Callable[[Repository], T]): The work to run against one shard.
+
+        Returns:
+        - List[T]: The results, in shard order.
+        """
+        if self._scatter_pool is None:
+            self._scatter_pool = ThreadPoolExecutor(max_workers=len(self.shards), thread_name_prefix='shard')
+        return list(self._scatter_pool.map(function, self.shards))
+
+    def add_transactions(self, transactions: Iterable[Tuple[str, float, DateLike, str]],
+                         chunk_size: int = 50000) -> int:
+        """
+        Adds many transaction records, writing the shards in parallel worker processes.
+
+        Records are routed to their shard and sent to the workers in chunks of chunk_size;
+        each shard has at most one chunk in flight, so workers never contend for a shard's
+        write lock and records of one user are inserted in the order given.
+
+        Workers are spawned, so scripts calling this must guard their entry point with
+        if __name__ == '__main__'.
+
+        Parameters:
+        - transactions (Iterable[tuple]): Records of (user_id, amount, date, merchant), with amounts
+          in currency units.
+        - chunk_size (int): The number of records inserted per worker call and transaction.
+
+        Returns:
+        - int: The number of records inserted.
+        """
+        for shard in self.shards:
+            shard.transaction_db.flush()
+        if self.processes <= 0:
+            return sum(self.shards[index].transaction_db.add_transactions(chunk)
+                       for index, chunk in self._chunks(transactions, chunk_size))
+        if self._ingest_pool is None:
+            # Spawned workers open their own connections instead of inheriting this process's pools.
+            self._ingest_pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context('spawn'))
+        inserted = 0
+        in_flight: List[Optional[Future]] = [None] * len(self.shards)
+        for index, chunk in self._chunks(transactions, chunk_size):
+            if in_flight[index] is not None:
+                inserted += in_flight[index].result()
+            in_flight[index] = self._ingest_pool.submit(_ingest_transactions,
+                                                        self.shards[index].transaction_db.db_name, chunk)
+        return inserted + sum(future.result() for future in in_flight if future is not None)
+
+    def _chunks(self, transactions: Iterable[Tuple[str, float, DateLike, str]],
+                chunk_size: int) -> Iterator[Tuple[int, List[Tuple[str, float, DateLike, str]]]]:
+        """
+        Routes records to their shards and yields (shard index, records) in chunks.
+        """
+        count = len(self.shards)
+        buffers: List[List[Tuple[str, float, DateLike, str]]] = [[] for _ in range(count)]
+        for record in transactions:
+            index = shard_for(record[0], count)
+            buffers[index].append(record)
+            if len(buffers[index]) >= chunk_size:
+                yield index, buffers[index]
+                buffers[index] = []
+        for index, buffer in enumerate(buffers):
+            if buffer:
+                yield index, buffer
+
+    def close(self) -> None:
+        """
+        Stops the worker pools, then flushes and closes every shard.
+        """
+        if self._ingest_pool is not None:
+            self._ingest_pool.shutdown()
+            self._ingest_pool = None
+        if self._scatter_pool is not None:
+            self._scatter_pool.shutdown()
+            self._scatter_pool = None
+        for shard in self.shards:
+            shard.close()
@@ -0,0 +1,40 @@
+import os
+import sqlite3
+import sys
+
+import pytest
+
+# The 2.0 modules import each other by top-level name, as when run from the 2.0 directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import pool  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Runs every test in its own directory, so the default database files are fresh,
+    and drops the process-wide pools afterwards.
+    """
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path
+    pool.close_all()
+
+
+@pytest.fixture
+def legacy_transactions_db(tmp_path):
+    """
+    Returns a factory creating a transactions database in the pre-migration layout:
+    REAL amounts, free-form dates and no schema_migrations table.
+    """
+    def create(rows, name='legacy.db'):
+        path = str(tmp_path / name)
+        with sqlite3.connect(path) as connection:
+            connection.execute('CREATE TABLE transactions (id INTEGER PRIMARY KEY, user_id TEXT, amount REAL, '
+                               'date TEXT, merchant TEXT)')
+            connection.executemany('INSERT INTO transactions (user_id, amount, date, merchant) VALUES (?, ?, ?, ?)',
+                                   rows)
+        connection.close()
+        return path
+
+    return create
@@ -0,0 +1,37 @@
+import datetime
+import random
+
+import pytest
+
+pytest.importorskip('numpy')
+
+from analytics.columnar import TransactionColumns  # noqa: E402
+from credit_card.database import TransactionDatabase  # noqa: E402
+
+
+@pytest.fixture
+def transaction_db():
+    rng = random.Random(7)
+    start = datetime.datetime(2024, 1, 1)
+    db = TransactionDatabase('transactions.db')
+    db.add_transactions((f'user{rng.randrange(5)}', rng.randrange(-500, 5000) / 100,
+                         start + datetime.timedelta(seconds=rng.randrange(90 * 86400)), f'shop{rng.randrange(4)}')
+                        for _ in range(2000))
+    return db
+
+
+@pytest.mark.parametrize('start_date, end_date', [
+    (None, '2024-01-31'),
+    ('2024-01-15', '2024-02-29'),
+    (datetime.date(2024, 2, 1), datetime.date(2024, 2, 1)),
+    ('2024-01-10 12:00:00', '2024-03-01 06:30:00'),
+])
+def test_date_range_matches_the_database(transaction_db, start_date, end_date):
+    columns = TransactionColumns.load(transaction_db)
+    totals = columns.sum('user', start_date=start_date, end_date=end_date)
+    counts = columns.count('user', start_date=start_date, end_date=end_date)
+    for user_id in (f'user{i}' for i in range(5)):
+        rows = transaction_db.get_transactions_in_range(user_id, start_date, end_date)
+        assert counts.get(user_id, 0) == len(rows)
+        assert round(totals.get(user_id, 0.0) * 100) == transaction_db.sum_transactions_cents(
+            user_id, start_date, end_date)
@@ -0,0 +1,66 @@
+import datetime
+import random
+
+import pytest
+
+from credit_card.database import TransactionDatabase
+from credit_card.dates import end_bound, normalize_date
+
+
+@pytest.mark.parametrize('value, normalized', [
+    ('2024-01-31', '2024-01-31 00:00:00.000000'),
+    ('2024-01-31T09:30', '2024-01-31 09:30:00.000000'),
+    ('2024-01-31 09:30:00.5', '2024-01-31 09:30:00.500000'),
+    (datetime.date(2024, 1, 31), '2024-01-31 00:00:00.000000'),
+    (datetime.datetime(2024, 1, 31, 23, 59, 59, 999999), '2024-01-31 23:59:59.999999'),
+])
+def test_normalize_date(value, normalized):
+    assert normalize_date(value) == normalized
+
+
+@pytest.mark.parametrize('value, bound', [
+    ('2024-01-31', '2024-02-01 00:00:00.000000'),
+    (datetime.date(2024, 12, 31), '2025-01-01 00:00:00.000000'),
+    ('2024-01-31 00:00:00', '2024-01-31 00:00:00.000001'),
+    (datetime.datetime(2024, 1, 31, 12), '2024-01-31 12:00:00.000001'),
+])
+def test_end_bound(value, bound):
+    assert end_bound(value) == bound
+
+
+def test_normalize_date_rejects_non_iso_text():
+    with pytest.raises(ValueError):
+        normalize_date('31/01/2024')
+
+
+def test_range_queries_match_brute_force():
+    rng = random.Random(3)
+    start = datetime.datetime(2024, 1, 1)
+    dates = [start + datetime.timedelta(days=rng.randrange(30), seconds=rng.choice([0, 86399, rng.randrange(86400)]),
+                                        microseconds=rng.choice([0, 999999]))
+             for _ in range(500)]
+    db = TransactionDatabase('transactions.db')
+    db.add_transactions(('alice', 1.0, date, 'shop') for date in dates)
+    for _ in range(100):
+        low, high = sorted(rng.sample(dates, 2))
+        bounds = rng.choice([(low, high), (low.date(), high.date()), (str(low.date()), str(high.date())),
+                             (low.isoformat(), high.isoformat())])
+        first = datetime.datetime.fromisoformat(normalize_date(bounds[0]))
+        if len(str(bounds[1])) == 10:
+            expected = [date for date in dates if first <= date and date.date() <= high.date()]
+        else:
+            expected = [date for date in dates if first <= date <= high]
+        rows = db.get_transactions_in_range('alice', *bounds)
+        assert [row[3] for row in rows] == sorted(normalize_date(date) for date in expected), bounds
+        assert db.get_balance_cents('alice', *bounds) == 100 * len(expected), bounds
+
+
+def test_migration_normalizes_legacy_dates(legacy_transactions_db):
+    rows = [('alice', 1.0, '2024-01-31 09:30:00', 'a'), ('alice', 2.0, '2024-01-31T23:59:59.5', 'a'),
+            ('alice', 4.0, '2024-02-01', 'a'), ('alice', 8.0, 'yesterday', 'a')]
+    db = TransactionDatabase(legacy_transactions_db(rows))
+    stored = [row[3] for row in db.get_transactions_by_user_id('alice')]
+    assert stored == ['2024-01-31 09:30:00.000000', '2024-01-31 23:59:59.500000', '2024-02-01 00:00:00.000000',
+                      'yesterday']
+    assert db.get_balance('alice', '2024-01-31', '2024-01-31') == 3.0
+    assert db.sum_transactions('alice', end_date='2024-01-31') == 3.0
@@ -0,0 +1,72 @@
+import datetime
+import random
+
+from credit_card.database import TransactionDatabase
+from credit_card.dates import normalize_date
+
+USERS = [f'user{i}' for i in range(4)]
+
+
+def random_date(rng: random.Random) -> datetime.datetime:
+    day = datetime.datetime(2024, 1, 1) + datetime.timedelta(days=rng.randrange(60))
+    # Exact midnights and the last microsecond of a day are the edges of the daily rollups.
+    return day + rng.choice([datetime.timedelta(0), datetime.timedelta(days=1, microseconds=-1),
+                             datetime.timedelta(seconds=rng.randrange(86400))])
+
+
+def assert_ledger_matches(db: TransactionDatabase) -> None:
+    with db.pool.connection() as connection:
+        balances = dict(connection.execute(
+            'SELECT user_id, balance_cents FROM balances WHERE transaction_count > 0').fetchall())
+        expected = dict(connection.execute(
+            'SELECT user_id, SUM(amount_cents) FROM transactions GROUP BY user_id').fetchall())
+        daily = set(connection.execute(
+            'SELECT user_id, day, total_cents, transaction_count FROM daily_balances '
+            'WHERE transaction_count > 0').fetchall())
+        expected_daily = set(connection.execute(
+            'SELECT user_id, substr(date, 1, 10), SUM(amount_cents), COUNT(*) FROM transactions '
+            'GROUP BY user_id, substr(date, 1, 10)').fetchall())
+    assert balances == expected
+    assert daily == expected_daily
+
+
+def test_triggers_track_inserts_updates_and_deletes():
+    rng = random.Random(5)
+    db = TransactionDatabase('transactions.db')
+    db.add_transactions((rng.choice(USERS), rng.randrange(-2000, 20000) / 100, random_date(rng), 'shop')
+                        for _ in range(500))
+    for transaction_id in rng.sample(range(1, 501), 100):
+        db.delete_transaction(transaction_id)
+    with db.pool.transaction() as connection:
+        ids = [row[0] for row in connection.execute('SELECT id FROM transactions')]
+        for transaction_id in rng.sample(ids, 100):
+            connection.execute('UPDATE transactions SET user_id=?, amount_cents=?, date=? WHERE id=?',
+                               (rng.choice(USERS), rng.randrange(-500, 5000),
+                                normalize_date(random_date(rng)), transaction_id))
+    assert_ledger_matches(db)
+
+
+def test_balance_ranges_match_sum():
+    rng = random.Random(11)
+    db = TransactionDatabase('transactions.db')
+    db.add_transactions((rng.choice(USERS), rng.randrange(-2000, 20000) / 100, random_date(rng), 'shop')
+                        for _ in range(1000))
+    for _ in range(200):
+        start, end = sorted([random_date(rng), random_date(rng)])
+        bounds = rng.choice([(start, end), (start.date(), end.date()), (str(start.date()), str(end)),
+                             (None, end.date()), (start, None)])
+        user_id = rng.choice(USERS)
+        assert db.get_balance_cents(user_id, *bounds) == db.sum_transactions_cents(user_id, *bounds), bounds
+    for user_id in USERS:
+        assert db.get_balance_cents(user_id) == db.sum_transactions_cents(user_id)
+
+
+def test_migration_backfills_the_ledger_of_a_legacy_database(legacy_transactions_db):
+    rows = [('alice', 10.5, '2024-01-01 09:00:00', 'a'), ('alice', -2.25, '2024-01-02 10:00:00', 'b'),
+            ('bob', 7.0, '2024-01-02 11:00:00', 'a')]
+    db = TransactionDatabase(legacy_transactions_db(rows))
+    assert db.get_balance('alice') == 8.25
+    assert db.get_balance('bob') == 7.0
+    assert db.get_balance('alice', '2024-01-02', '2024-01-02') == -2.25
+    db.add_transaction('bob', 1.0, '2024-01-03', 'c')
+    assert_ledger_matches(db)
@@ -0,0 +1,60 @@
+import sqlite3
+
+from account.database import ACCOUNT_MIGRATIONS, AccountDatabase
+from credit_card.database import (CREDIT_CARD_MIGRATIONS, TRANSACTION_MIGRATIONS, CreditCardDatabase,
+                                  TransactionDatabase, hash_card_number)
+from storage import pool
+
+
+def schema(path: str):
+    with sqlite3.connect(path) as connection:
+        versions = dict(connection.execute('SELECT component, version FROM schema_migrations'))
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_%'")}
+    connection.close()
+    return versions, indexes
+
+
+def test_legacy_files_are_migrated_to_the_latest_version(tmp_path, legacy_transactions_db):
+    accounts = str(tmp_path / 'accounts.db')
+    with sqlite3.connect(accounts) as connection:
+        connection.execute('CREATE TABLE accounts (id INTEGER PRIMARY KEY, user_id TEXT)')
+        connection.executemany('INSERT INTO accounts (user_id) VALUES (?)', [('alice',), ('bob',), ('alice',)])
+    connection.close()
+    cards = str(tmp_path / 'credit_cards.db')
+    with sqlite3.connect(cards) as connection:
+        connection.execute('CREATE TABLE credit_cards (id INTEGER PRIMARY KEY, number TEXT, expiration_date TEXT, '
+                           'cvv TEXT)')
+        connection.execute("INSERT INTO credit_cards (number, expiration_date, cvv) VALUES ('4000000000000002', "
+                           "'12/30', '123')")
+    connection.close()
+    transactions = legacy_transactions_db([('alice', 1.5, '2024-01-01 10:00:00', 'shop')], 'transactions.db')
+
+    account_db = AccountDatabase(accounts)
+    card_db = CreditCardDatabase(cards)
+    TransactionDatabase(transactions)
+
+    assert [row[1] for row in account_db.get_all_accounts()] == ['alice', 'bob']
+    assert account_db.get_account_by_user_id('alice')[0] == 1
+    with card_db.pool.connection() as connection:
+        assert connection.execute('SELECT account_id, pan_hash FROM credit_cards').fetchall() == [
+            (None, hash_card_number('4000000000000002'))]
+    assert schema(accounts) == ({'accounts': len(ACCOUNT_MIGRATIONS)}, {'idx_accounts_user_id'})
+    assert schema(cards) == ({'credit_cards': len(CREDIT_CARD_MIGRATIONS)}, {'idx_credit_cards_owner_pan'})
+    versions, indexes = schema(transactions)
+    assert versions == {'transactions': len(TRANSACTION_MIGRATIONS)}
+    assert {'idx_transactions_user_date', 'idx_transactions_merchant'} <= indexes
+
+
+def test_components_sharing_a_file_are_versioned_separately():
+    for database in (AccountDatabase, CreditCardDatabase, TransactionDatabase):
+        database('bank.db')
+    versions, _ = schema('bank.db')
+    assert versions == {'accounts': len(ACCOUNT_MIGRATIONS), 'credit_cards': len(CREDIT_CARD_MIGRATIONS),
+                        'transactions': len(TRANSACTION_MIGRATIONS)}
+
+
+def test_reopening_a_migrated_file_keeps_its_data():
+    TransactionDatabase('transactions.db').add_transaction('alice', 1.0, '2024-01-01', 'shop')
+    pool.close_all()
+    assert TransactionDatabase('transactions.db').get_balance('alice') == 1.0
+    assert schema('transactions.db')[0] == {'transactions': len(TRANSACTION_MIGRATIONS)}
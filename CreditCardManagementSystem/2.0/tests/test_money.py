@@ -0,0 +1,56 @@
+from decimal import Decimal
+
+import pytest
+
+from credit_card.database import TransactionDatabase
+from credit_card.money import from_cents, to_cents
+from credit_card.transaction import Transaction
+
+
+@pytest.mark.parametrize('amount, cents', [
+    (0, 0), (12, 1200), (-3, -300), (0.1, 10), (19.99, 1999), (-0.07, -7), (0.1 + 0.2, 30),
+    ('4.35', 435), ('-0.015', -2), ('0.025', 2), (Decimal('1.005'), 100), (Decimal('123456789.99'), 12345678999),
+])
+def test_to_cents(amount, cents):
+    assert to_cents(amount) == cents
+
+
+def test_round_trip():
+    for cents in range(-1000, 1000):
+        assert to_cents(from_cents(cents)) == cents
+
+
+def test_sums_are_exact():
+    db = TransactionDatabase('transactions.db')
+    db.add_transactions(('alice', 0.1, '2024-01-01', 'shop') for _ in range(1000))
+    assert db.get_balance_cents('alice') == 10000
+    assert db.sum_transactions('alice') == 100.0
+    assert db.get_transactions_by_user_id('alice')[0][2] == 0.1
+
+
+def test_transaction_keeps_cents():
+    transaction = Transaction('alice', 0.1, None, 'shop')
+    transaction.amount += 0.2
+    assert transaction.amount_cents == 30
+    assert transaction.amount == 0.3
+
+
+def test_migration_converts_legacy_amounts_to_cents(legacy_transactions_db):
+    rows = [('alice', 0.1 + 0.2, '2024-01-01 09:00:00', 'a'), ('alice', 19.99, '2024-01-02 09:00:00', 'a'),
+            ('alice', -5.25, '2024-01-03 09:00:00', 'b')]
+    db = TransactionDatabase(legacy_transactions_db(rows))
+    with db.pool.connection() as connection:
+        stored = [row[0] for row in connection.execute('SELECT amount_cents FROM transactions ORDER BY id')]
+    assert stored == [30, 1999, -525]
+    assert db.get_balance_cents('alice') == 1504
+
+
+def test_migration_rounds_half_cents_like_new_inserts(legacy_transactions_db):
+    # SQLite's ROUND() gives 13, -13, 38 and 0: halves away from zero.
+    amounts = [0.125, -0.125, 0.375, 2.5e-3]
+    db = TransactionDatabase(legacy_transactions_db([('alice', amount, '2024-01-01', 'a') for amount in amounts]))
+    db.add_transactions([('bob', amount, '2024-01-01', 'a') for amount in amounts])
+    with db.pool.connection() as connection:
+        stored = [row[0] for row in connection.execute('SELECT amount_cents FROM transactions ORDER BY id')]
+    assert stored == [12, -12, 38, 0] * 2
+    assert db.get_balance_cents('alice') == db.get_balance_cents('bob') == 38
@@ -0,0 +1,28 @@
+import pytest
+
+from credit_card.database import TransactionDatabase
+
+
+@pytest.fixture
+def db():
+    db = TransactionDatabase('transactions.db')
+    db.add_transactions((user_id, day, f'2024-01-{day:02d}', 'shop') for day in range(1, 11)
+                        for user_id in ('alice', 'bob'))
+    return db
+
+
+def test_pages_resume_after_the_cursor(db):
+    first = db.get_transactions_page('alice', page_size=4)
+    rest = db.get_transactions_page('alice', after_id=first[-1][0], page_size=100)
+    assert [row[2] for row in first + rest] == list(range(1, 11))
+    assert [row[0] for row in db.iter_transactions('alice', page_size=3)] == [row[0] for row in first + rest]
+
+
+def test_a_cursor_of_another_user_is_rejected(db):
+    foreign = db.get_transactions_page('bob', page_size=1)[0][0]
+    with pytest.raises(ValueError):
+        db.get_transactions_page('alice', after_id=foreign)
+    with pytest.raises(ValueError):
+        list(db.iter_transactions('alice', after_id=foreign))
+    with pytest.raises(ValueError):
+        db.get_transactions_page('alice', after_id=10 ** 9)
@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.replay import replay_partition, worker_index
+
+RECORDS = [{'op': 'create_account', 'user_id': f'user{i}'} for i in range(400)]
+
+
+@pytest.mark.parametrize('processes, threads', [(1, 4), (2, 4), (4, 4), (3, 6), (4, 8)])
+def test_every_thread_of_every_process_gets_users(processes, threads):
+    routed = {(worker_index(record, processes), worker_index(record, threads, processes)) for record in RECORDS}
+    assert routed == {(process, thread) for process in range(processes) for thread in range(threads)}
+
+
+def test_replay_partition_reports_no_idle_threads(workdir):
+    partition = [(None, record) for record in RECORDS if worker_index(record, 2) == 1]
+    merged = replay_partition(partition, 4, 0.0, str(workdir), processes=2)
+    assert merged['idle_threads'] == 0
+    assert len(merged['operations']['create_account']['latencies']) == len(partition)
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from AsyncCreditCardManager import AsyncCreditCardManager
+from CreditCardManager import CreditCardManager
+from storage.executor import shutdown_all
+from storage.repository import Repository
+from storage.sharding import ShardedRepository, shard_for
+
+USERS = [f'user{i}' for i in range(40)]
+
+
+@pytest.fixture
+def manager():
+    manager = CreditCardManager(sweep_interval=0, repository=ShardedRepository(4, 'shards', processes=0))
+    manager.create_accounts(USERS)
+    yield manager
+    manager.close()
+    manager.repository.close()
+
+
+def shard_users(repository: ShardedRepository):
+    return [sorted(row[1] for row in shard.account_db.get_all_accounts()) for shard in repository.shards]
+
+
+def test_users_live_in_their_own_shard(manager):
+    placed = shard_users(manager.repository)
+    for index, users in enumerate(placed):
+        assert all(shard_for(user_id, 4) == index for user_id in users)
+    assert sorted(manager.list_accounts()) == sorted(USERS)
+
+
+def test_account_rows_stay_in_the_users_shard(manager):
+    for i, user_id in enumerate(USERS):
+        account = manager.get_account(user_id)
+        account.add_card(f'4000{i:012d}', '12/30', '123')
+        assert manager.initiate_payment(user_id, f'4000{i:012d}', 2.5, 'shop')
+    for index, shard in enumerate(manager.repository.shards):
+        with shard.transaction_db.pool.connection() as connection:
+            users = {row[0] for row in connection.execute('SELECT user_id FROM transactions')}
+        assert users == set(shard_users(manager.repository)[index])
+    assert manager.get_account('user7').get_balance_v2() == 2.5
+
+
+def test_single_database_attributes_are_unavailable_when_sharded(manager):
+    for name in ('account_db', 'credit_card_db', 'transaction_db'):
+        with pytest.raises(AttributeError):
+            getattr(manager, name)
+    unsharded = CreditCardManager(sweep_interval=0, repository=Repository.unified('bank.db'))
+    assert unsharded.account_db is unsharded.repository.account_db
+    unsharded.close()
+
+
+def test_async_manager_routes_by_user(manager):
+    async def run():
+        wrapper = AsyncCreditCardManager(manager)
+        await wrapper.create_account('late')
+        return await wrapper.list_accounts(), await wrapper.get_transactions('late')
+
+    try:
+        accounts, transactions = asyncio.run(run())
+    finally:
+        shutdown_all()
+    assert sorted(accounts) == sorted(USERS + ['late'])
+    assert transactions == []
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_add_transactions_routes_records(processes):
+    repository = ShardedRepository(3, 'ingest', processes=processes)
+    try:
+        inserted = repository.add_transactions(((user_id, 1.0, '2024-01-01', 'shop') for user_id in USERS * 5),
+                                               chunk_size=16)
+        assert inserted == len(USERS) * 5
+        for user_id in USERS:
+            assert repository.for_user(user_id).transaction_db.get_balance(user_id) == 5.0
+    finally:
+        repository.close()
+
+
+def test_reopening_with_another_shard_count_is_refused():
+    ShardedRepository(2, 'fixed').close()
+    with pytest.raises(ValueError):
+        ShardedRepository(3, 'fixed')
@@ -0,0 +1,28 @@
+import csv
+import os
+
+from CreditCardManager import CreditCardManager
+from analytics.statements import SUMMARY_FILE, generate_statements, statement_path
+
+
+def read(path):
+    with open(path, newline='') as file:
+        return list(csv.reader(file))
+
+
+def test_summary_does_not_overwrite_a_users_statement():
+    manager = CreditCardManager(sweep_interval=0)
+    users = ['summary', '+summary', 'alice']
+    manager.create_accounts(users)
+    for amount, user_id in enumerate(users, 1):
+        manager.get_account(user_id).add_transaction(amount, '2024-12-05', 'shop')
+    generate_statements(manager, '2024-12', 'out', processes=0)
+    manager.close()
+
+    assert len({statement_path('out', user_id) for user_id in users} | {os.path.join('out', SUMMARY_FILE)}) == 4
+    for amount, user_id in enumerate(users, 1):
+        rows = read(statement_path('out', user_id))
+        assert rows[0] == ['date', 'merchant', 'amount']
+        assert rows[1][1:] == ['shop', f'{amount:.2f}']
+    summary = read(os.path.join('out', SUMMARY_FILE))
+    assert [row[0] for row in summary[1:]] == sorted(users)
@@ -0,0 +1,132 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from credit_card.database import TransactionDatabase
+from storage.pool import PoolTimeoutError, get_pool
+
+
+def count_rows(database: str) -> int:
+    with sqlite3.connect(database) as connection:
+        return connection.execute('SELECT COUNT(*) FROM transactions').fetchone()[0]
+
+
+def locked_database(database: str, **options) -> TransactionDatabase:
+    """
+    Returns a batching TransactionDatabase whose pool gives up on a busy file quickly.
+    """
+    get_pool(database, busy_timeout=20, busy_retries=0)
+    return TransactionDatabase(database, **options)
+
+
+def test_batch_size_commits_in_groups():
+    commits = []
+    db = TransactionDatabase('transactions.db', batch_size=3, on_commit=commits.append)
+    for i in range(7):
+        db.add_transaction('alice', 1.0, '2024-01-01', f'shop{i}')
+    assert commits == [3, 3]
+    assert count_rows('transactions.db') == 6
+    assert db.flush() == 1
+    assert count_rows('transactions.db') == 7
+
+
+def test_reads_flush_the_buffer_first():
+    db = TransactionDatabase('transactions.db', batch_size=100)
+    db.add_transaction('alice', 2.5, '2024-01-01', 'shop')
+    assert [row[2] for row in db.get_transactions_by_user_id('alice')] == [2.5]
+
+
+def test_flush_interval_commits_in_the_background():
+    db = TransactionDatabase('transactions.db', batch_size=100, flush_interval=0.05)
+    db.add_transaction('alice', 1.0, '2024-01-01', 'shop')
+    deadline = time.monotonic() + 5
+    while count_rows('transactions.db') == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert count_rows('transactions.db') == 1
+
+
+def test_failed_flush_keeps_the_buffer():
+    db = locked_database('transactions.db', batch_size=100)
+    for i in range(3):
+        db.add_transaction('alice', 1.0, '2024-01-01', f'shop{i}')
+    blocker = sqlite3.connect('transactions.db', isolation_level=None)
+    blocker.execute('BEGIN IMMEDIATE')
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+    blocker.execute('ROLLBACK')
+    blocker.close()
+    assert db.flush() == 3
+    assert count_rows('transactions.db') == 3
+
+
+def test_failed_background_flush_is_reported_and_nothing_is_lost():
+    db = locked_database('transactions.db', batch_size=100, flush_interval=0.05)
+    blocker = sqlite3.connect('transactions.db', isolation_level=None)
+    blocker.execute('BEGIN IMMEDIATE')
+    for i in range(5):
+        db.add_transaction('alice', 1.0, '2024-01-01', f'shop{i}')
+    deadline = time.monotonic() + 5
+    while db._flush_error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(sqlite3.OperationalError):
+        db.add_transaction('alice', 1.0, '2024-01-01', 'rejected')
+    blocker.execute('ROLLBACK')
+    blocker.close()
+    db.add_transaction('alice', 1.0, '2024-01-01', 'shop5')
+    db.close()
+    merchants = [row[4] for row in TransactionDatabase('transactions.db').get_transactions_by_user_id('alice')]
+    assert sorted(merchants) == [f'shop{i}' for i in range(6)]
+
+
+def test_add_transactions_inserts_in_one_call():
+    db = TransactionDatabase('transactions.db', batch_size=10)
+    db.add_transaction('alice', 1.0, '2024-01-01', 'buffered')
+    inserted = db.add_transactions(('bob', 0.5 * i, '2024-01-02', 'bulk') for i in range(50))
+    assert inserted == 50
+    assert count_rows('transactions.db') == 51
+
+
+def test_pool_timeout_keeps_the_buffer():
+    get_pool('transactions.db', max_size=1, timeout=0.05)
+    db = TransactionDatabase('transactions.db', batch_size=100)
+    for i in range(5):
+        db.add_transaction('alice', 1.0, '2024-01-01', f'shop{i}')
+    with db.pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            threading_flush(db)
+    assert db.flush() == 5
+    assert count_rows('transactions.db') == 5
+
+
+def threading_flush(db: TransactionDatabase) -> None:
+    """
+    Flushes from another thread, which cannot share the connection held by the test.
+    """
+    errors = []
+
+    def run():
+        try:
+            db.flush()
+        except Exception as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
+
+
+def test_failing_on_commit_does_not_rebuffer_committed_records():
+    def on_commit(count):
+        raise sqlite3.OperationalError('callback failed')
+
+    db = TransactionDatabase('transactions.db', batch_size=100, on_commit=on_commit)
+    for i in range(3):
+        db.add_transaction('alice', 1.0, '2024-01-01', f'shop{i}')
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+    assert db.flush() == 0
+    assert count_rows('transactions.db') == 3